@@ -228,26 +228,29 @@ class AdminUserManagementViewSet(viewsets.ModelViewSet):
 
         from apps.auctions.models import Auction, Bid
 
-        auctions_created = Auction.objects.filter(seller=user).count()
-        active_auctions = Auction.objects.filter(seller=user, status="active").count()
-        sold_auctions = Auction.objects.filter(seller=user, status="sold").count()
-
-        bids_placed = Bid.objects.filter(bidder=user).count()
-        auctions_won = Bid.objects.filter(bidder=user, status="won").count()
-
-        total_spent = (
-            Bid.objects.filter(bidder=user, status="won").aggregate(
-                total=Sum("amount")
-            )["total"]
-            or 0
+        # one pass over the user's auctions and one over their bids
+        auctions = Auction.objects.filter(seller=user).aggregate(
+            created=Count("id", distinct=True),
+            active=Count("id", filter=Q(status="active"), distinct=True),
+            sold=Count("id", filter=Q(status="sold"), distinct=True),
+            earned=Sum("bids__amount", filter=Q(status="sold", bids__status="won")),
         )
-        total_earned = (
-            Auction.objects.filter(seller=user, status="sold").aggregate(
-                total=Sum("bids__amount", filter=Q(bids__status="won"))
-            )["total"]
-            or 0
+        bids = Bid.objects.filter(bidder=user).aggregate(
+            placed=Count("id"),
+            won=Count("id", filter=Q(status="won")),
+            spent=Sum("amount", filter=Q(status="won")),
         )
 
+        auctions_created = auctions["created"]
+        active_auctions = auctions["active"]
+        sold_auctions = auctions["sold"]
+
+        bids_placed = bids["placed"]
+        auctions_won = bids["won"]
+
+        total_spent = bids["spent"] or 0
+        total_earned = auctions["earned"] or 0
+
         return Response(
             {
                 "user_id": str(user.id),
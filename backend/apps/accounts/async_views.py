@@ -0,0 +1,56 @@
+from django.db.models import Q, Sum
+
+from apps.auctions.models import Bid
+from apps.auctions.serializers import BidSerializer
+from apps.core.async_views import async_api_response, async_read_view
+from apps.transactions.models import Transaction
+from apps.transactions.serializers import TransactionSerializer
+from .models import Wallet
+from .serializers import WalletSerializer
+
+
+@async_read_view(auth_required=True)
+async def wallet_summary(request):
+    """Async GET for WalletViewSet.list; top-ups go to the viewset"""
+    user = request.api_user
+    wallet = await Wallet.objects.filter(user=user).afirst()
+    if wallet is None:
+        return async_api_response(
+            success=False, message="Wallet not found", status=404
+        )
+
+    recent_transactions = [
+        transaction
+        async for transaction in Transaction.objects.filter(user=user).order_by(
+            "-created_at"
+        )[:5]
+    ]
+    active_bids = [
+        bid
+        async for bid in Bid.objects.filter(
+            bidder=user, status=Bid.STATUS_ACTIVE
+        ).select_related("bidder", "auction")
+    ]
+
+    totals = await Transaction.objects.filter(user=user, status="completed").aaggregate(
+        total_spent=Sum("amount", filter=Q(transaction_type="purchase")),
+        total_earned=Sum("amount", filter=Q(transaction_type="sale")),
+    )
+    total_spent = totals["total_spent"] or 0
+    total_earned = totals["total_earned"] or 0
+
+    return async_api_response(
+        data={
+            "wallet": WalletSerializer(wallet).data,
+            "financial_summary": {
+                "total_spent": total_spent,
+                "total_earned": total_earned,
+                "net_balance": total_earned - total_spent,
+            },
+            "recent_transactions": TransactionSerializer(
+                recent_transactions, many=True
+            ).data,
+            "active_bids": BidSerializer(active_bids, many=True).data,
+        },
+        message="Wallet details retrieved successfully",
+    )
@@ -1,21 +1,28 @@
 import csv
-from datetime import datetime
-from django.db.models import Count
+import uuid
+from datetime import date, datetime, timedelta
+from django.db.models import Count, Sum
 from django.http import HttpResponse
 from django.utils import timezone
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 
 from apps.accounts.permissions import IsAdmin
-from .models import Auction, Bid
+from . import watchlist
+from .analytics import auction_summary, category_summary, daily_summary
+from .models import Auction, AuctionViewCount, Bid
 from .serializers import (
     AuctionSerializer,
     BidSerializer,
 )
 
 
+STATISTICS_DAYS = 30
+
+
 class AdminAuctionViewSet(viewsets.ModelViewSet):
     """Admin API for managing auctions"""
 
@@ -170,18 +177,13 @@ class AdminAuctionViewSet(viewsets.ModelViewSet):
         """Get detailed analytics for an auction"""
         auction = self.get_object()
 
-        total_bids = auction.bids.count()
-        unique_bidders = auction.bids.values("bidder").distinct().count()
-        bid_amounts = auction.bids.order_by("-amount").values_list("amount", flat=True)
-
-        highest_bid = bid_amounts.first() if bid_amounts else auction.starting_price
-        avg_bid = sum(bid_amounts) / len(bid_amounts) if bid_amounts else 0
+        summary = auction_summary(auction.id)
 
         bid_timestamps = auction.bids.order_by("timestamp").values(
             "timestamp", "amount"
         )
 
-        watchers_count = auction.watchers.count()
+        watchers_count = watchlist.watcher_count(auction.id)
 
         return Response(
             {
@@ -193,16 +195,74 @@ class AdminAuctionViewSet(viewsets.ModelViewSet):
                 "starting_price": auction.starting_price,
                 "current_price": auction.current_price,
                 "analytics": {
-                    "total_bids": total_bids,
-                    "unique_bidders": unique_bidders,
-                    "highest_bid": highest_bid,
-                    "average_bid": avg_bid,
+                    **summary,
+                    "highest_bid": summary["highest_bid"] or auction.starting_price,
+                    "average_bid": summary["average_bid"] or 0,
                     "bid_history": list(bid_timestamps),
                     "watchers_count": watchers_count,
                 },
             }
         )
 
+    @swagger_auto_schema(
+        operation_id="admin_auction_statistics",
+        operation_summary="Bid and view statistics (Admin)",
+        operation_description=(
+            "Approximate bid and view statistics of a category and its "
+            f"subcategories, or of a date range (the last {STATISTICS_DAYS} "
+            "days by default)"
+        ),
+        tags=["Admin - Auctions"],
+        manual_parameters=[
+            openapi.Parameter(
+                "category",
+                openapi.IN_QUERY,
+                description="Category ID",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "start_date",
+                openapi.IN_QUERY,
+                description="First day (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "end_date",
+                openapi.IN_QUERY,
+                description="Last day (YYYY-MM-DD), today by default",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={200: "Statistics", 400: "Bad request"},
+    )
+    @action(detail=False, methods=["get"])
+    def statistics(self, request):
+        """Statistics of a category, or of a range of days"""
+        category = request.query_params.get("category")
+        try:
+            if category:
+                return Response(
+                    {
+                        "category_id": category,
+                        "statistics": category_summary(uuid.UUID(category)),
+                    }
+                )
+
+            end_date = request.query_params.get("end_date")
+            end = date.fromisoformat(end_date) if end_date else timezone.localdate()
+            start_date = request.query_params.get("start_date")
+            start = (
+                date.fromisoformat(start_date)
+                if start_date
+                else end - timedelta(days=STATISTICS_DAYS - 1)
+            )
+            statistics = daily_summary(start, end)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"start_date": start, "end_date": end, "statistics": statistics}
+        )
+
 
 class AdminBidViewSet(viewsets.ModelViewSet):
     """Admin API for managing bids"""
@@ -346,7 +406,8 @@ def admin_auction_dashboard(request):
     status_stats = Auction.objects.values("status").annotate(count=Count("id"))
 
     today_auctions = Auction.objects.filter(created_at__date=now.date()).count()
-    today_bids = Bid.objects.filter(timestamp__date=now.date()).count()
+    today = timezone.localdate()
+    today_stats = daily_summary(today, today)
 
     ending_soon = Auction.objects.filter(
         status=Auction.STATUS_ACTIVE, end_time__lte=now + timezone.timedelta(hours=24)
@@ -362,6 +423,11 @@ def admin_auction_dashboard(request):
     recent_auction_data = AuctionSerializer(recent_auctions, many=True).data
     recent_bid_data = BidSerializer(recent_bids, many=True).data
 
+    total_views = AuctionViewCount.objects.aggregate(total=Sum("views"))["total"]
+    most_viewed = AuctionViewCount.objects.order_by("-views").values(
+        "auction_id", "auction__title", "views"
+    )[:5]
+
     return Response(
         {
             "overall_stats": {
@@ -370,11 +436,22 @@ def admin_auction_dashboard(request):
                 "ended_auctions": ended_auctions,
                 "sold_auctions": sold_auctions,
                 "total_bids": total_bids,
+                "total_views": total_views or 0,
             },
             "status_breakdown": list(status_stats),
+            "most_viewed": [
+                {
+                    "id": row["auction_id"],
+                    "title": row["auction__title"],
+                    "views": row["views"],
+                }
+                for row in most_viewed
+            ],
             "today_stats": {
                 "auctions_created": today_auctions,
-                "bids_placed": today_bids,
+                "bids_placed": today_stats["total_bids"],
+                "unique_bidders": today_stats["unique_bidders"],
+                "unique_viewers": today_stats["unique_viewers"],
             },
             "ending_soon_count": ending_soon,
             "recent_activity": {
@@ -0,0 +1,289 @@
+"""
+Auction analytics from mergeable sketches
+
+Every bid, and every flushed batch of views (view_counts.py), is added
+once to the StatsSketch of its auction, of its auction's category and of
+its day. Each one holds the distinct bidders and viewers (HyperLogLog),
+the bid amount quantiles (t-digest) and the bids per bidder (count-min),
+plus exact bid and view counts, bid total and highest bid. An auction's
+statistics are therefore one row however many bids it has. A category
+merges the rows of its subtree and a date range one row per day, instead
+of scanning the bids.
+
+A trigger queues each inserted bid as a PendingSketchBid, so placing a bid
+never waits on the site-wide day sketch. The absorb_bid_sketches task or
+management command drains the queue: batches are taken with SKIP LOCKED
+and added in the transaction that deletes them, so a failed update leaves
+its batch queued. Sketch rows are locked in (scope, key) order, so
+concurrent batches don't deadlock. Until their bids are absorbed, the
+summaries add the queued bids in their scope to the stored sketches, so
+they are exact however long the queue waits to be drained.
+"""
+
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.sketches import CountMin, HyperLogLog, TDigest
+from .models import Auction, PendingSketchBid, StatsSketch
+from .trending import category_subtree
+
+ABSORB_BATCH_SIZE = 5000
+MAX_DAYS = 366
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+CENTS = Decimal("0.01")
+
+SKETCH_FIELDS = [
+    "bid_count",
+    "bid_total",
+    "highest_bid",
+    "views",
+    "bidders",
+    "viewers",
+    "amounts",
+    "top_bidders",
+    "updated_at",
+]
+
+
+def _cents(value):
+    return None if value is None else Decimal(value).quantize(CENTS)
+
+
+class Sketch:
+    """The decoded sketches of a StatsSketch row"""
+
+    def __init__(self, row=None):
+        self.row = row if row is not None else StatsSketch()
+        self.bidders = HyperLogLog(self.row.bidders)
+        self.viewers = HyperLogLog(self.row.viewers)
+        self.amounts = TDigest.from_dict(self.row.amounts)
+        self.top_bidders = CountMin.from_dict(self.row.top_bidders)
+
+    def add_bid(self, bidder_id, amount):
+        row = self.row
+        row.bid_count += 1
+        row.bid_total += amount
+        if row.highest_bid is None or amount > row.highest_bid:
+            row.highest_bid = amount
+        self.bidders.add(bidder_id)
+        self.amounts.add(amount)
+        self.top_bidders.add(bidder_id)
+
+    def add_views(self, views, viewers):
+        self.row.views += views
+        for viewer in viewers:
+            self.viewers.add(viewer)
+
+    def merge(self, other):
+        row, theirs = self.row, other.row
+        row.bid_count += theirs.bid_count
+        row.bid_total += theirs.bid_total
+        row.views += theirs.views
+        if theirs.highest_bid is not None and (
+            row.highest_bid is None or theirs.highest_bid > row.highest_bid
+        ):
+            row.highest_bid = theirs.highest_bid
+        self.bidders.merge(other.bidders)
+        self.viewers.merge(other.viewers)
+        self.amounts.merge(other.amounts)
+        self.top_bidders.merge(other.top_bidders)
+        return self
+
+    def encode(self):
+        """The row, with the sketches written back"""
+        row = self.row
+        row.bidders = self.bidders.to_bytes()
+        row.viewers = self.viewers.to_bytes()
+        row.amounts = self.amounts.to_dict()
+        row.top_bidders = self.top_bidders.to_dict()
+        row.updated_at = timezone.now()
+        return row
+
+    def summary(self):
+        row = self.row
+        return {
+            "total_bids": row.bid_count,
+            "unique_bidders": self.bidders.count(),
+            "highest_bid": row.highest_bid,
+            "average_bid": (
+                _cents(row.bid_total / row.bid_count) if row.bid_count else None
+            ),
+            "bid_quantiles": {
+                name: _cents(self.amounts.quantile(q)) for name, q in QUANTILES.items()
+            },
+            "top_bidders": [
+                {"bidder_id": bidder_id, "bids": bids}
+                for bidder_id, bids in self.top_bidders.most_common()
+            ],
+            "views": row.views,
+            "unique_viewers": self.viewers.count(),
+        }
+
+
+def sketch_keys(auction_id, category_id, day):
+    """The (scope, key) of the sketches an auction's event on ``day`` goes to"""
+    return [
+        (StatsSketch.SCOPE_AUCTION, str(auction_id)),
+        (StatsSketch.SCOPE_CATEGORY, str(category_id)),
+        (StatsSketch.SCOPE_DAY, day.isoformat()),
+    ]
+
+
+def _locked_sketches(keys):
+    """The sketches of ``keys``, created if missing, locked in key order"""
+    keys = sorted(set(keys))
+    StatsSketch.objects.bulk_create(
+        [StatsSketch(scope=scope, key=key) for scope, key in keys],
+        ignore_conflicts=True,
+    )
+    by_scope = {}
+    for scope, key in keys:
+        by_scope.setdefault(scope, []).append(key)
+    condition = Q()
+    for scope, scope_keys in by_scope.items():
+        condition |= Q(scope=scope, key__in=scope_keys)
+    rows = (
+        StatsSketch.objects.select_for_update()
+        .filter(condition)
+        .order_by("scope", "key")
+    )
+    return {(row.scope, row.key): Sketch(row) for row in rows}
+
+
+def _save(sketches):
+    StatsSketch.objects.bulk_update(
+        [sketch.encode() for sketch in sketches], SKETCH_FIELDS
+    )
+
+
+def absorb_bids(batch_size=ABSORB_BATCH_SIZE):
+    """
+    Add a batch of queued bids to the sketches
+
+    Returns:
+        int - number of bids taken off the queue
+    """
+    queue = PendingSketchBid._meta.db_table
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH taken AS (
+                    DELETE FROM {queue}
+                    WHERE id IN (
+                        SELECT id FROM {queue}
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING auction_id, bidder_id, amount, timestamp
+                )
+                SELECT t.auction_id, i.category_id, t.bidder_id, t.amount, t.timestamp
+                FROM taken t
+                LEFT JOIN auctions_auction a ON a.id = t.auction_id
+                LEFT JOIN auctions_item i ON i.id = a.item_id
+                """,
+                [batch_size],
+            )
+            taken = cursor.fetchall()
+        # bids of auctions deleted since are dropped
+        bids = [
+            (sketch_keys(auction_id, category_id, timezone.localdate(timestamp)), bid)
+            for auction_id, category_id, *bid, timestamp in taken
+            if category_id is not None
+        ]
+        if bids:
+            sketches = _locked_sketches(key for keys, _ in bids for key in keys)
+            for keys, (bidder_id, amount) in bids:
+                for key in keys:
+                    sketches[key].add_bid(bidder_id, amount)
+            _save(sketches.values())
+    return len(taken)
+
+
+def record_views(views, viewers):
+    """
+    Add a flush of buffered views to the sketches of today
+
+    Args:
+        views: number of views by auction ID
+        viewers: set of viewer keys by auction ID
+    """
+    categories = (
+        Auction.objects.filter(id__in=list(views))
+        .order_by()
+        .values_list("id", "item__category_id")
+    )
+    today = timezone.localdate()
+    events = [
+        (sketch_keys(auction_id, category_id, today), str(auction_id))
+        for auction_id, category_id in categories
+    ]
+    if not events:
+        return
+    with transaction.atomic():
+        sketches = _locked_sketches(key for keys, _ in events for key in keys)
+        for keys, auction_id in events:
+            for key in keys:
+                sketches[key].add_views(views[auction_id], viewers.get(auction_id, ()))
+        _save(sketches.values())
+
+
+def _summary(sketch, queued):
+    """The summary of ``sketch`` with the ``queued`` bids not absorbed yet"""
+    for bidder_id, amount in queued.values_list("bidder_id", "amount").iterator():
+        sketch.add_bid(bidder_id, amount)
+    return sketch.summary()
+
+
+def _merged(rows, queued):
+    total = Sketch()
+    for row in rows.iterator():
+        total.merge(Sketch(row))
+    return _summary(total, queued)
+
+
+def auction_summary(auction_id):
+    """Bid and view statistics of an auction"""
+    row = StatsSketch.objects.filter(
+        scope=StatsSketch.SCOPE_AUCTION, key=str(auction_id)
+    ).first()
+    return _summary(Sketch(row), PendingSketchBid.objects.filter(auction_id=auction_id))
+
+
+def category_summary(category_id):
+    """Bid and view statistics of a category and its subcategories"""
+    categories = category_subtree(category_id)
+    return _merged(
+        StatsSketch.objects.filter(
+            scope=StatsSketch.SCOPE_CATEGORY,
+            key__in=[str(category) for category in categories],
+        ),
+        PendingSketchBid.objects.filter(
+            auction_id__in=Auction.objects.filter(
+                item__category__in=categories
+            ).values("id")
+        ),
+    )
+
+
+def daily_summary(start, end):
+    """
+    Bid and view statistics of the days from ``start`` to ``end``, inclusive
+
+    Raises:
+        ValueError: the range is empty or longer than MAX_DAYS
+    """
+    if not 0 <= (end - start).days < MAX_DAYS:
+        raise ValueError(f"The date range must span 1 to {MAX_DAYS} days")
+    return _merged(
+        StatsSketch.objects.filter(
+            scope=StatsSketch.SCOPE_DAY,
+            key__gte=start.isoformat(),
+            key__lte=end.isoformat(),
+        ),
+        PendingSketchBid.objects.filter(timestamp__date__range=(start, end)),
+    )
@@ -9,6 +9,10 @@ from .models import Auction, Category, Bid
 from apps.transactions.models import Transaction, AutoBid
 from .serializers import AuctionSerializer, CategorySerializer, BidSerializer, AutoBidSerializer
 from apps.accounts.models import Wallet
+from apps.core.conditional import conditional
+from apps.core.fieldsets import requested_fields
+from . import etags, trending
+from .rows import bid_rows
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
@@ -33,17 +37,10 @@ class AuctionViewSet(viewsets.ModelViewSet):
 @permission_classes([permissions.AllowAny])
 def featured_auctions(request):
     """
-    Get a list of featured auctions (newest and with highest price)
+    Get a list of featured auctions (newest, or trending with ?sort=trending)
     """
     try:
-        # Get limit parameter, default to 3
-        limit = int(request.query_params.get('limit', 3))
-        
-        # Get newest auctions with highest current price
-        auctions = Auction.objects.filter(
-            status=Auction.STATUS_ACTIVE,  
-            end_time__gt=timezone.now()  
-        ).order_by('-created_at')[:limit]  
+        auctions = trending.featured_queryset(request.query_params)
         
         serializer = AuctionSerializer(auctions, many=True)
         
@@ -181,23 +178,16 @@ def disable_auto_bid(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@conditional(etags.public_auction)
 def auction_bids(request, auction_id):
     """Get bids for a specific auction - authenticated version"""
+    auction = get_object_or_404(Auction, id=auction_id)
     try:
-        auction = get_object_or_404(Auction, id=auction_id)
-        # Check if user is allowed to see bids
-        if auction.seller != request.user and not auction.is_public:
-            return Response({
-                'success': False,
-                'message': 'Not authorized to view these bids'
-            }, status=status.HTTP_403_FORBIDDEN)
-            
-        bids = Bid.objects.filter(auction=auction).order_by('-created_at')
-        serializer = BidSerializer(bids, many=True)
-        
+        bids = Bid.objects.filter(auction=auction).order_by('-timestamp')
+        fields = requested_fields(request.query_params, BidSerializer)
         return Response({
             'success': True,
-            'data': serializer.data
+            'data': bid_rows(bids, fields)
         })
     except Exception as e:
         return Response({
@@ -207,22 +197,17 @@ def auction_bids(request, auction_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@conditional(etags.public_auction)
 def public_auction_bids(request, auction_id):
     """Get bids for a public auction - no authentication required"""
+    auction = get_object_or_404(Auction, id=auction_id)
     try:
-        auction = get_object_or_404(Auction, id=auction_id, is_public=True)
-        bids = Bid.objects.filter(auction=auction).order_by('-created_at')
-        serializer = BidSerializer(bids, many=True)
-        
+        bids = Bid.objects.filter(auction=auction).order_by('-timestamp')
+        fields = requested_fields(request.query_params, BidSerializer)
         return Response({
             'success': True,
-            'data': serializer.data
+            'data': bid_rows(bids, fields)
         })
-    except Auction.DoesNotExist:
-        return Response({
-            'success': False,
-            'message': 'Auction not found or not public'
-        }, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         return Response({
             'success': False,
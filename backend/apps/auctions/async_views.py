@@ -0,0 +1,126 @@
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.async_views import async_api_response, async_read_view
+from apps.core.conditional import conditional
+from apps.core.fieldsets import requested_fields
+from . import etags, trending, view_counts
+from .facets import afacet_counts, filter_signature, wants_facets
+from .models import Auction
+from .serializers import AuctionSerializer, PrefetchedAuctionSerializer
+from .rows import aauction_rows
+from .services import aget_auction_context, with_bid_summary
+
+
+@async_read_view()
+async def auction_list(request):
+    """Async GET for AuctionViewSet.list; writes go to the viewset"""
+    user = request.api_user
+    if user.is_authenticated:
+        queryset = Auction.objects.filter(
+            Q(status=Auction.STATUS_ACTIVE) | Q(seller=user)
+        )
+    else:
+        queryset = Auction.objects.filter(status=Auction.STATUS_ACTIVE)
+
+    params = request.GET
+    if params.get("category"):
+        queryset = queryset.filter(item__category=params["category"])
+    if params.get("min_price"):
+        queryset = queryset.filter(starting_price__gte=params["min_price"])
+    if params.get("max_price"):
+        queryset = queryset.filter(starting_price__lte=params["max_price"])
+    if params.get("ending_soon", "").lower() == "true":
+        end_soon_threshold = timezone.now() + timezone.timedelta(hours=24)
+        queryset = queryset.filter(end_time__lte=end_soon_threshold)
+
+    fields = requested_fields(params, AuctionSerializer)
+    data = await aauction_rows(queryset, user, fields)
+    body = {"success": True, "data": {"auctions": data, "count": len(data)}}
+    if wants_facets(params):
+        signature = filter_signature(params, "list", user.id)
+        body["facets"] = await afacet_counts(queryset, signature)
+    return async_api_response(data=body, raw=True)
+
+
+@async_read_view(auth_required=True)
+async def search_auctions(request):
+    """Async version of views.search_auctions"""
+    queryset = Auction.objects.filter(status=Auction.STATUS_ACTIVE)
+    params = request.GET
+
+    search = params.get("search")
+    if search:
+        queryset = queryset.filter(
+            Q(title__icontains=search)
+            | Q(description__icontains=search)
+            | Q(item__name__icontains=search)
+            | Q(item__description__icontains=search)
+        )
+    if params.get("category"):
+        queryset = queryset.filter(item__category=params["category"])
+    if params.get("min_price"):
+        queryset = queryset.filter(starting_price__gte=params["min_price"])
+    if params.get("max_price"):
+        queryset = queryset.filter(starting_price__lte=params["max_price"])
+
+    ordering = {
+        "newest": "-created_at",
+        "ending_soon": "end_time",
+        "price_low": "starting_price",
+        "price_high": "-starting_price",
+    }.get(params.get("sort", "newest"))
+    if ordering:
+        queryset = queryset.order_by(ordering)
+
+    fields = requested_fields(params, AuctionSerializer)
+    data = await aauction_rows(queryset, request.api_user, fields)
+    if not wants_facets(params):
+        return async_api_response(
+            data=data, message="Search results retrieved successfully"
+        )
+    facets = await afacet_counts(queryset, filter_signature(params, "search"))
+    return async_api_response(
+        data={
+            "success": True,
+            "message": "Search results retrieved successfully",
+            "data": data,
+            "facets": facets,
+        },
+        raw=True,
+    )
+
+
+@async_read_view()
+@conditional(etags.afeatured_auctions)
+async def featured_auctions(request):
+    """Async version of views.featured_auctions"""
+    try:
+        queryset = trending.featured_queryset(request.GET)
+    except ValueError as e:
+        return async_api_response(success=False, message=str(e), status=400)
+
+    fields = requested_fields(request.GET, AuctionSerializer)
+    data = await aauction_rows(queryset, fields=fields)
+    return async_api_response(data={"success": True, "data": data}, raw=True)
+
+
+@async_read_view()
+@conditional(etags.apublic_auction_detail)
+async def public_auction_detail(request, auction_id):
+    """Async version of views.public_auction_detail"""
+    fields = requested_fields(request.GET, AuctionSerializer)
+    queryset = with_bid_summary(Auction.objects.filter(id=auction_id), fields)
+    auction = await queryset.afirst()
+    if auction is None:
+        return async_api_response(
+            data={"detail": "Auction not found"}, status=404, raw=True
+        )
+    await view_counts.arecord_view(
+        auction.id, view_counts.viewer_key(request, request.api_user)
+    )
+
+    context = await aget_auction_context([auction], fields=fields)
+    return async_api_response(
+        data=PrefetchedAuctionSerializer(auction, context=context).data, raw=True
+    )
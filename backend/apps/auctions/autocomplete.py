@@ -0,0 +1,506 @@
+"""
+Search-as-you-type suggestions for auctions and categories
+
+Active auctions (by title and item name) and categories are indexed under
+every word suffix of their normalized names, so "brass desk lamp" is found
+by "bra", "desk l" and "lamp". Terms are kept in lexicographic order, which
+makes a prefix a range lookup. The matches in the range are ranked by
+popularity: bids and watchers for an auction, active auctions for a
+category.
+
+With AUTOCOMPLETE_REDIS_URL the index is a Redis sorted set shared by every
+worker and read with ZRANGEBYLEX. Saves and deletes write through to it
+once their transaction commits (see signals.py). It is built from the
+database by the rebuild_autocomplete_index task or ``manage.py
+rebuild_autocomplete``, never in a request; changes written through
+meanwhile are journaled and replayed over the rebuilt copy
+(apps/core/redis_journal.py). Until Redis has a complete copy, or while it
+is unreachable, suggestions come from a query of the matching names,
+bounded like the index's (accents must match there). Without Redis, each
+process answers from its own sorted list, rebuilt every
+AUTOCOMPLETE_LOCAL_TTL seconds.
+"""
+
+import bisect
+import logging
+import time
+import unicodedata
+from functools import partial
+
+import orjson
+import redis
+from django.conf import settings
+from django.db.models import Count, Q
+
+from apps.core import redis_journal
+from .models import Auction, Category
+
+logger = logging.getLogger(__name__)
+
+TERMS_KEY = "autocomplete:terms"
+ENTRIES_KEY = "autocomplete:entries"
+SCORES_KEY = "autocomplete:scores"
+INDEX_KEYS = (TERMS_KEY, ENTRIES_KEY, SCORES_KEY)
+READY_KEY = "autocomplete:ready"
+REBUILD_LOCK_KEY = "autocomplete:rebuild"
+JOURNAL_KEY = "autocomplete:journal"
+REBUILD_BATCH_SIZE = 5000
+REBUILD_TIMEOUT = 300
+
+# Matches in the prefix range ranked per query
+CANDIDATES = 100
+MAX_SUGGESTIONS = 20
+# Words of a name starting an indexed suffix, and the longest term kept
+MAX_WORDS = 8
+MAX_TERM_LENGTH = 64
+
+# Between a term and its entry's key in the sorted set members; sorts
+# before any character of a term
+_SEPARATOR = "\x00"
+_LAST_CHAR = chr(0x10FFFF)
+
+_client = None
+_local = None
+
+
+def normalize(text):
+    """Lower-cased words of ``text`` without accents or punctuation"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = "".join(char if char.isalnum() else " " for char in text.casefold())
+    return " ".join(text.split())
+
+
+def _terms(*names):
+    terms = set()
+    for name in names:
+        words = normalize(name).split()
+        for start in range(min(len(words), MAX_WORDS)):
+            terms.add(" ".join(words[start:])[:MAX_TERM_LENGTH])
+    return sorted(terms)
+
+
+def _member(term, key):
+    return f"{term}{_SEPARATOR}{key}"
+
+
+def _members(key, entry):
+    """Sorted set members for an entry's terms, with score 0"""
+    return {_member(term, key): 0 for term in entry["terms"]}
+
+
+def _auction_key(auction_id):
+    return f"auction:{auction_id}"
+
+
+def _category_key(category_id):
+    return f"category:{category_id}"
+
+
+def _auction_entry(auction_id, title, item_name, category_id):
+    return {
+        "type": "auction",
+        "id": str(auction_id),
+        "label": title,
+        "category": _category_key(category_id),
+        "terms": _terms(title, item_name),
+    }
+
+
+def _category_entry(category_id, name):
+    return {
+        "type": "category",
+        "id": str(category_id),
+        "label": name,
+        "terms": _terms(name),
+    }
+
+
+def _load():
+    """Every entry with its popularity, from the database"""
+    auctions = (
+        Auction.objects.filter(status=Auction.STATUS_ACTIVE)
+        .annotate(
+            popularity=Count("bids", distinct=True) + Count("watchers", distinct=True)
+        )
+        .values_list("id", "title", "item__name", "item__category_id", "popularity")
+        .order_by()
+    )
+    for auction_id, title, item_name, category_id, popularity in auctions.iterator(
+        chunk_size=REBUILD_BATCH_SIZE
+    ):
+        entry = _auction_entry(auction_id, title, item_name, category_id)
+        yield _auction_key(auction_id), entry, popularity
+
+    categories = Category.objects.annotate(
+        popularity=Count(
+            "items__auction",
+            filter=Q(items__auction__status=Auction.STATUS_ACTIVE),
+        )
+    ).values_list("id", "name", "popularity")
+    for category_id, name, popularity in categories:
+        entry = _category_entry(category_id, name)
+        yield _category_key(category_id), entry, popularity
+
+
+def _name_pattern(prefix):
+    """
+    Postgres regex for names with a word run starting with the normalized
+    ``prefix``, which has only alphanumerics and single spaces
+    """
+    return r"(^|[^[:alnum:]])" + r"[^[:alnum:]]+".join(prefix.split())
+
+
+def _database_search(prefix, limit):
+    """Entries matching ``prefix``, queried from the database"""
+    pattern = _name_pattern(prefix)
+    auctions = (
+        Auction.objects.filter(status=Auction.STATUS_ACTIVE)
+        .filter(Q(title__iregex=pattern) | Q(item__name__iregex=pattern))
+        .annotate(
+            popularity=Count("bids", distinct=True) + Count("watchers", distinct=True)
+        )
+        .values_list("id", "title", "item__name", "item__category_id", "popularity")
+        .order_by("-popularity")[:CANDIDATES]
+    )
+    categories = (
+        Category.objects.filter(name__iregex=pattern)
+        .annotate(
+            popularity=Count(
+                "items__auction",
+                filter=Q(items__auction__status=Auction.STATUS_ACTIVE),
+            )
+        )
+        .values_list("id", "name", "popularity")
+        .order_by("-popularity")[:CANDIDATES]
+    )
+    found = [
+        (_auction_entry(auction_id, title, item_name, category_id), popularity)
+        for auction_id, title, item_name, category_id, popularity in auctions
+    ] + [
+        (_category_entry(category_id, name), popularity)
+        for category_id, name, popularity in categories
+    ]
+    # The regex is looser than the index's terms (word count, casefolding)
+    found = [
+        (entry, popularity)
+        for entry, popularity in found
+        if any(term.startswith(prefix) for term in entry["terms"])
+    ]
+    return _rank(
+        [entry for entry, _ in found], [popularity for _, popularity in found], limit
+    )
+
+
+def _rank(entries, scores, limit):
+    found = [
+        (score or 0, entry)
+        for entry, score in zip(entries, scores)
+        if entry is not None
+    ]
+    # Most popular, then shortest
+    found.sort(key=lambda pair: (-pair[0], len(pair[1]["label"]), pair[1]["label"]))
+    return [
+        {"type": entry["type"], "id": entry["id"], "label": entry["label"]}
+        for _, entry in found[:limit]
+    ]
+
+
+class _RedisIndex:
+    """
+    The shared index: terms in a sorted set, entries and scores by key
+
+    Under INDEX_KEYS, or the staging keys of a rebuild.
+    """
+
+    def __init__(self, client, keys=INDEX_KEYS):
+        self.client = client
+        self.terms_key, self.entries_key, self.scores_key = keys
+
+    def search(self, prefix, limit):
+        members = self.client.zrangebylex(
+            self.terms_key,
+            f"[{prefix}",
+            f"[{prefix}{_LAST_CHAR}",
+            start=0,
+            num=CANDIDATES,
+        )
+        keys = list(dict.fromkeys(m.rpartition(_SEPARATOR)[2] for m in members))
+        if not keys:
+            return []
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.hmget(self.entries_key, keys)
+        pipeline.zmscore(self.scores_key, keys)
+        entries, scores = pipeline.execute()
+        entries = [orjson.loads(entry) if entry else None for entry in entries]
+        return _rank(entries, scores, limit)
+
+    def _remove_terms(self, pipeline, key, entry):
+        if entry["terms"]:
+            pipeline.zrem(self.terms_key, *_members(key, entry))
+
+    def put(self, entries):
+        keys = list(entries)
+        old = self.client.hmget(self.entries_key, keys)
+        pipeline = self.client.pipeline()
+        for key, previous in zip(keys, old):
+            entry = entries[key]
+            if previous:
+                self._remove_terms(pipeline, key, orjson.loads(previous))
+            elif entry.get("category"):
+                pipeline.zadd(self.scores_key, {entry["category"]: 1}, xx=True, incr=True)
+            if entry["terms"]:
+                pipeline.zadd(self.terms_key, _members(key, entry))
+            pipeline.hset(self.entries_key, key, orjson.dumps(entry))
+            pipeline.zadd(self.scores_key, {key: 0}, nx=True)
+        pipeline.execute()
+
+    def delete(self, keys):
+        old = self.client.hmget(self.entries_key, keys)
+        pipeline = self.client.pipeline()
+        for key, previous in zip(keys, old):
+            if not previous:
+                continue
+            previous = orjson.loads(previous)
+            self._remove_terms(pipeline, key, previous)
+            if previous.get("category"):
+                pipeline.zadd(
+                    self.scores_key, {previous["category"]: -1}, xx=True, incr=True
+                )
+        pipeline.hdel(self.entries_key, *keys)
+        pipeline.zrem(self.scores_key, *keys)
+        pipeline.execute()
+
+    def bump(self, key, amount):
+        # Only indexed entries have a score
+        self.client.zadd(self.scores_key, {key: amount}, xx=True, incr=True)
+
+
+class _LocalIndex:
+    """A process's own index: a sorted list of the same members"""
+
+    def __init__(self, rows):
+        self.built_at = time.monotonic()
+        self.entries = {}
+        self.scores = {}
+        members = []
+        for key, entry, popularity in rows:
+            self.entries[key] = entry
+            self.scores[key] = popularity
+            members.extend(_member(term, key) for term in entry["terms"])
+        self.members = sorted(members)
+
+    @property
+    def expired(self):
+        return time.monotonic() - self.built_at > settings.AUTOCOMPLETE_LOCAL_TTL
+
+    def search(self, prefix, limit):
+        keys = {}
+        start = bisect.bisect_left(self.members, prefix)
+        for member in self.members[start:start + CANDIDATES]:
+            if not member.startswith(prefix):
+                break
+            keys[member.rpartition(_SEPARATOR)[2]] = None
+        entries = [self.entries.get(key) for key in keys]
+        scores = [self.scores.get(key) for key in keys]
+        return _rank(entries, scores, limit)
+
+    def _remove_terms(self, key, entry):
+        for term in entry["terms"]:
+            member = _member(term, key)
+            index = bisect.bisect_left(self.members, member)
+            if index < len(self.members) and self.members[index] == member:
+                del self.members[index]
+
+    def put(self, entries):
+        for key, entry in entries.items():
+            previous = self.entries.get(key)
+            if previous:
+                self._remove_terms(key, previous)
+            elif entry.get("category"):
+                self.bump(entry["category"], 1)
+            for term in entry["terms"]:
+                bisect.insort(self.members, _member(term, key))
+            self.entries[key] = entry
+            self.scores.setdefault(key, 0)
+
+    def delete(self, keys):
+        for key in keys:
+            previous = self.entries.pop(key, None)
+            self.scores.pop(key, None)
+            if previous:
+                self._remove_terms(key, previous)
+                if previous.get("category"):
+                    self.bump(previous["category"], -1)
+
+    def bump(self, key, amount):
+        if key in self.scores:
+            self.scores[key] += amount
+
+
+def get_client():
+    """Redis client for the shared index, or None if it is disabled"""
+    global _client
+    if _client is None and settings.AUTOCOMPLETE_REDIS_URL:
+        # Short timeouts so an unreachable Redis falls back to the database
+        # instead of stalling requests
+        _client = redis.Redis.from_url(
+            settings.AUTOCOMPLETE_REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5,
+        )
+    return _client
+
+
+def _local_index():
+    global _local
+    if _local is None or _local.expired:
+        _local = _LocalIndex(_load())
+    return _local
+
+
+def rebuild(client=None):
+    """
+    Reload the index from the database: the shared one if Redis is
+    configured, else this process's
+
+    Returns:
+        bool - False if another process is already rebuilding the shared
+        index, or the rebuild outlasted its journal
+    """
+    global _local
+    client = client or get_client()
+    if client is None:
+        _local = _LocalIndex(_load())
+        return True
+
+    lock = client.lock(REBUILD_LOCK_KEY, timeout=REBUILD_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return False
+    try:
+        # Built under temporary keys and swapped in at once, so searches
+        # keep the previous copy meanwhile
+        staging = tuple(f"{key}:staging" for key in INDEX_KEYS)
+        client.delete(*staging)
+        redis_journal.start(client, JOURNAL_KEY, REBUILD_TIMEOUT)
+        pipeline = client.pipeline(transaction=False)
+        terms_key, entries_key, scores_key = staging
+        for count, (key, entry, popularity) in enumerate(_load(), start=1):
+            if entry["terms"]:
+                pipeline.zadd(terms_key, _members(key, entry))
+            pipeline.hset(entries_key, key, orjson.dumps(entry))
+            pipeline.zadd(scores_key, {key: popularity})
+            if count % REBUILD_BATCH_SIZE == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        def swap(pipeline):
+            for key, staged in zip(INDEX_KEYS, staging):
+                pipeline.delete(key)
+                # RENAME fails on a missing key, i.e. an empty index
+                if client.exists(staged):
+                    pipeline.rename(staged, key)
+            pipeline.set(READY_KEY, 1)
+
+        return redis_journal.replay(
+            client, JOURNAL_KEY, partial(_replay, _RedisIndex(client, staging)), swap
+        )
+    finally:
+        lock.release()
+
+
+def _replay(index, changes):
+    for method, args in changes:
+        getattr(index, method)(*args)
+
+
+def _write(method, *args):
+    """Apply a change to the shared index and this process's copy"""
+    if _local is not None:
+        getattr(_local, method)(*args)
+
+    client = get_client()
+    if client is None:
+        return
+    try:
+        # Journaled first, so a rebuild swapping its copy in meanwhile
+        # replays it. It may then reach the new copy twice: harmless but for
+        # a bump, counted twice.
+        redis_journal.record(client, JOURNAL_KEY, [method, args])
+        # A missing copy is the next rebuild's to fill in
+        if client.exists(READY_KEY):
+            getattr(_RedisIndex(client), method)(*args)
+    except redis.RedisError:
+        logger.warning("Autocomplete index write-through failed", exc_info=True)
+        try:
+            client.delete(READY_KEY)
+        except redis.RedisError:
+            pass
+
+
+def index_auctions(auctions):
+    """
+    Add active auctions to the index and remove the others
+
+    Args:
+        auctions: Auction instances; their item is read for its name
+    """
+    entries = {}
+    removed = []
+    for auction in auctions:
+        key = _auction_key(auction.id)
+        if auction.status == Auction.STATUS_ACTIVE:
+            entries[key] = _auction_entry(
+                auction.id, auction.title, auction.item.name, auction.item.category_id
+            )
+        else:
+            removed.append(key)
+    if entries:
+        _write("put", entries)
+    if removed:
+        _write("delete", removed)
+
+
+def remove_auction(auction_id):
+    _write("delete", [_auction_key(auction_id)])
+
+
+def index_category(category):
+    entry = _category_entry(category.id, category.name)
+    _write("put", {_category_key(category.id): entry})
+
+
+def remove_category(category_id):
+    _write("delete", [_category_key(category_id)])
+
+
+def bump_auction(auction_id, amount=1):
+    """Count a bid or watch (negative for an unwatch) towards popularity"""
+    _write("bump", _auction_key(auction_id), amount)
+
+
+def suggest(prefix, limit=10):
+    """
+    Auctions and categories with a word starting with ``prefix``, most
+    popular first
+
+    Returns:
+        list of dicts with the ``type`` ("auction" or "category"), ``id``
+        and ``label``
+    """
+    prefix = normalize(prefix)
+    if not prefix:
+        return []
+    limit = min(limit, MAX_SUGGESTIONS)
+    client = get_client()
+    if client is None:
+        return _local_index().search(prefix, limit)
+    try:
+        if client.exists(READY_KEY):
+            return _RedisIndex(client).search(prefix, limit)
+    except redis.RedisError:
+        logger.warning(
+            "Autocomplete index unavailable, searching the database", exc_info=True
+        )
+    return _database_search(prefix, limit)
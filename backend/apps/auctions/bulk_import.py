@@ -0,0 +1,309 @@
+"""
+Bulk auction import for sellers
+
+A CSV or JSON Lines file describes one item and its auction per row. Rows
+are validated BULK_IMPORT_BATCH_SIZE at a time by a single serializer
+instance and Auction.clean() on unsaved instances, so validation costs no
+queries; categories named anywhere in the file are looked up once; each
+batch's items and auctions are written with two bulk_create() calls. As
+bulk_create() skips post_save, the seller gets one notification for the
+whole import instead of one per auction, and each batch is indexed and
+queued for percolation against saved searches and for image ingestion
+explicitly.
+
+Invalid rows are reported with their errors and don't stop the others.
+"""
+
+import csv
+import io
+import time
+from functools import partial
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ValidationError as ModelValidationError
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.notifications.models import Notification
+from apps.notifications.services import create_notification
+from . import autocomplete
+from .models import Auction, Category, Item
+from .tasks import ingest_item_images, percolate_auctions
+
+FORMATS = ("csv", "jsonl")
+# Separates the image URLs of a CSV cell
+CSV_LIST_SEPARATOR = "|"
+
+
+class ImportFileError(ValueError):
+    """The file as a whole can't be imported"""
+
+
+class ImportRowSerializer(serializers.Serializer):
+    """One row of an import file: an item and its auction"""
+
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField()
+    category = serializers.CharField(max_length=100)
+    starting_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    min_bid_increment = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False
+    )
+    reserve_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False, allow_null=True
+    )
+    buy_now_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False, allow_null=True
+    )
+    start_time = serializers.DateTimeField(required=False)
+    end_time = serializers.DateTimeField()
+    auction_type = serializers.ChoiceField(
+        choices=Auction.TYPE_CHOICES, default=Auction.TYPE_STANDARD
+    )
+    item_name = serializers.CharField(max_length=255, required=False)
+    item_description = serializers.CharField(required=False)
+    image_urls = serializers.ListField(
+        child=serializers.URLField(), required=False, default=list
+    )
+    weight = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    dimensions = serializers.CharField(
+        max_length=100, required=False, allow_null=True
+    )
+
+
+def _csv_rows(upload):
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    try:
+        for row in csv.DictReader(text):
+            # Empty cells are missing values
+            row = {key: value for key, value in row.items() if key and value}
+            if "image_urls" in row:
+                row["image_urls"] = [
+                    url.strip()
+                    for url in row["image_urls"].split(CSV_LIST_SEPARATOR)
+                    if url.strip()
+                ]
+            yield row
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f"Unreadable CSV: {exc}") from exc
+    finally:
+        text.detach()
+
+
+def _jsonl_rows(upload):
+    for line in upload:
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            row = None
+        # Rejected by validation with the row's number
+        yield row if isinstance(row, dict) else None
+
+
+def read_rows(upload, file_format):
+    """
+    The rows of an uploaded file, as dicts (None for a JSONL line that
+    isn't a JSON object)
+
+    Raises:
+        ImportFileError: unknown format, unreadable file or more than
+            BULK_IMPORT_MAX_ROWS rows
+    """
+    if file_format not in FORMATS:
+        raise ImportFileError(
+            f"Unknown format '{file_format}', expected one of: {', '.join(FORMATS)}"
+        )
+    reader = _csv_rows if file_format == "csv" else _jsonl_rows
+    rows = []
+    for row in reader(upload):
+        if len(rows) == settings.BULK_IMPORT_MAX_ROWS:
+            raise ImportFileError(
+                f"More than {settings.BULK_IMPORT_MAX_ROWS} rows in one import"
+            )
+        rows.append(row)
+    return rows
+
+
+def resolve_categories(names):
+    """Category per lower-cased name, in one query"""
+    keys = {name.strip().lower() for name in names}
+    categories = {}
+    for category in Category.objects.annotate(key=Lower("name")).filter(
+        key__in=keys
+    ):
+        # Names aren't unique: the first by name ordering wins
+        categories.setdefault(category.key, category)
+    return categories
+
+
+def _message_errors(message):
+    return {"non_field_errors": [message]}
+
+
+def _build(row, seller, categories, now):
+    """
+    Unsaved Item and Auction for a validated row
+
+    Raises:
+        django.core.exceptions.ValidationError: the auction breaks a model rule
+    """
+    category = categories.get(row["category"].strip().lower())
+    if category is None:
+        raise ModelValidationError(
+            {"category": [f"Unknown category '{row['category']}'"]}
+        )
+
+    item = Item(
+        name=row.get("item_name", row["title"]),
+        description=row.get("item_description", row["description"]),
+        category=category,
+        owner=seller,
+        image_urls=row["image_urls"],
+        weight=row.get("weight"),
+        dimensions=row.get("dimensions"),
+    )
+    auction = Auction(
+        item=item,
+        seller=seller,
+        title=row["title"],
+        description=row["description"],
+        starting_price=row["starting_price"],
+        reserve_price=row.get("reserve_price"),
+        buy_now_price=row.get("buy_now_price"),
+        start_time=row.get("start_time", now),
+        end_time=row["end_time"],
+        auction_type=row["auction_type"],
+    )
+    if "min_bid_increment" in row:
+        auction.min_bid_increment = row["min_bid_increment"]
+    if "start_time" not in row:
+        # Starts now: not subject to the past start time rule of drafts
+        auction.status = auction.initial_status(now)
+    auction.clean()
+    # bulk_create() bypasses Auction.save()
+    auction.status = auction.initial_status(now)
+    return item, auction
+
+
+def _validate_batch(serializer, batch, seller, categories, now, errors):
+    """(row number, item, auction) for the valid rows of a batch"""
+    valid = []
+    for number, data in batch:
+        if data is None:
+            error = _message_errors("Not a JSON object")
+            errors.append({"row": number, "errors": error})
+            continue
+        try:
+            row = serializer.run_validation(data)
+            item, auction = _build(row, seller, categories, now)
+        except serializers.ValidationError as exc:
+            errors.append({"row": number, "errors": exc.detail})
+        except ModelValidationError as exc:
+            messages = {
+                field: [str(message) for message in field_messages]
+                for field, field_messages in exc.message_dict.items()
+            }
+            errors.append({"row": number, "errors": messages})
+        else:
+            valid.append((number, item, auction))
+    return valid
+
+
+def _plural(count, noun):
+    return f"{count} {noun}{'s' if count != 1 else ''}"
+
+
+def _summary(created, failed, source):
+    summary = f"{_plural(created, 'auction')} imported"
+    if source:
+        summary += f" from {source}"
+    if failed:
+        summary += f", {_plural(failed, 'row')} rejected"
+    return summary + "."
+
+
+def import_auctions(seller, rows, source=""):
+    """
+    Create an item and an auction owned by ``seller`` for every valid row
+
+    Args:
+        seller: the User importing
+        rows: list of dicts, from read_rows()
+        source: name of the file, for the notification
+
+    Returns:
+        dict with the ``total``, ``created`` and ``failed`` row counts,
+        per-row ``errors`` (1-based row numbers, data rows only), ``seconds``
+        and ``rows_per_second``
+    """
+    started = time.perf_counter()
+    now = timezone.now()
+    categories = resolve_categories(
+        row["category"]
+        for row in rows
+        if isinstance(row, dict) and isinstance(row.get("category"), str)
+    )
+
+    serializer = ImportRowSerializer()
+    size = settings.BULK_IMPORT_BATCH_SIZE
+    numbered = list(enumerate(rows, start=1))
+    created = 0
+    errors = []
+    for start in range(0, len(numbered), size):
+        batch = numbered[start:start + size]
+        valid = _validate_batch(serializer, batch, seller, categories, now, errors)
+        if not valid:
+            continue
+        try:
+            with transaction.atomic():
+                Item.objects.bulk_create([item for _, item, _ in valid])
+                auctions = Auction.objects.bulk_create(
+                    [auction for _, _, auction in valid]
+                )
+                # bulk_create() sends no post_save for signals.py
+                transaction.on_commit(
+                    partial(autocomplete.index_auctions, auctions), robust=True
+                )
+                transaction.on_commit(
+                    partial(percolate_auctions.delay, [a.id for a in auctions]),
+                    robust=True,
+                )
+                for _, item, _ in valid:
+                    if item.image_urls:
+                        transaction.on_commit(
+                            partial(ingest_item_images.delay, item.id), robust=True
+                        )
+        except DatabaseError as exc:
+            errors.extend(
+                {"row": number, "errors": _message_errors(f"Not saved: {exc}")}
+                for number, _, _ in valid
+            )
+            continue
+        created += len(valid)
+    errors.sort(key=lambda error: error["row"])
+
+    if created:
+        create_notification(
+            recipient=seller,
+            notification_type=Notification.TYPE_NEW_AUCTION,
+            title="Your auctions have been imported",
+            message=_summary(created, len(errors), source),
+            priority=Notification.PRIORITY_MEDIUM,
+        )
+
+    seconds = time.perf_counter() - started
+    return {
+        "total": len(rows),
+        "created": created,
+        "failed": len(errors),
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(len(rows) / seconds, 1) if seconds else None,
+    }
@@ -0,0 +1,240 @@
+"""
+ETag / Last-Modified validators for the auction read endpoints
+
+Each reads Auction.version and changed_at (kept current by the database,
+see migration 0014) with one primary-key or index lookup, so a matching
+If-None-Match is answered without loading or serializing anything. For use
+with apps.core.conditional.conditional.
+
+The version doesn't cover time_remaining, which changes with the clock.
+Representations with an active auction's countdown also carry the current
+ETAG_COUNTDOWN_SECONDS period in their validators, so a 304 never keeps a
+countdown later than that; clients leaving time_remaining out of
+``?fields=`` get no such period.
+"""
+
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.models import CharField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast
+
+from apps.core.conditional import version_etag
+from apps.core.fieldsets import requested_fields
+from apps.transactions.models import AutoBid
+from . import trending, watchlist
+from .models import Auction, StatsSketch
+from .serializers import AuctionSerializer
+
+VERSION_FIELDS = ("version", "changed_at")
+COUNTDOWN_FIELDS = (*VERSION_FIELDS, "status")
+
+
+def _auction_id(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _versions(auction_id, *filters, fields=VERSION_FIELDS, queryset=None):
+    auction_id = _auction_id(auction_id)
+    if auction_id is None:
+        return None
+    queryset = Auction.objects.all() if queryset is None else queryset
+    return queryset.filter(*filters, id=auction_id).values_list(*fields).first()
+
+
+def _countdown_period():
+    """The current ETAG_COUNTDOWN_SECONDS period, and when it started"""
+    step = settings.ETAG_COUNTDOWN_SECONDS
+    period = int(time.time()) // step
+    return f"t{period}", datetime.fromtimestamp(period * step, tz=timezone.utc)
+
+
+def _counts_down(request):
+    """Whether the response renders time_remaining"""
+    return "time_remaining" in requested_fields(request.GET, AuctionSerializer)
+
+
+def _with_countdown(parts, changed_at, status, counts_down=True):
+    """
+    ETag and Last-Modified of an auction representation, with the countdown
+    period while the auction is active and time_remaining is rendered
+    """
+    if counts_down and status == Auction.STATUS_ACTIVE:
+        period, started = _countdown_period()
+        return version_etag(*parts, period), max(changed_at, started)
+    return version_etag(*parts), changed_at
+
+
+def _visible(user):
+    visible = Q(status=Auction.STATUS_ACTIVE)
+    if user.is_authenticated:
+        visible |= Q(seller=user)
+    return visible
+
+
+def auction_detail(request, pk=None):
+    """AuctionViewSet.retrieve, whose is_watched depends on the user"""
+    user = request.user
+    row = _versions(pk, _visible(user), fields=COUNTDOWN_FIELDS)
+    if row is None:
+        return None
+    version, changed_at, status = row
+    watched = user.is_authenticated and watchlist.is_watching(user.id, pk)
+    return _with_countdown(
+        (pk, version, "w1" if watched else "w0"),
+        changed_at,
+        status,
+        _counts_down(request),
+    )
+
+
+def auction_page(request, pk=None):
+    """
+    AuctionViewSet.page, which adds the user's watch and autobid (not
+    covered by the auction's version)
+    """
+    user = request.user
+    if not user.is_authenticated:
+        row = _versions(pk, _visible(user), fields=COUNTDOWN_FIELDS)
+        if row is None:
+            return None
+        version, changed_at, status = row
+        return _with_countdown((pk, version), changed_at, status)
+
+    autobid = AutoBid.objects.filter(user=user, auction=OuterRef("pk"))
+    row = _versions(
+        pk,
+        _visible(user),
+        fields=(*COUNTDOWN_FIELDS, "autobid_at"),
+        queryset=Auction.objects.annotate(
+            autobid_at=Subquery(autobid.values("updated_at")[:1])
+        ),
+    )
+    if row is None:
+        return None
+    version, changed_at, status, autobid_at = row
+    watched = watchlist.is_watching(user.id, pk)
+    autobid_tag = f"a{int(autobid_at.timestamp() * 1e6)}" if autobid_at else "a0"
+    return _with_countdown(
+        (pk, version, "w1" if watched else "w0", autobid_tag),
+        max(changed_at, autobid_at) if autobid_at else changed_at,
+        status,
+    )
+
+
+def public_auction(request, auction_id):
+    """The auction's bid listings and price history"""
+    row = _versions(auction_id)
+    if row is None:
+        return None
+    version, changed_at = row
+    return version_etag(auction_id, version), changed_at
+
+
+def public_auction_detail(request, auction_id):
+    """public_auction_detail, with the auction's countdown"""
+    row = _versions(auction_id, fields=COUNTDOWN_FIELDS)
+    if row is None:
+        return None
+    version, changed_at, status = row
+    return _with_countdown(
+        (auction_id, version), changed_at, status, _counts_down(request)
+    )
+
+
+async def apublic_auction_detail(request, auction_id):
+    auction_id = _auction_id(auction_id)
+    if auction_id is None:
+        return None
+    row = (
+        await Auction.objects.filter(id=auction_id)
+        .values_list(*COUNTDOWN_FIELDS)
+        .afirst()
+    )
+    if row is None:
+        return None
+    version, changed_at, status = row
+    return _with_countdown(
+        (auction_id, version), changed_at, status, _counts_down(request)
+    )
+
+
+def auction_stats(request, auction_id):
+    """
+    auction_stats, which adds the bid history for the seller and admins
+
+    Its statistics come from the auction's analytics sketch plus its bids
+    still queued for it: new bids bump the version, and the sketch's update
+    time is part of the validators too.
+    """
+    sketch_updated_at = StatsSketch.objects.filter(
+        scope=StatsSketch.SCOPE_AUCTION, key=Cast(OuterRef("id"), CharField())
+    ).values("updated_at")[:1]
+    row = _versions(
+        auction_id,
+        fields=("seller_id", "sketch_updated_at", *COUNTDOWN_FIELDS),
+        queryset=Auction.objects.annotate(
+            sketch_updated_at=Subquery(sketch_updated_at)
+        ),
+    )
+    if row is None:
+        return None
+    seller_id, sketch_updated_at, version, changed_at, status = row
+    full = seller_id == request.user.id or request.user.role == "admin"
+    return _with_countdown(
+        (
+            auction_id,
+            version,
+            sketch_updated_at.timestamp() if sketch_updated_at else 0,
+            "full" if full else "basic",
+        ),
+        max(filter(None, (changed_at, sketch_updated_at))),
+        status,
+    )
+
+
+def _featured_queryset(request):
+    try:
+        return trending.featured_queryset(request.GET)
+    except ValueError:
+        return None
+
+
+def _featured_validators(request, rows):
+    digest = hashlib.blake2b(digest_size=12)
+    for auction_id, version in rows:
+        digest.update(f"{auction_id}.{version};".encode())
+    parts = ["featured", digest.hexdigest()]
+    # Only active auctions are featured
+    if rows and _counts_down(request):
+        parts.append(_countdown_period()[0])
+    # No Last-Modified: an auction leaving the page changes it without any
+    # listed auction changing
+    return version_etag(*parts), None
+
+
+def featured_auctions(request):
+    """
+    featured_auctions: the page changes when any listed auction does or
+    when the set of auctions changes
+    """
+    queryset = _featured_queryset(request)
+    if queryset is None:
+        return None
+    return _featured_validators(
+        request, list(queryset.values_list("id", "version"))
+    )
+
+
+async def afeatured_auctions(request):
+    queryset = _featured_queryset(request)
+    if queryset is None:
+        return None
+    rows = [row async for row in queryset.values_list("id", "version")]
+    return _featured_validators(request, rows)
@@ -0,0 +1,182 @@
+"""
+Facet counts for auction browsing
+
+With ``?facets=true`` the auction list and search endpoints return, next to
+their results, how many of the matching auctions fall in each category,
+starting price band, auction type and ending-soon window. All facets come
+from one GROUPING SETS query over the filtered queryset, and are cached for
+AUCTION_FACET_CACHE_TTL seconds under the filter parameters (and the user
+when the results depend on them), so paging or re-sorting the same search
+doesn't recount.
+
+Counts are for the current filters, including the facet's own: with a
+category selected, the category facet lists only that category.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from drf_yasg import openapi
+
+from .models import Auction
+
+FACETS_PARAM = "facets"
+# Query params that change which auctions match, hence the counts
+FILTER_PARAMS = ("search", "category", "min_price", "max_price", "ending_soon")
+# Upper bounds of the starting price bands; the last band is open-ended
+PRICE_BANDS = (25, 50, 100, 250, 500, 1000)
+ENDING_WINDOWS = (
+    ("1h", timedelta(hours=1)),
+    ("24h", timedelta(hours=24)),
+    ("7d", timedelta(days=7)),
+)
+
+def wants_facets(params):
+    return params.get(FACETS_PARAM, "").lower() == "true"
+
+
+def filter_signature(params, *scope):
+    """
+    Cache key for the facets of a filter set
+
+    Args:
+        params: request.query_params or request.GET
+        scope: anything else the matching auctions depend on (the view,
+            the user for results including their own auctions)
+    """
+    filters = sorted(
+        (name, params[name]) for name in FILTER_PARAMS if params.get(name)
+    )
+    digest = hashlib.blake2b(repr((scope, filters)).encode(), digest_size=16)
+    return f"auction-facets:{digest.hexdigest()}"
+
+
+def _facet_values(queryset, now):
+    price_band = Case(
+        *(
+            When(starting_price__lt=bound, then=Value(band))
+            for band, bound in enumerate(PRICE_BANDS)
+        ),
+        default=Value(len(PRICE_BANDS)),
+        output_field=IntegerField(),
+    )
+    # Disjoint windows, summed into "ending within" counts afterwards
+    ending_window = Case(
+        When(end_time__lte=now, then=Value(None)),
+        *(
+            When(end_time__lte=now + length, then=Value(window))
+            for window, (_, length) in enumerate(ENDING_WINDOWS)
+        ),
+        default=Value(None),
+        output_field=IntegerField(),
+    )
+    return queryset.order_by().values(
+        category=F("item__category_id"),
+        category_name=F("item__category__name"),
+        price_band=price_band,
+        type_=F("auction_type"),
+        ending_window=ending_window,
+    )
+
+
+def _count(queryset):
+    sql, params = _facet_values(queryset, timezone.now()).query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT f.category, f.category_name, f.price_band, f.type_,
+                   f.ending_window, COUNT(*),
+                   GROUPING(f.category), GROUPING(f.price_band),
+                   GROUPING(f.type_), GROUPING(f.ending_window)
+            FROM ({sql}) f
+            GROUP BY GROUPING SETS (
+                (f.category, f.category_name),
+                (f.price_band),
+                (f.type_),
+                (f.ending_window),
+                ()
+            )
+            """,
+            params,
+        )
+        rows = cursor.fetchall()
+
+    facets = {
+        "total": 0,
+        "category": [],
+        "price": [],
+        "auction_type": {value: 0 for value, _ in Auction.TYPE_CHOICES},
+        "ending_within": {name: 0 for name, _ in ENDING_WINDOWS},
+    }
+    bands = {}
+    windows = {}
+    for category, name, band, type_, window, count, *grouped in rows:
+        if all(grouped):
+            facets["total"] = count
+        elif not grouped[0]:
+            entry = {"id": category, "name": name, "count": count}
+            facets["category"].append(entry)
+        elif not grouped[1]:
+            bands[band] = count
+        elif not grouped[2]:
+            facets["auction_type"][type_] = count
+        elif window is not None:
+            windows[window] = count
+
+    facets["category"].sort(key=lambda entry: (-entry["count"], entry["name"]))
+    lower = 0
+    for band, upper in enumerate((*PRICE_BANDS, None)):
+        count = bands.get(band, 0)
+        facets["price"].append({"min": lower, "max": upper, "count": count})
+        lower = upper
+    running = 0
+    for window, (name, _) in enumerate(ENDING_WINDOWS):
+        running += windows.get(window, 0)
+        facets["ending_within"][name] = running
+    return facets
+
+
+def facet_counts(queryset, signature):
+    """
+    Facet counts for the auctions of ``queryset``, cached under
+    ``signature`` (from filter_signature())
+
+    Returns:
+        dict with the ``total``, and counts per ``category`` (id, name),
+        ``price`` band (min, max), ``auction_type`` and ``ending_within``
+        window (cumulative)
+    """
+    facets = cache.get(signature)
+    if facets is None:
+        facets = _count(queryset)
+        cache.set(signature, facets, settings.AUCTION_FACET_CACHE_TTL)
+    return facets
+
+
+async def afacet_counts(queryset, signature):
+    facets = await cache.aget(signature)
+    if facets is None:
+        facets = await sync_to_async(_count)(queryset)
+        await cache.aset(signature, facets, settings.AUCTION_FACET_CACHE_TTL)
+    return facets
+
+
+def facet_parameters():
+    """Swagger query parameter of the endpoints returning facets"""
+    return [
+        openapi.Parameter(
+            FACETS_PARAM,
+            openapi.IN_QUERY,
+            description=(
+                "true to also return counts per category, price band, "
+                "auction type and ending-soon window for these filters"
+            ),
+            type=openapi.TYPE_BOOLEAN,
+        ),
+    ]
@@ -0,0 +1,305 @@
+"""
+Item image pipeline
+
+Images are identified by the SHA-256 of their bytes. An image already
+stored for any item reuses its ImageAsset. New images get derivatives at
+IMAGE_DERIVATIVE_WIDTHS in each of IMAGE_DERIVATIVE_FORMATS, generated in a
+process pool. They are written to the "images" storage under
+``<hash[:2]>/<hash>/<width>.<format>``. A key always holds the same bytes,
+so derivatives are served with IMAGE_CACHE_CONTROL (immutable).
+"""
+
+import http.client
+import ipaddress
+import multiprocessing
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+from urllib.request import (
+    HTTPHandler,
+    HTTPRedirectHandler,
+    HTTPSHandler,
+    ProxyHandler,
+    Request,
+    build_opener,
+)
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db import transaction
+from django.db.models import Max
+
+from apps.core.imaging import content_hash, render_derivatives, supported_formats
+from .models import ImageAsset, ItemImage
+
+FETCH_TIMEOUT = 10
+
+_executor = None
+
+
+def worker_count():
+    return settings.IMAGE_PROCESS_WORKERS or os.cpu_count() or 1
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # spawn rather than fork: the parent holds database pool threads
+        _executor = ProcessPoolExecutor(
+            max_workers=worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def derivative_key(sha256, width, fmt):
+    return f"{sha256[:2]}/{sha256}/{width}.{fmt}"
+
+
+def render_all(sources):
+    """
+    Generate derivatives for {sha256: bytes}, in the process pool when
+    there is more than one image
+
+    Raises:
+        ValueError: if an image can't be decoded
+    """
+    args = (
+        settings.IMAGE_DERIVATIVE_WIDTHS,
+        supported_formats(settings.IMAGE_DERIVATIVE_FORMATS),
+        settings.IMAGE_QUALITY,
+    )
+    if len(sources) == 1 or worker_count() == 1:
+        return {sha: render_derivatives(data, *args) for sha, data in sources.items()}
+
+    executor = get_executor()
+    futures = {
+        sha: executor.submit(render_derivatives, data, *args)
+        for sha, data in sources.items()
+    }
+    return {sha: future.result() for sha, future in futures.items()}
+
+
+def store_images(images):
+    """
+    ImageAsset for each image, generating and storing derivatives only for
+    content not seen before
+
+    Args:
+        images: list of image bytes
+
+    Raises:
+        ValueError: if an image can't be decoded
+
+    Returns:
+        list of ImageAsset in the order of ``images``
+    """
+    hashes = [content_hash(data) for data in images]
+    assets = ImageAsset.objects.in_bulk(set(hashes))
+    new = {sha: data for sha, data in zip(hashes, images) if sha not in assets}
+
+    storage = storages["images"]
+    for sha, result in render_all(new).items():
+        derivatives = {}
+        for fmt, width, _, data in result["derivatives"]:
+            key = derivative_key(sha, width, fmt)
+            if not storage.exists(key):
+                storage.save(key, ContentFile(data))
+            derivatives.setdefault(fmt, {})[str(width)] = key
+
+        assets[sha], _ = ImageAsset.objects.get_or_create(
+            sha256=sha,
+            defaults={
+                "width": result["width"],
+                "height": result["height"],
+                "derivatives": derivatives,
+            },
+        )
+
+    return [assets[sha] for sha in hashes]
+
+
+def attach_images(item, images, source_urls=None):
+    """
+    Store images and append them to an item's images, skipping any the
+    item already has
+
+    Returns:
+        list of the ItemImage rows created
+    """
+    assets = store_images(images)
+    source_urls = source_urls or [""] * len(assets)
+
+    with transaction.atomic():
+        existing = set(item.images.values_list("asset_id", flat=True))
+        position = item.images.aggregate(last=Max("position"))["last"]
+        position = -1 if position is None else position
+
+        item_images = []
+        for asset, source_url in zip(assets, source_urls):
+            if asset.sha256 in existing:
+                continue
+            existing.add(asset.sha256)
+            position += 1
+            item_images.append(
+                ItemImage(
+                    item=item, asset=asset, position=position, source_url=source_url
+                )
+            )
+        return ItemImage.objects.bulk_create(item_images)
+
+
+def public_addresses(host, port):
+    """
+    The addresses ``host`` resolves to, all of which must be public
+
+    Raises:
+        ValueError: the host doesn't resolve, or resolves to a private,
+            loopback, link-local, reserved or multicast address
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as exc:
+        raise ValueError(f"Can't resolve {host}: {exc}") from exc
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"{host} resolves to a non-public address")
+    return infos
+
+
+def _public_connection(address, timeout=None, source_address=None):
+    # Connects to the addresses just checked, so a DNS answer changed
+    # between the check and the connection can't point it elsewhere
+    host, port = address
+    error = OSError(f"No address for {host}")
+    for family, type_, proto, _, sockaddr in public_addresses(host, port):
+        sock = socket.socket(family, type_, proto)
+        try:
+            if timeout is not None:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as exc:
+            sock.close()
+            error = exc
+    raise error
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _public_connection
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _public_connection
+
+
+class _PublicHTTPHandler(HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req)
+
+
+class _PublicRedirectHandler(HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        # urllib would also follow redirects to ftp: URLs
+        check_image_url(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+# No proxies: the checks apply to the host connected to
+_opener = build_opener(
+    ProxyHandler({}),
+    _PublicHTTPHandler,
+    _PublicHTTPSHandler,
+    _PublicRedirectHandler,
+)
+
+
+def check_image_url(url):
+    """
+    Refuse URLs that aren't HTTP(S) or whose host isn't public
+
+    Raises:
+        ValueError
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"Unsupported URL: {url}")
+    public_addresses(parsed.hostname, parsed.port)
+
+
+def fetch_image(url):
+    """
+    Download an image URL, refusing non-HTTP schemes, hosts that aren't
+    public (checked again on each redirect and connection) and bodies over
+    IMAGE_MAX_UPLOAD_BYTES
+
+    Raises:
+        ValueError, OSError
+    """
+    check_image_url(url)
+
+    request = Request(url, headers={"User-Agent": "auctionhouse-image-ingest"})
+    with _opener.open(request, timeout=FETCH_TIMEOUT) as response:
+        data = response.read(settings.IMAGE_MAX_UPLOAD_BYTES + 1)
+    if len(data) > settings.IMAGE_MAX_UPLOAD_BYTES:
+        raise ValueError(f"Image larger than {settings.IMAGE_MAX_UPLOAD_BYTES} bytes")
+    return data
+
+
+def ingest_image_urls(item):
+    """
+    Fetch the item's image_urls that haven't been ingested yet and attach
+    them
+
+    Returns:
+        dict with the number of ``ingested`` images and ``failed`` URLs
+        mapped to their error
+    """
+    done = set(item.images.values_list("source_url", flat=True))
+    fetched, failed = {}, {}
+    for url in item.image_urls:
+        if url in done or url in fetched:
+            continue
+        try:
+            fetched[url] = fetch_image(url)
+        except (OSError, ValueError) as exc:
+            failed[url] = str(exc)
+
+    try:
+        store_images(list(fetched.values()))
+    except ValueError:
+        # one at a time to find the undecodable ones
+        for url, data in list(fetched.items()):
+            try:
+                store_images([data])
+            except ValueError as exc:
+                failed[url] = str(exc)
+                del fetched[url]
+
+    created = attach_images(item, list(fetched.values()), list(fetched))
+    return {"ingested": len(created), "failed": failed}
+
+
+def derivative_urls(derivatives):
+    """format -> width -> URL for an ImageAsset's ``derivatives``"""
+    storage = storages["images"]
+    return {
+        fmt: {width: storage.url(key) for width, key in sizes.items()}
+        for fmt, sizes in derivatives.items()
+    }
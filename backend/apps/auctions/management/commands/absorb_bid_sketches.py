@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.auctions.tasks import absorb_bid_sketches
+
+
+class Command(BaseCommand):
+    help = "Add the bids queued by the bid trigger to the analytics sketches"
+
+    def handle(self, *args, **options):
+        result = absorb_bid_sketches()
+        self.stdout.write(
+            self.style.SUCCESS(f"{result['absorbed']} queued bids absorbed")
+        )
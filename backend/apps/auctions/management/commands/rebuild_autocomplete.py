@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.auctions import autocomplete
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis autocomplete index from active auctions and categories"
+
+    def handle(self, *args, **options):
+        if autocomplete.get_client() is None:
+            raise CommandError("AUTOCOMPLETE_REDIS_URL is not set")
+        if not autocomplete.rebuild():
+            raise CommandError(
+                "Another process is already rebuilding the index, or the "
+                f"rebuild took over {autocomplete.REBUILD_TIMEOUT}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Autocomplete index rebuilt"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.auctions import watchlist
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis watch sets from the AuctionWatch table"
+
+    def handle(self, *args, **options):
+        if watchlist.get_client() is None:
+            raise CommandError("WATCHLIST_REDIS_URL is not set")
+        if not watchlist.rebuild():
+            raise CommandError(
+                "Another process is already rebuilding the watch sets, or the "
+                f"rebuild took over {watchlist.REBUILD_TIMEOUT}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Watch sets rebuilt"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-19 10:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('auctions', '0007_auction_min_bid_increment'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='auction',
+            index=models.Index(fields=['status', 'end_time'], name='auction_status_end_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auction',
+            index=models.Index(fields=['status', 'start_time'], name='auction_status_start_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['-created_at'], name='auction_active_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auction',
+            index=models.Index(fields=['seller', 'status'], name='auction_seller_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bid',
+            index=models.Index(fields=['auction', 'status', '-amount'], name='bid_auction_status_amount_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bid',
+            index=models.Index(fields=['bidder', 'status'], name='bid_bidder_status_idx'),
+        ),
+    ]
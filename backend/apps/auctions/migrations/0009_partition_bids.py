@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:00
+
+from django.db import migrations
+
+from apps.core.partitioning import partition_table, unpartition_table
+
+
+def partition_bids(apps, schema_editor):
+    partition_table(schema_editor, "auctions_bid")
+
+
+def unpartition_bids(apps, schema_editor):
+    unpartition_table(schema_editor, "auctions_bid")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_bids, unpartition_bids),
+    ]
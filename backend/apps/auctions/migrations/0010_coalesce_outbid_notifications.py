@@ -0,0 +1,120 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0009_partition_bids"),
+        ("notifications", "0005_notification_coalescing"),
+    ]
+
+    operations = [
+        # Coalesce outbid notifications instead of inserting one per bid
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION notify_outbid_users()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                auction_title TEXT;
+                auction_end_time TIMESTAMP;
+                outbid_bid_record RECORD;
+                outbid_message TEXT;
+            BEGIN
+                -- Get auction details
+                SELECT title, end_time INTO auction_title, auction_end_time
+                FROM auctions_auction WHERE id = NEW.auction_id;
+
+                outbid_message := 'Someone placed a higher bid of ' || NEW.amount || ' on ''' || auction_title || '''. The auction ends on ' || auction_end_time || '.';
+
+                -- Find users who were outbid (those whose bids were just marked as outbid)
+                FOR outbid_bid_record IN
+                    SELECT DISTINCT bidder_id
+                    FROM auctions_bid
+                    WHERE auction_id = NEW.auction_id
+                    AND status = 'outbid'
+                    AND bidder_id != NEW.bidder_id
+                    AND timestamp < NEW.timestamp
+                LOOP
+                    -- Update the bidder's recent unread outbid notification
+                    -- for this auction, or create one
+                    IF NOT coalesce_notification(
+                        outbid_bid_record.bidder_id, 'outbid', NEW.auction_id,
+                        outbid_message, NEW.amount
+                    ) THEN
+                        INSERT INTO notifications_notification (
+                            id, recipient_id, notification_type, title, message,
+                            related_object_id, related_object_type, is_read, priority,
+                            created_at, latest_amount
+                        ) VALUES (
+                            uuid_generate_v4(),
+                            outbid_bid_record.bidder_id,
+                            'outbid',
+                            'You''ve been outbid on ' || auction_title,
+                            outbid_message,
+                            NEW.auction_id,
+                            'auction',
+                            false,
+                            'high',
+                            NOW(),
+                            NEW.amount
+                        );
+                    END IF;
+                END LOOP;
+
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            reverse_sql="""
+            CREATE OR REPLACE FUNCTION notify_outbid_users()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                auction_title TEXT;
+                auction_end_time TIMESTAMP;
+                outbid_bid_record RECORD;
+                outbid_user_id UUID;
+                notification_id UUID;
+            BEGIN
+                -- Get auction details
+                SELECT title, end_time INTO auction_title, auction_end_time
+                FROM auctions_auction WHERE id = NEW.auction_id;
+
+                -- Find users who were outbid (those whose bids were just marked as outbid)
+                FOR outbid_bid_record IN
+                    SELECT DISTINCT bidder_id
+                    FROM auctions_bid
+                    WHERE auction_id = NEW.auction_id
+                    AND status = 'outbid'
+                    AND bidder_id != NEW.bidder_id
+                    AND timestamp < NEW.timestamp
+                LOOP
+                    outbid_user_id := outbid_bid_record.bidder_id;
+
+                    -- Generate a UUID for the notification
+                    notification_id := uuid_generate_v4();
+
+                    -- Create notification for outbid user
+                    INSERT INTO notifications_notification (
+                        id, recipient_id, notification_type, title, message,
+                        related_object_id, related_object_type, is_read, priority, created_at
+                    ) VALUES (
+                        notification_id,
+                        outbid_user_id,
+                        'outbid',
+                        'You''ve been outbid on ' || auction_title,
+                        'Someone placed a higher bid of ' || NEW.amount || ' on ''' || auction_title || '''. The auction ends on ' || auction_end_time || '.',
+                        NEW.auction_id,
+                        'auction',
+                        false,
+                        'high',
+                        NOW()
+                    );
+                END LOOP;
+
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_template(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.create(
+        key="auction.reminder",
+        title="Auction ending soon: $auction_title",
+        message="The auction '$auction_title' you're watching ends in less than $remaining.",
+    )
+
+
+def delete_template(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.filter(key="auction.reminder").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0011_outbid_notification_template'),
+        ('notifications', '0006_notification_templates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.PositiveIntegerField()),
+                ('auction', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auctions.auction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('auction', 'user', 'threshold'), name='auction_reminder_once')],
+            },
+        ),
+        migrations.RunPython(create_template, delete_template),
+        # Re-arm reminders whose threshold lies in the future again after
+        # the end time moved later, from the API or the extension trigger
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION rearm_auction_reminders()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF NEW.end_time > OLD.end_time THEN
+                    DELETE FROM auctions_auctionreminder
+                    WHERE auction_id = NEW.id
+                      AND NEW.end_time - make_interval(mins => threshold) > NOW();
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER auction_reminder_rearm_trigger
+            AFTER UPDATE OF end_time ON auctions_auction
+            FOR EACH ROW EXECUTE FUNCTION rearm_auction_reminders();
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS auction_reminder_rearm_trigger ON auctions_auction;
+            DROP FUNCTION IF EXISTS rearm_auction_reminders();
+            """,
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:00
+
+import django.db.models.functions.datetime
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0013_item_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='changed_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='version',
+            field=models.PositiveBigIntegerField(db_default=1, default=1, editable=False),
+        ),
+        # Every UPDATE of an auction row bumps its version, whatever the
+        # statement sets it to, so a stale instance saved by Django can't
+        # move it backwards. Bids, item edits and item images touch the
+        # auction row to the same effect; bids per statement, so a bid and
+        # the outbid updates it causes cost one touch each.
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION bump_auction_version()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                NEW.version := OLD.version + 1;
+                NEW.changed_at := NOW();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER auction_version_trigger
+            BEFORE UPDATE ON auctions_auction
+            FOR EACH ROW EXECUTE FUNCTION bump_auction_version();
+
+            CREATE OR REPLACE FUNCTION touch_bid_auctions()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                UPDATE auctions_auction SET version = version
+                WHERE id IN (SELECT DISTINCT auction_id FROM changed_rows);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER bid_insert_version_trigger
+            AFTER INSERT ON auctions_bid
+            REFERENCING NEW TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION touch_bid_auctions();
+
+            CREATE TRIGGER bid_update_version_trigger
+            AFTER UPDATE ON auctions_bid
+            REFERENCING NEW TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION touch_bid_auctions();
+
+            CREATE OR REPLACE FUNCTION touch_item_auction()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_TABLE_NAME = 'auctions_item' THEN
+                    UPDATE auctions_auction SET version = version WHERE item_id = NEW.id;
+                ELSE
+                    UPDATE auctions_auction SET version = version
+                    WHERE item_id = COALESCE(NEW.item_id, OLD.item_id);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER item_version_trigger
+            AFTER UPDATE ON auctions_item
+            FOR EACH ROW EXECUTE FUNCTION touch_item_auction();
+
+            CREATE TRIGGER item_image_version_trigger
+            AFTER INSERT OR DELETE ON auctions_itemimage
+            FOR EACH ROW EXECUTE FUNCTION touch_item_auction();
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS item_image_version_trigger ON auctions_itemimage;
+            DROP TRIGGER IF EXISTS item_version_trigger ON auctions_item;
+            DROP FUNCTION IF EXISTS touch_item_auction();
+            DROP TRIGGER IF EXISTS bid_update_version_trigger ON auctions_bid;
+            DROP TRIGGER IF EXISTS bid_insert_version_trigger ON auctions_bid;
+            DROP FUNCTION IF EXISTS touch_bid_auctions();
+            DROP TRIGGER IF EXISTS auction_version_trigger ON auctions_auction;
+            DROP FUNCTION IF EXISTS bump_auction_version();
+            """,
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:00
+
+import apps.auctions.models
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_template(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.create(
+        key="auction.saved_search",
+        title="New auction for '$search': $auction_title",
+        message="'$auction_title' matches your saved search '$search'. Starting price: $starting_price.",
+    )
+
+
+def delete_template(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.filter(key="auction.saved_search").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0014_auction_version'),
+        ('notifications', '0006_notification_templates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('query', models.CharField(blank=True, help_text='Keywords', max_length=255)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('notify', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('terms', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), default=list, editable=False, size=None)),
+                ('anchor', models.CharField(editable=False, max_length=80, null=True)),
+                ('price_range', models.GeneratedField(db_persist=True, expression=models.Func(models.F('min_price'), models.F('max_price'), models.Value('[]'), function='numrange'), output_field=apps.auctions.models.PriceRangeField())),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auctions.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('notify', True)), fields=['anchor'], name='saved_search_anchor_idx'), django.contrib.postgres.indexes.GistIndex(condition=models.Q(('anchor__isnull', True), ('notify', True)), fields=['price_range'], name='saved_search_price_idx')],
+            },
+        ),
+        migrations.RunPython(create_template, delete_template),
+    ]
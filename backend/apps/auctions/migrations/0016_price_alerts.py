@@ -0,0 +1,67 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+TEMPLATES = {
+    "auction.price_above": (
+        "Bidding passed $threshold: $auction_title",
+        "The price of '$auction_title' reached $price, passing your alert at $threshold.",
+    ),
+    "auction.price_below": (
+        "Still below $threshold: $auction_title",
+        "'$auction_title' is now at $price, still below your alert at $threshold.",
+    ),
+}
+
+
+def create_templates(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.bulk_create(
+        NotificationTemplate(key=key, title=title, message=message)
+        for key, (title, message) in TEMPLATES.items()
+    )
+
+
+def delete_templates(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.filter(key__in=TEMPLATES).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0015_saved_searches'),
+        ('notifications', '0006_notification_templates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceAlertMark',
+            fields=[
+                ('auction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='auctions.auction')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceAlert',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('direction', models.CharField(choices=[('above', 'Bidding reaches the threshold'), ('below', 'Price changes while below the threshold')], max_length=5)),
+                ('threshold', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('auction', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auctions.auction')),
+                ('category', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auctions.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('auction__isnull', False)), fields=['auction', 'direction', 'threshold'], name='price_alert_auction_idx'), models.Index(condition=models.Q(('category__isnull', False)), fields=['category', 'direction', 'threshold'], name='price_alert_category_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('auction__isnull', True), ('category__isnull', True), _connector='XOR'), name='price_alert_auction_xor_category')],
+            },
+        ),
+        migrations.RunPython(create_templates, delete_templates),
+    ]
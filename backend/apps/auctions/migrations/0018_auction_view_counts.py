@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0017_trending_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionViewCount',
+            fields=[
+                ('auction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_count', serialize=False, to='auctions.auction')),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-views'], name='auction_view_count_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0018_auction_view_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingSketchBid',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('auction_id', models.UUIDField()),
+                ('bidder_id', models.UUIDField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('timestamp', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatsSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('auction', 'Auction'), ('category', 'Category'), ('day', 'Day')], max_length=10)),
+                ('key', models.CharField(max_length=36)),
+                ('bid_count', models.PositiveBigIntegerField(default=0)),
+                ('bid_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('highest_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('bidders', models.BinaryField(default=bytes)),
+                ('viewers', models.BinaryField(default=bytes)),
+                ('amounts', models.JSONField(default=dict)),
+                ('top_bidders', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'key'), name='stats_sketch_once')],
+            },
+        ),
+        # Every inserted bid is queued for the sketches, whatever inserted
+        # it: the auto-bid triggers and bulk inserts send no signals. The
+        # bids already placed are queued too.
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION queue_sketch_bids()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                INSERT INTO auctions_pendingsketchbid
+                    (auction_id, bidder_id, amount, timestamp)
+                SELECT auction_id, bidder_id, amount, timestamp FROM new_bids;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER bid_sketch_queue_trigger
+            AFTER INSERT ON auctions_bid
+            REFERENCING NEW TABLE AS new_bids
+            FOR EACH STATEMENT EXECUTE FUNCTION queue_sketch_bids();
+
+            INSERT INTO auctions_pendingsketchbid
+                (auction_id, bidder_id, amount, timestamp)
+            SELECT auction_id, bidder_id, amount, timestamp
+            FROM auctions_bid
+            ORDER BY timestamp;
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS bid_sketch_queue_trigger ON auctions_bid;
+            DROP FUNCTION IF EXISTS queue_sketch_bids();
+            """,
+        ),
+    ]
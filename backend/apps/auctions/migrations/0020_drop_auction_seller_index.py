@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('auctions', '0019_stats_sketches'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # auction_seller_status_idx serves every query on seller_id. Only the
+        # index is dropped: AlterField would also re-create the foreign key.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='auction',
+                    name='seller',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='auctions', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "auctions_auction_seller_id_e503b3cb"',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "auctions_auction_seller_id_e503b3cb" ON "auctions_auction" ("seller_id")',
+                ),
+            ],
+        ),
+    ]
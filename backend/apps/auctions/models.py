@@ -1,11 +1,15 @@
 from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.functions import Now
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.fields import ArrayField, DecimalRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 import uuid
+from functools import partial
 
 from apps.accounts.models import User
 
@@ -68,6 +72,41 @@ class Item(models.Model):
         ordering = ["-created_at"]
 
 
+class ImageAsset(models.Model):
+    """
+    An uploaded image stored once per content hash, whatever the number of
+    items using it, with the keys of its derivatives in the images storage
+    """
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    # format -> width -> storage key, e.g. {"webp": {"320": "ab/ab12.../320.webp"}}
+    derivatives = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class ItemImage(models.Model):
+    """An image of an item, in display order"""
+
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="images")
+    asset = models.ForeignKey(ImageAsset, on_delete=models.PROTECT, related_name="+")
+    position = models.PositiveSmallIntegerField(default=0)
+    source_url = models.URLField(blank=True, default="")
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["item", "asset"], name="item_image_once")
+        ]
+
+    def __str__(self):
+        return f"Image {self.position} of {self.item_id}"
+
+
 class Auction(models.Model):
     """Auction model for bidding on items"""
 
@@ -99,7 +138,10 @@ class Auction(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     item = models.OneToOneField(Item, on_delete=models.CASCADE, related_name="auction")
-    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="auctions")
+    # auction_seller_status_idx leads on seller, so no index of its own
+    seller = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="auctions", db_index=False
+    )
     title = models.CharField(max_length=255)
     description = models.TextField()
     starting_price = models.DecimalField(max_digits=12, decimal_places=2)
@@ -123,6 +165,12 @@ class Auction(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped by the database on every change to the auction, its item,
+    # the item's images or its bids (migration 0014), for ETags
+    version = models.PositiveBigIntegerField(default=1, db_default=1, editable=False)
+    changed_at = models.DateTimeField(
+        default=timezone.now, db_default=Now(), editable=False
+    )
 
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
@@ -172,20 +220,21 @@ class Auction(models.Model):
         if errors:
             raise ValidationError(errors)
 
+    def initial_status(self, now):
+        """Status of a new or draft auction from its schedule"""
+        if now >= self.start_time:
+            if now > self.end_time:
+                return self.STATUS_ENDED
+            return self.STATUS_ACTIVE
+        return self.STATUS_PENDING
+
     def save(self, *args, **kwargs):
         self.clean()
 
         now = timezone.now()
 
         if self.pk is None or self.status == self.STATUS_DRAFT:
-            if now >= self.start_time:
-                if now > self.end_time:
-                    self.status = self.STATUS_ENDED
-                else:
-                    self.status = self.STATUS_ACTIVE
-            else:
-                self.status = self.STATUS_PENDING
-
+            self.status = self.initial_status(now)
         elif self.status == self.STATUS_PENDING and now >= self.start_time:
             self.status = self.STATUS_ACTIVE
         elif self.status == self.STATUS_ACTIVE and now >= self.end_time:
@@ -195,6 +244,20 @@ class Auction(models.Model):
 
     class Meta:
         ordering = ["-start_time"]
+        indexes = [
+            # status sweeps in tasks.check_auctions_status
+            models.Index(fields=["status", "end_time"], name="auction_status_end_idx"),
+            models.Index(
+                fields=["status", "start_time"], name="auction_status_start_idx"
+            ),
+            # newest active auctions (featured, search sort=newest)
+            models.Index(
+                fields=["-created_at"],
+                name="auction_active_created_idx",
+                condition=models.Q(status="active"),
+            ),
+            models.Index(fields=["seller", "status"], name="auction_seller_status_idx"),
+        ]
 
     @property
     def current_price(self):
@@ -311,7 +374,8 @@ class Bid(models.Model):
     def save(self, *args, **kwargs):
         self.clean()
 
-        is_new = self.pk is None
+        # pk is set by its uuid default, so it can't tell new bids apart
+        is_new = self._state.adding
 
         if is_new:
             result = super().save(*args, **kwargs)
@@ -322,11 +386,16 @@ class Bid(models.Model):
             create_notification(
                 recipient=self.auction.seller,
                 notification_type=Notification.TYPE_BID,
-                title=f"New bid on your auction: {self.auction.title}",
-                message=f"A bid of {self.amount} was placed by {self.bidder.email}",
+                template="bid.new",
+                params={
+                    "auction_title": self.auction.title,
+                    "amount": str(self.amount),
+                    "bidder_email": self.bidder.email,
+                },
                 priority=Notification.PRIORITY_MEDIUM,
                 related_object_id=self.auction.id,
                 related_object_type="auction",
+                amount=self.amount,
             )
 
         else:
@@ -336,6 +405,14 @@ class Bid(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            # highest active bid per auction
+            models.Index(
+                fields=["auction", "status", "-amount"],
+                name="bid_auction_status_amount_idx",
+            ),
+            models.Index(fields=["bidder", "status"], name="bid_bidder_status_idx"),
+        ]
 
 
 class AuctionWatch(models.Model):
@@ -357,6 +434,311 @@ class AuctionWatch(models.Model):
         return f"{self.user.email} is watching {self.auction.title}"
 
 
+class AuctionReminder(models.Model):
+    """
+    Ledger of ending-soon reminders already sent
+
+    One row per (auction, watcher, threshold in minutes) makes each reminder
+    fire once. A trigger deletes the rows of thresholds that lie in the
+    future again when an auction's end time moves later, re-arming them
+    (migration 0012).
+    """
+
+    # auction lookups use the unique constraint, which leads with it
+    auction = models.ForeignKey(
+        Auction, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    threshold = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["auction", "user", "threshold"], name="auction_reminder_once"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.threshold}m reminder for {self.auction_id} to {self.user_id}"
+
+
+class PriceRangeField(DecimalRangeField):
+    """
+    numrange of prices
+
+    Values looked up in it are cast to the base field, which must have a
+    precision for the cast to be valid SQL.
+    """
+
+    base_field = partial(models.DecimalField, max_digits=12, decimal_places=2)
+
+
+class SavedSearch(models.Model):
+    """
+    A search a user follows: new auctions matching it are notified to them
+    (percolator.py)
+
+    An auction matches when it has every keyword (in its title, description
+    or item), is in the category or one of its subcategories, and starts
+    within the price range. Unset criteria match anything.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="saved_searches"
+    )
+    name = models.CharField(max_length=100, blank=True)
+    query = models.CharField(max_length=255, blank=True, help_text=_("Keywords"))
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    min_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    max_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    notify = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Derived from the criteria on save, for the percolator's indexes: the
+    # normalized keywords, and the one key the search is indexed under
+    terms = ArrayField(models.CharField(max_length=64), default=list, editable=False)
+    anchor = models.CharField(max_length=80, null=True, editable=False)
+    price_range = models.GeneratedField(
+        expression=Func(
+            F("min_price"), F("max_price"), Value("[]"), function="numrange"
+        ),
+        output_field=PriceRangeField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["anchor"],
+                name="saved_search_anchor_idx",
+                condition=models.Q(notify=True),
+            ),
+            # searches with neither keywords nor a category
+            GistIndex(
+                fields=["price_range"],
+                name="saved_search_price_idx",
+                condition=models.Q(notify=True, anchor__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.name or self.query}"
+
+    def save(self, *args, **kwargs):
+        from .percolator import search_anchor, search_terms
+
+        self.terms = search_terms(self.query)
+        self.anchor = search_anchor(self.terms, self.category_id)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "terms", "anchor"}
+        super().save(*args, **kwargs)
+
+
+class PriceAlert(models.Model):
+    """
+    Alert on the price of an auction, or of any auction in a category or
+    its subcategories (price_alerts.py)
+
+    An "above" alert fires once per auction, when bidding reaches the
+    threshold; a "below" alert fires on every price change that leaves the
+    auction still below it.
+    """
+
+    DIRECTION_ABOVE = "above"
+    DIRECTION_BELOW = "below"
+
+    DIRECTION_CHOICES = [
+        (DIRECTION_ABOVE, "Bidding reaches the threshold"),
+        (DIRECTION_BELOW, "Price changes while below the threshold"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="price_alerts")
+    # lookups use the partial indexes below, which lead with these
+    auction = models.ForeignKey(
+        Auction,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False,
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False,
+    )
+    direction = models.CharField(max_length=5, choices=DIRECTION_CHOICES)
+    threshold = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(auction__isnull=True) ^ models.Q(category__isnull=True),
+                name="price_alert_auction_xor_category",
+            )
+        ]
+        # Thresholds sorted per auction and per category, so a price change
+        # reads only the alerts it crosses
+        indexes = [
+            models.Index(
+                fields=["auction", "direction", "threshold"],
+                name="price_alert_auction_idx",
+                condition=models.Q(auction__isnull=False),
+            ),
+            models.Index(
+                fields=["category", "direction", "threshold"],
+                name="price_alert_category_idx",
+                condition=models.Q(category__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        target = self.auction_id or self.category_id
+        return f"{self.user_id}: {target} {self.direction} {self.threshold}"
+
+
+class PriceAlertMark(models.Model):
+    """
+    Price of an auction its price alerts were last evaluated at
+
+    Locked while evaluating, so each price change is evaluated once, for
+    the range between the previous mark and the new price.
+    """
+
+    auction = models.OneToOneField(
+        Auction, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.auction_id} at {self.price}"
+
+
+class TrendingScore(models.Model):
+    """
+    Time-decayed activity score of an active auction (trending.py)
+
+    ``score`` is the log of the sum of the auction's event weights, each
+    scaled up by how recent it is, so it only ever grows and doesn't need
+    decaying: ordering by it orders by the decayed score.
+    """
+
+    auction = models.OneToOneField(
+        Auction, on_delete=models.CASCADE, primary_key=True, related_name="trending"
+    )
+    # the auction's item's, for the per-category ranking
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-score"], name="trending_score_idx"),
+            models.Index(fields=["category", "-score"], name="trending_category_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.auction_id}: {self.score}"
+
+
+class AuctionViewCount(models.Model):
+    """
+    Detail views of an auction, from the buffered counters of view_counts.py
+
+    Kept out of auctions_auction so counting views doesn't rewrite auction
+    rows (and bump their versions).
+    """
+
+    auction = models.OneToOneField(
+        Auction, on_delete=models.CASCADE, primary_key=True, related_name="view_count"
+    )
+    views = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["-views"], name="auction_view_count_idx")]
+
+    def __str__(self):
+        return f"{self.views} views of {self.auction_id}"
+
+
+class StatsSketch(models.Model):
+    """
+    Bid and view statistics of an auction, a category or a day, as
+    mergeable sketches (apps.core.sketches, kept up by analytics.py)
+
+    ``key`` is the auction or category ID, or the ISO date of the day.
+    """
+
+    SCOPE_AUCTION = "auction"
+    SCOPE_CATEGORY = "category"
+    SCOPE_DAY = "day"
+
+    SCOPE_CHOICES = [
+        (SCOPE_AUCTION, "Auction"),
+        (SCOPE_CATEGORY, "Category"),
+        (SCOPE_DAY, "Day"),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    key = models.CharField(max_length=36)
+    bid_count = models.PositiveBigIntegerField(default=0)
+    bid_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    highest_bid = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    views = models.PositiveBigIntegerField(default=0)
+    # HyperLogLog registers
+    bidders = models.BinaryField(default=bytes)
+    viewers = models.BinaryField(default=bytes)
+    # t-digest of the bid amounts
+    amounts = models.JSONField(default=dict)
+    # count-min sketch of the bids per bidder
+    top_bidders = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="stats_sketch_once")
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}: {self.bid_count} bids"
+
+
+class PendingSketchBid(models.Model):
+    """
+    A bid not yet added to the stats sketches
+
+    Queued by a trigger on every bid insert, including the auto-bids placed
+    by triggers and bulk inserts, which send no signals.
+    """
+
+    auction_id = models.UUIDField()
+    bidder_id = models.UUIDField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    timestamp = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.bidder_id} bid {self.amount} on {self.auction_id}"
+
+
 @receiver(post_save, sender=Auction)
 def notify_on_auction_creation(sender, instance, created, **kwargs):
     """Send notification when a new auction is created"""
@@ -0,0 +1,113 @@
+"""
+Saved-search percolator
+
+Matches each new auction against the saved searches instead of running
+every saved search. A search is indexed under one key, its anchor: its
+longest keyword (the likeliest to be rare), else its category. The
+searches that could match an auction are therefore those anchored on one
+of its words or on its category or an ancestor (a B-tree lookup per key),
+plus the searches with neither keywords nor a category whose price range
+contains its starting price (a GiST lookup). Only those candidates are
+checked against the remaining criteria, so the cost follows the number of
+candidates, not of saved searches.
+
+Matching users are notified with one bulk insert per auction
+(send_new_auction_notification).
+"""
+
+from django.db.models import Q
+
+from apps.notifications.services import send_new_auction_notification
+from .autocomplete import normalize
+from .models import Category, SavedSearch
+
+MAX_TERM_LENGTH = 64
+
+
+def search_terms(query):
+    """Normalized keywords of a saved search, each required"""
+    return sorted({word[:MAX_TERM_LENGTH] for word in normalize(query).split()})
+
+
+def search_anchor(terms, category_id):
+    """The key a saved search is indexed under, or None for price-only ones"""
+    if terms:
+        return "t:" + max(terms, key=lambda term: (len(term), term))
+    if category_id:
+        return f"c:{category_id}"
+    return None
+
+
+def auction_terms(auction):
+    """Words of an auction's title, description and item"""
+    item = auction.item
+    text = " ".join([auction.title, auction.description, item.name, item.description])
+    return {word[:MAX_TERM_LENGTH] for word in normalize(text).split()}
+
+
+def category_parents():
+    """Parent ID of every category, by ID"""
+    return dict(Category.objects.values_list("id", "parent_id"))
+
+
+def category_lineage(category_id, parents):
+    """The category and its ancestors"""
+    lineage = []
+    while category_id is not None and category_id not in lineage:
+        lineage.append(category_id)
+        category_id = parents.get(category_id)
+    return lineage
+
+
+def matching_searches(auction, parents=None):
+    """
+    Notifying saved searches of other users matched by ``auction``
+
+    Args:
+        parents: category_parents(), when percolating many auctions
+    """
+    terms = auction_terms(auction)
+    lineage = category_lineage(
+        auction.item.category_id, category_parents() if parents is None else parents
+    )
+    price = auction.starting_price
+    anchors = [f"t:{term}" for term in terms] + [f"c:{c}" for c in lineage]
+
+    return (
+        SavedSearch.objects.filter(notify=True)
+        .filter(
+            Q(anchor__in=anchors) | Q(anchor__isnull=True, price_range__contains=price)
+        )
+        .filter(terms__contained_by=sorted(terms))
+        .filter(Q(category__isnull=True) | Q(category_id__in=lineage))
+        .filter(price_range__contains=price)
+        .exclude(user_id=auction.seller_id)
+    )
+
+
+def percolate(auctions):
+    """
+    Notify the users with a saved search matching each auction, once per
+    user and auction
+
+    Args:
+        auctions: new Auction instances; their item is read, ended ones
+            are skipped
+
+    Returns:
+        int - number of notifications created
+    """
+    parents = category_parents()
+    sent = 0
+    for auction in auctions:
+        if auction.status == auction.STATUS_ENDED:
+            continue
+        searches = {}
+        for user_id, name, query in (
+            matching_searches(auction, parents)
+            .order_by("created_at")
+            .values_list("user_id", "name", "query")
+        ):
+            searches.setdefault(user_id, name or query)
+        sent += send_new_auction_notification(auction, searches)
+    return sent
@@ -0,0 +1,118 @@
+"""
+Price alerts on live auctions
+
+Alerts are kept sorted by threshold per auction and per category (the
+partial B-tree indexes of PriceAlert). A price change from ``previous`` to
+``price`` fires the "above" alerts with a threshold in (previous, price]
+and the "below" alerts with a threshold over ``price``: index range scans
+on the auction and on each category of its lineage, so the cost is
+O(log n + k) for k fired alerts, however many alerts don't fire.
+
+Evaluation runs once the bid's transaction has committed (signals.py),
+from the auction's current price, so bids placed by the auto-bid trigger
+in the same transaction are included. The auction's PriceAlertMark is
+locked and advanced in the transaction that inserts the notifications:
+each price range is evaluated once however many bids commit at the same
+time, and a failed evaluation leaves the range to the next one.
+"""
+
+from django.db import transaction
+from django.db.models import Max, Q
+
+from apps.notifications.models import Notification
+from .models import Bid, PriceAlert, PriceAlertMark
+from .percolator import category_lineage, category_parents
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+TEMPLATES = {
+    PriceAlert.DIRECTION_ABOVE: "auction.price_above",
+    PriceAlert.DIRECTION_BELOW: "auction.price_below",
+}
+
+
+def current_price(auction):
+    """Highest active bid, or the starting price"""
+    highest = Bid.objects.filter(auction=auction, status=Bid.STATUS_ACTIVE).aggregate(
+        highest=Max("amount")
+    )["highest"]
+    return highest if highest is not None else auction.starting_price
+
+
+def crossed_alerts(auction, previous, price):
+    """
+    Alerts of other users fired by the price of ``auction`` moving from
+    ``previous`` to ``price``
+    """
+    lineage = category_lineage(auction.item.category_id, category_parents())
+    return (
+        PriceAlert.objects.filter(Q(auction=auction) | Q(category_id__in=lineage))
+        .filter(
+            Q(
+                direction=PriceAlert.DIRECTION_ABOVE,
+                threshold__gt=previous,
+                threshold__lte=price,
+            )
+            | Q(direction=PriceAlert.DIRECTION_BELOW, threshold__gt=price)
+        )
+        .exclude(user_id=auction.seller_id)
+        .order_by()
+    )
+
+
+def _rank(direction, threshold):
+    if direction == PriceAlert.DIRECTION_ABOVE:
+        return (0, -threshold)
+    return (1, threshold)
+
+
+def evaluate(auction):
+    """
+    Fire the alerts crossed since the auction's price was last evaluated
+
+    Returns:
+        int - number of notifications created
+    """
+    price = current_price(auction)
+    with transaction.atomic():
+        mark, created = PriceAlertMark.objects.select_for_update().get_or_create(
+            auction=auction, defaults={"price": price}
+        )
+        previous = auction.starting_price if created else mark.price
+        if price <= previous:
+            return 0
+        if not created:
+            mark.price = price
+            mark.save(update_fields=["price"])
+
+        # one notification per user: the highest threshold passed, else the
+        # closest one still above the price
+        fired = {}
+        for user_id, direction, threshold in crossed_alerts(
+            auction, previous, price
+        ).values_list("user_id", "direction", "threshold"):
+            if user_id not in fired or _rank(direction, threshold) < _rank(
+                *fired[user_id]
+            ):
+                fired[user_id] = (direction, threshold)
+
+        Notification.objects.bulk_create(
+            (
+                Notification(
+                    recipient_id=user_id,
+                    notification_type=Notification.TYPE_BID,
+                    template_id=TEMPLATES[direction],
+                    params={
+                        "auction_title": auction.title,
+                        "price": str(price),
+                        "threshold": str(threshold),
+                    },
+                    priority=Notification.PRIORITY_MEDIUM,
+                    related_object_id=auction.id,
+                    related_object_type="auction",
+                )
+                for user_id, (direction, threshold) in fired.items()
+            ),
+            batch_size=NOTIFICATION_BATCH_SIZE,
+        )
+    return len(fired)
@@ -0,0 +1,112 @@
+"""
+Bid price history for charts
+
+An auction's schedule, from its start to its end time, is cut into equal
+time buckets, and its bids are aggregated per bucket in SQL. Each bucket
+gets its open, high, low and close amounts and its bid count; empty
+buckets are left out. The response is at most ``buckets`` rows however
+many bids there are, and the highs and lows survive the downsampling.
+
+The buckets only depend on the auction's bids and times, which bump its
+version, so the public auction ETag validates them. Once the auction can
+take no more bids, its history can't change and is cached with no expiry.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+
+from .models import Auction, Bid
+
+DEFAULT_BUCKETS = 100
+MAX_BUCKETS = 500
+BUCKETS_PARAM = "buckets"
+
+# No bids can be placed in these any more
+FINAL_STATUSES = (Auction.STATUS_ENDED, Auction.STATUS_SOLD, Auction.STATUS_CANCELLED)
+
+
+def bucket_count(params):
+    """
+    The ``buckets`` query parameter
+
+    Raises:
+        ValueError: not an integer from 1 to MAX_BUCKETS
+    """
+    buckets = int(params.get(BUCKETS_PARAM, DEFAULT_BUCKETS))
+    if not 1 <= buckets <= MAX_BUCKETS:
+        raise ValueError(f"buckets must be from 1 to {MAX_BUCKETS}")
+    return buckets
+
+
+def _aggregate(auction, buckets):
+    start = auction.start_time
+    width = max((auction.end_time - start).total_seconds() / buckets, 1.0)
+    with connection.cursor() as cursor:
+        # The open and close are the amounts of the least and greatest
+        # [time, amount] pairs: no per-bucket sort, and bids placed at the
+        # same time (by the auto-bid triggers) open low and close high.
+        # Bids placed outside the schedule go to the first or last bucket.
+        cursor.execute(
+            f"""
+            SELECT bucket,
+                   (MIN(ARRAY[EXTRACT(EPOCH FROM timestamp), amount]))[2],
+                   MAX(amount),
+                   MIN(amount),
+                   (MAX(ARRAY[EXTRACT(EPOCH FROM timestamp), amount]))[2],
+                   COUNT(*)
+            FROM (
+                SELECT amount, timestamp,
+                       LEAST(GREATEST(
+                           FLOOR(EXTRACT(EPOCH FROM timestamp - %(start)s) / %(width)s),
+                           0
+                       ), %(last)s)::int AS bucket
+                FROM {Bid._meta.db_table}
+                WHERE auction_id = %(auction)s AND status <> %(cancelled)s
+            ) b
+            GROUP BY bucket
+            ORDER BY bucket
+            """,
+            {
+                "auction": auction.id,
+                "start": start,
+                "width": width,
+                "last": buckets - 1,
+                "cancelled": Bid.STATUS_CANCELLED,
+            },
+        )
+        rows = cursor.fetchall()
+    return {
+        "interval": width,
+        "buckets": [
+            {
+                "start": start + timedelta(seconds=bucket * width),
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "bids": bids,
+            }
+            for bucket, open_, high, low, close, bids in rows
+        ],
+    }
+
+
+def price_history(auction, buckets=DEFAULT_BUCKETS):
+    """
+    OHLC buckets of an auction's bids
+
+    Returns:
+        dict with the bucket ``interval`` in seconds and the non-empty
+        ``buckets`` (``start``, ``open``, ``high``, ``low``, ``close``,
+        ``bids``), oldest first
+    """
+    if auction.status not in FINAL_STATUSES:
+        return _aggregate(auction, buckets)
+    key = f"price-history:{auction.id}:{buckets}"
+    history = cache.get(key)
+    if history is None:
+        history = _aggregate(auction, buckets)
+        cache.set(key, history, None)
+    return history
@@ -0,0 +1,97 @@
+"""
+Ending-soon reminders for watched auctions
+
+Each configured threshold (ENDING_SOON_REMINDER_MINUTES) fires once per
+watcher and auction. Due reminders are claimed by inserting them into the
+AuctionReminder ledger, where the unique constraint drops the ones already
+sent, and the notifications for the claimed rows are bulk inserted in the
+same transaction. Overlapping runs and retries therefore never notify
+twice. When several thresholds come due at once, e.g. for an auction
+watched an hour before it ends, only the closest one is sent.
+"""
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.notifications.models import Notification, NotificationPreference
+from .models import Auction, AuctionReminder
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+def _describe(minutes):
+    if minutes % 60 == 0:
+        hours = minutes // 60
+        return f"{hours} hour{'s' if hours != 1 else ''}"
+    return f"{minutes} minute{'s' if minutes != 1 else ''}"
+
+
+def _claim_due_reminders(cursor, now, thresholds):
+    """Insert ledger rows for every due, unsent reminder and return them"""
+    cursor.execute(
+        f"""
+        INSERT INTO {AuctionReminder._meta.db_table} (auction_id, user_id, threshold)
+        SELECT w.auction_id, w.user_id, t.minutes
+        FROM auctions_auctionwatch w
+        JOIN auctions_auction a ON a.id = w.auction_id
+        CROSS JOIN unnest(%s::integer[]) AS t(minutes)
+        LEFT JOIN {NotificationPreference._meta.db_table} p ON p.user_id = w.user_id
+        WHERE a.status = %s
+          AND a.end_time > %s
+          AND a.end_time <= %s + make_interval(mins => t.minutes)
+          AND COALESCE(p.auction_ended_notifications, true)
+        ON CONFLICT (auction_id, user_id, threshold) DO NOTHING
+        RETURNING auction_id, user_id, threshold
+        """,
+        [thresholds, Auction.STATUS_ACTIVE, now, now],
+    )
+    return cursor.fetchall()
+
+
+def send_due_reminders(now=None):
+    """
+    Send every ending-soon reminder that is due and hasn't been sent
+
+    Returns:
+        dict with the number of ``notifications_sent``
+    """
+    now = now or timezone.now()
+    thresholds = sorted(set(settings.ENDING_SOON_REMINDER_MINUTES))
+    if not thresholds:
+        return {"notifications_sent": 0}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        claimed = _claim_due_reminders(cursor, now, thresholds)
+
+        # closest threshold per (auction, watcher)
+        closest = {}
+        for auction_id, user_id, threshold in claimed:
+            key = (auction_id, user_id)
+            closest[key] = min(threshold, closest.get(key, threshold))
+
+        titles = dict(
+            Auction.objects.filter(id__in={a for a, _ in closest}).values_list(
+                "id", "title"
+            )
+        )
+        Notification.objects.bulk_create(
+            (
+                Notification(
+                    recipient_id=user_id,
+                    notification_type=Notification.TYPE_AUCTION_ENDED,
+                    template_id="auction.reminder",
+                    params={
+                        "auction_title": titles[auction_id],
+                        "remaining": _describe(threshold),
+                    },
+                    priority=Notification.PRIORITY_MEDIUM,
+                    related_object_id=auction_id,
+                    related_object_type="auction",
+                )
+                for (auction_id, user_id), threshold in closest.items()
+            ),
+            batch_size=NOTIFICATION_BATCH_SIZE,
+        )
+
+    return {"notifications_sent": len(closest)}
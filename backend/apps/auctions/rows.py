@@ -0,0 +1,442 @@
+"""
+values()-based read path for auction and bid listings
+
+Builds the same payloads as AuctionSerializer and BidSerializer from
+values() dicts instead of model instances and nested serializers: one
+query for the rows, then one each for item images, highest bidders and
+(without the Redis mirror) the user's watches. With a sparse fieldset
+(apps/core/fieldsets.py) only the requested fields' columns, joins and
+queries are run. UUIDs are left for the renderer (apps/core/renderers.py)
+to encode.
+
+List endpoints and the auction page (auction_page()) use this; other
+detail and write endpoints keep the serializers.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import (
+    CharField,
+    Count,
+    F,
+    IntegerField,
+    Max,
+    OuterRef,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, JSONObject
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.duration import duration_string
+from rest_framework import serializers
+
+from apps.accounts.models import User
+from apps.transactions.models import AutoBid
+from . import watchlist
+from .images import derivative_urls
+from .models import Auction, Bid, ItemImage
+from .services import annotate_bid_summary
+
+# AuctionSerializer field -> the values() columns it is built from
+AUCTION_FIELD_COLUMNS = {
+    "id": ("id",),
+    "title": ("title",),
+    "description": ("description",),
+    "item_details": (
+        "item_id",
+        "item__name",
+        "item__description",
+        "item__image_urls",
+        "item__category_id",
+        "item__owner_id",
+        "item__owner__email",
+        "item__owner__first_name",
+        "item__owner__last_name",
+        "item__weight",
+        "item__dimensions",
+        "item__created_at",
+        "item__updated_at",
+    ),
+    "seller_id": ("seller_id",),
+    "seller_details": (
+        "seller_id",
+        "seller__email",
+        "seller__first_name",
+        "seller__last_name",
+    ),
+    "starting_price": ("starting_price",),
+    "reserve_price": ("reserve_price",),
+    "buy_now_price": ("buy_now_price",),
+    "current_price": ("live_price",),
+    "start_time": ("start_time",),
+    "end_time": ("end_time",),
+    "status": ("status",),
+    "auction_type": ("auction_type",),
+    "total_bids": ("bid_count",),
+    "time_remaining": ("status", "end_time"),
+    "highest_bidder": ("top_bidder_id",),
+    "is_watched": ("id",),
+    "created_at": ("created_at",),
+    "updated_at": ("updated_at",),
+}
+AUCTION_FIELDS = tuple(AUCTION_FIELD_COLUMNS)
+
+IMAGE_COLUMNS = (
+    "item_id",
+    "asset_id",
+    "asset__width",
+    "asset__height",
+    "asset__derivatives",
+)
+
+USER_COLUMNS = ("id", "email", "first_name", "last_name")
+
+# BidSerializer field -> the values() columns it is built from
+BID_FIELD_COLUMNS = {
+    "id": ("id",),
+    "auction": ("auction_id",),
+    "bidder": ("bidder_id",),
+    "bidder_id": ("bidder_id",),
+    "bidder_details": (
+        "bidder_id",
+        "bidder__email",
+        "bidder__first_name",
+        "bidder__last_name",
+    ),
+    "bidder_name": ("bidder__first_name", "bidder__last_name"),
+    "auction_title": ("auction__title",),
+    "amount": ("amount",),
+    "timestamp": ("timestamp",),
+    "status": ("status",),
+}
+BID_FIELDS = tuple(BID_FIELD_COLUMNS)
+
+# Top bids on the auction page by default, and at most
+PAGE_BIDS = 10
+MAX_PAGE_BIDS = 50
+
+# Same output as the serializer fields, without binding a field per row
+_datetime = serializers.DateTimeField().to_representation
+
+
+def _decimal(value):
+    # DecimalField's string; the columns already have the field's scale
+    return None if value is None else str(value)
+
+
+def _user(user_id, email, first_name, last_name):
+    """UserProfileBasicSerializer's output"""
+    return {"id": user_id, "email": email, "name": f"{first_name} {last_name}".strip()}
+
+
+def _columns(field_columns, fields):
+    columns = dict.fromkeys(c for name in fields for c in field_columns[name])
+    # values() with no columns would select them all
+    return list(columns) or ["id"]
+
+
+def _column(name, convert=None):
+    if convert is None:
+        return lambda row: row[name]
+    return lambda row: convert(row[name])
+
+
+def _auction_values(queryset, fields):
+    # values() ignores select_related but not prefetch_related
+    queryset = queryset.select_related(None).prefetch_related(None)
+    return annotate_bid_summary(queryset, fields).values(
+        *_columns(AUCTION_FIELD_COLUMNS, fields)
+    )
+
+
+def _image_values(item_ids):
+    return ItemImage.objects.filter(item_id__in=item_ids).values(*IMAGE_COLUMNS)
+
+
+def _bidder_values(rows):
+    bidder_ids = {row["top_bidder_id"] for row in rows if row["top_bidder_id"]}
+    return User.objects.filter(id__in=bidder_ids).values_list(*USER_COLUMNS)
+
+
+def _build_auctions(rows, fields, images, bidders, watched_ids):
+    images_by_item = {}
+    for image in images:
+        images_by_item.setdefault(image["item_id"], []).append(
+            {
+                "id": image["asset_id"],
+                "width": image["asset__width"],
+                "height": image["asset__height"],
+                "derivatives": derivative_urls(image["asset__derivatives"]),
+            }
+        )
+    bidders = {bidder[0]: _user(*bidder) for bidder in bidders}
+    now = timezone.now()
+
+    def item_details(row):
+        return {
+            "id": row["item_id"],
+            "name": row["item__name"],
+            "description": row["item__description"],
+            "image_urls": row["item__image_urls"],
+            "images": images_by_item.get(row["item_id"], []),
+            "category": row["item__category_id"],
+            "owner_id": row["item__owner_id"],
+            "owner_details": _user(
+                row["item__owner_id"],
+                row["item__owner__email"],
+                row["item__owner__first_name"],
+                row["item__owner__last_name"],
+            ),
+            "weight": _decimal(row["item__weight"]),
+            "dimensions": row["item__dimensions"],
+            "created_at": _datetime(row["item__created_at"]),
+            "updated_at": _datetime(row["item__updated_at"]),
+        }
+
+    def seller_details(row):
+        return _user(
+            row["seller_id"],
+            row["seller__email"],
+            row["seller__first_name"],
+            row["seller__last_name"],
+        )
+
+    def time_remaining(row):
+        if row["status"] == Auction.STATUS_ACTIVE and row["end_time"] >= now:
+            return duration_string(row["end_time"] - now)
+        return None
+
+    getters = {
+        "item_details": item_details,
+        "seller_details": seller_details,
+        "starting_price": _column("starting_price", _decimal),
+        "reserve_price": _column("reserve_price", _decimal),
+        "buy_now_price": _column("buy_now_price", _decimal),
+        "current_price": _column("live_price", _decimal),
+        "start_time": _column("start_time", _datetime),
+        "end_time": _column("end_time", _datetime),
+        "total_bids": _column("bid_count"),
+        "time_remaining": time_remaining,
+        "highest_bidder": lambda row: bidders.get(row["top_bidder_id"]),
+        "is_watched": lambda row: row["id"] in watched_ids,
+        "created_at": _column("created_at", _datetime),
+        "updated_at": _column("updated_at", _datetime),
+    }
+    getters = [(name, getters.get(name) or _column(name)) for name in fields]
+    return [{name: get(row) for name, get in getters} for row in rows]
+
+
+def auction_rows(queryset, user=None, fields=AUCTION_FIELDS):
+    """
+    AuctionSerializer's output for every auction in ``queryset``, with
+    ``is_watched`` for ``user``
+
+    Only the AuctionSerializer ``fields`` given are rendered, and only
+    their columns, joins and queries are run.
+
+    Returns:
+        list of dicts
+    """
+    rows = list(_auction_values(queryset, fields))
+    if not rows:
+        return []
+
+    images = []
+    if "item_details" in fields:
+        images = list(_image_values([row["item_id"] for row in rows]))
+    bidders = []
+    if "highest_bidder" in fields:
+        bidders = list(_bidder_values(rows))
+    watched_ids = set()
+    if "is_watched" in fields and user is not None and user.is_authenticated:
+        watched_ids = watchlist.watched_ids(user.id, [row["id"] for row in rows])
+    return _build_auctions(rows, fields, images, bidders, watched_ids)
+
+
+async def aauction_rows(queryset, user=None, fields=AUCTION_FIELDS):
+    """Async auction_rows()"""
+    rows = [row async for row in _auction_values(queryset, fields)]
+    if not rows:
+        return []
+
+    images = []
+    if "item_details" in fields:
+        item_ids = [row["item_id"] for row in rows]
+        images = [image async for image in _image_values(item_ids)]
+    bidders = []
+    if "highest_bidder" in fields:
+        bidders = [bidder async for bidder in _bidder_values(rows)]
+    watched_ids = set()
+    if "is_watched" in fields and user is not None and user.is_authenticated:
+        watched_ids = await sync_to_async(watchlist.watched_ids)(
+            user.id, [row["id"] for row in rows]
+        )
+    return _build_auctions(rows, fields, images, bidders, watched_ids)
+
+
+def _build_bids(rows, fields):
+    getters = {
+        "auction": _column("auction_id"),
+        "bidder": _column("bidder_id"),
+        "bidder_details": lambda row: _user(
+            row["bidder_id"],
+            row["bidder__email"],
+            row["bidder__first_name"],
+            row["bidder__last_name"],
+        ),
+        "bidder_name": lambda row: (
+            f"{row['bidder__first_name']} {row['bidder__last_name']}"
+        ),
+        "auction_title": _column("auction__title"),
+        "amount": _column("amount", _decimal),
+        "timestamp": _column("timestamp", _datetime),
+    }
+    getters = [(name, getters.get(name) or _column(name)) for name in fields]
+    return [{name: get(row) for name, get in getters} for row in rows]
+
+
+def bid_rows(queryset, fields=BID_FIELDS):
+    """
+    BidSerializer's output for every bid in ``queryset``, limited to the
+    BidSerializer ``fields`` given
+
+    Returns:
+        list of dicts
+    """
+    rows = queryset.select_related(None).values(*_columns(BID_FIELD_COLUMNS, fields))
+    return _build_bids(rows, fields)
+
+
+def _json_object(columns, **expressions):
+    """
+    JSONObject with the columns as keys. Decimals must be passed as text
+    expressions: the database would encode them as JSON numbers.
+    """
+    return JSONObject(**{column: column for column in columns}, **expressions)
+
+
+def _text(column):
+    return Cast(column, output_field=CharField())
+
+
+def _page_values(queryset, user, bids):
+    """The auction row of auction_page(), with the rest of the page as JSON"""
+    auction_bids = Bid.objects.filter(auction=OuterRef("pk")).order_by()
+    bid_columns = [
+        column
+        for column in _columns(BID_FIELD_COLUMNS, BID_FIELDS)
+        if column not in ("amount", "auction__title")
+    ]
+    top_bids = auction_bids.order_by("-amount", "-timestamp").values(
+        json=_json_object(bid_columns, amount=_text("amount"))
+    )[:bids]
+    highest_bidder = (
+        Bid.objects.filter(auction=OuterRef("pk"), status=Bid.STATUS_ACTIVE)
+        .order_by("-amount")
+        .values(
+            json=_json_object(
+                ["bidder__email", "bidder__first_name", "bidder__last_name"]
+            )
+        )[:1]
+    )
+    images = ItemImage.objects.filter(item_id=OuterRef("item_id")).values(
+        json=_json_object(IMAGE_COLUMNS[1:])
+    )
+    stats = auction_bids.values("auction").annotate(
+        unique_bidders=Count("bidder_id", distinct=True), highest_bid=Max("amount")
+    )
+
+    annotations = {
+        "page_bids": ArraySubquery(top_bids),
+        "page_bidder": Subquery(highest_bidder),
+        "page_images": ArraySubquery(images),
+        "unique_bidders": Coalesce(
+            Subquery(stats.values("unique_bidders"), output_field=IntegerField()),
+            Value(0),
+        ),
+        "highest_bid": Coalesce(
+            Subquery(stats.values("highest_bid")), F("starting_price")
+        ),
+    }
+    if user is not None and user.is_authenticated:
+        autobid = AutoBid.objects.filter(user=user, auction=OuterRef("pk")).values(
+            json=_json_object(
+                ["id", "is_active", "created_at", "updated_at"],
+                user="user_id",
+                auction="auction_id",
+                max_amount=_text("max_amount"),
+                bid_increment=_text("bid_increment"),
+            )
+        )[:1]
+        annotations["page_autobid"] = Subquery(autobid)
+    return _auction_values(queryset, AUCTION_FIELDS).annotate(**annotations)
+
+
+def auction_page(queryset, user=None, bids=PAGE_BIDS):
+    """
+    Everything the auction detail page shows, from one query (plus the
+    watch lookup for ``user``)
+
+    Args:
+        queryset: the auction, as a single-row queryset
+        bids: number of top bids (by amount) to include
+
+    Returns:
+        dict with ``auction`` (AuctionSerializer's output), ``bids``
+        (BidSerializer's), ``stats`` and the user's ``autobid``
+        (AutoBidSerializer's), or None if the auction doesn't exist
+    """
+    row = _page_values(queryset, user, bids).first()
+    if row is None:
+        return None
+
+    images = row["page_images"]
+    for image in images:
+        image["item_id"] = row["item_id"]
+    bidders = []
+    if row["page_bidder"]:
+        bidder = row["page_bidder"]
+        bidders = [
+            (
+                row["top_bidder_id"],
+                bidder["bidder__email"],
+                bidder["bidder__first_name"],
+                bidder["bidder__last_name"],
+            )
+        ]
+    watched_ids = set()
+    if user is not None and user.is_authenticated:
+        if watchlist.is_watching(user.id, row["id"]):
+            watched_ids = {row["id"]}
+    (auction,) = _build_auctions([row], AUCTION_FIELDS, images, bidders, watched_ids)
+
+    top_bids = row["page_bids"]
+    for bid in top_bids:
+        bid["auction__title"] = row["title"]
+        bid["timestamp"] = parse_datetime(bid["timestamp"])
+
+    autobid = row.get("page_autobid")
+    if autobid:
+        autobid = {
+            "id": autobid["id"],
+            "user": autobid["user"],
+            "auction": autobid["auction"],
+            "max_amount": autobid["max_amount"],
+            "bid_increment": autobid["bid_increment"],
+            "is_active": autobid["is_active"],
+            "created_at": _datetime(parse_datetime(autobid["created_at"])),
+            "updated_at": _datetime(parse_datetime(autobid["updated_at"])),
+        }
+
+    return {
+        "auction": auction,
+        "bids": _build_bids(top_bids, BID_FIELDS),
+        "stats": {
+            "total_bids": row["bid_count"],
+            "unique_bidders": row["unique_bidders"],
+            "highest_bid": _decimal(row["highest_bid"]),
+            "current_price": auction["current_price"],
+        },
+        "autobid": autobid,
+    }
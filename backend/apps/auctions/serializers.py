@@ -3,7 +3,10 @@ from django.utils import timezone
 from django.db import transaction
 
 from apps.accounts.serializers import UserProfileBasicSerializer
-from .models import Category, Item, Auction, Bid, AuctionWatch
+from apps.core.fieldsets import SparseFieldsMixin
+from . import watchlist
+from .images import derivative_urls
+from .models import Category, Item, Auction, Bid, AuctionWatch, PriceAlert, SavedSearch
 from apps.transactions.models import AutoBid
 
 
@@ -13,10 +16,11 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "parent"]
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner_id = serializers.UUIDField(read_only=True)
     owner_details = UserProfileBasicSerializer(source="owner", read_only=True)
     category_name = serializers.CharField(required=False, write_only=True)
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Item
@@ -25,6 +29,7 @@ class ItemSerializer(serializers.ModelSerializer):
             "name",
             "description",
             "image_urls",
+            "images",
             "category",
             "category_name",
             "owner_id",
@@ -34,11 +39,22 @@ class ItemSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "owner_id", "created_at", "updated_at"]
+        read_only_fields = ["id", "owner_id", "images", "created_at", "updated_at"]
         extra_kwargs = {
             "category": {"required": False},
         }
 
+    def get_images(self, obj):
+        return [
+            {
+                "id": image.asset_id,
+                "width": image.asset.width,
+                "height": image.asset.height,
+                "derivatives": derivative_urls(image.asset.derivatives),
+            }
+            for image in obj.images.all()
+        ]
+
     def create(self, validated_data):
         user = self.context["request"].user
         validated_data["owner"] = user
@@ -60,7 +76,7 @@ class ItemSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class BidSerializer(serializers.ModelSerializer):
+class BidSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     bidder_id = serializers.UUIDField(read_only=True)
     bidder_details = UserProfileBasicSerializer(source="bidder", read_only=True)
     auction_title = serializers.CharField(source="auction.title", read_only=True)
@@ -132,7 +148,7 @@ class BidSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class AuctionSerializer(serializers.ModelSerializer):
+class AuctionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     seller_id = serializers.UUIDField(read_only=True)
     seller_details = UserProfileBasicSerializer(source="seller", read_only=True)
     item_details = ItemSerializer(source="item", read_only=True)
@@ -185,7 +201,7 @@ class AuctionSerializer(serializers.ModelSerializer):
     def get_is_watched(self, obj):
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            return AuctionWatch.objects.filter(user=request.user, auction=obj).exists()
+            return watchlist.is_watching(request.user.id, obj.id)
         return False
 
     def validate(self, data):
@@ -303,6 +319,28 @@ class AuctionSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class PrefetchedAuctionSerializer(AuctionSerializer):
+    """
+    Read-only AuctionSerializer for auctions loaded through with_bid_summary()
+
+    Computed fields come from annotations and the ``bidders``/``watched_ids``
+    context, so serializing never queries the database (safe in async views).
+    """
+
+    current_price = serializers.DecimalField(
+        source="live_price", max_digits=12, decimal_places=2, read_only=True
+    )
+    total_bids = serializers.IntegerField(source="bid_count", read_only=True)
+    highest_bidder = serializers.SerializerMethodField()
+
+    def get_highest_bidder(self, obj):
+        bidder = self.context.get("bidders", {}).get(obj.top_bidder_id)
+        return UserProfileBasicSerializer(bidder).data if bidder else None
+
+    def get_is_watched(self, obj):
+        return obj.id in self.context.get("watched_ids", ())
+
+
 class AuctionWatchSerializer(serializers.ModelSerializer):
     class Meta:
         model = AuctionWatch
@@ -315,6 +353,66 @@ class AuctionWatchSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """A search whose new matching auctions are notified to its owner"""
+
+    class Meta:
+        model = SavedSearch
+        fields = [
+            "id", "name", "query", "category", "min_price", "max_price",
+            "notify", "created_at",
+        ]
+        read_only_fields = ["id", "created_at"]
+
+    def validate(self, data):
+        def value(field):
+            if field in data:
+                return data[field]
+            return getattr(self.instance, field, None)
+
+        min_price, max_price = value("min_price"), value("max_price")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError(
+                {"max_price": "Must not be lower than the minimum price."}
+            )
+        if not any(
+            value(field) not in (None, "")
+            for field in ("query", "category", "min_price", "max_price")
+        ):
+            raise serializers.ValidationError(
+                "Give keywords, a category or a price range to search for."
+            )
+        return data
+
+
+class PriceAlertSerializer(serializers.ModelSerializer):
+    """An alert on the price of an auction, or of the auctions of a category"""
+
+    class Meta:
+        model = PriceAlert
+        fields = ["id", "auction", "category", "direction", "threshold", "created_at"]
+        read_only_fields = ["id", "created_at"]
+
+    def validate_threshold(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Must be greater than zero.")
+        return value
+
+    def validate(self, data):
+        auction = data.get("auction", getattr(self.instance, "auction", None))
+        category = data.get("category", getattr(self.instance, "category", None))
+        if (auction is None) == (category is None):
+            raise serializers.ValidationError("Give either an auction or a category.")
+        if auction is not None and auction.status not in (
+            Auction.STATUS_ACTIVE,
+            Auction.STATUS_PENDING,
+        ):
+            raise serializers.ValidationError(
+                {"auction": "Alerts can only be set on live or upcoming auctions."}
+            )
+        return data
+
+
 class AuctionCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating auctions with item data"""
     
@@ -0,0 +1,114 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.accounts.models import User
+from . import watchlist
+from .models import Bid
+
+
+# AuctionSerializer field -> the annotate_bid_summary() value it reads
+SUMMARY_FIELDS = {
+    "current_price": "live_price",
+    "highest_bidder": "top_bidder_id",
+    "total_bids": "bid_count",
+}
+
+
+def annotate_bid_summary(queryset, fields=None):
+    """
+    Annotate auctions with the values AuctionSerializer otherwise computes
+    with per-row queries (current price, highest bidder and bid count)
+
+    Adds ``live_price``, ``top_bidder_id`` and ``bid_count``, or only those
+    needed for the AuctionSerializer ``fields`` given.
+    """
+    highest_bid = Bid.objects.filter(
+        auction=OuterRef("pk"), status=Bid.STATUS_ACTIVE
+    ).order_by("-amount")
+    bid_count = (
+        Bid.objects.filter(auction=OuterRef("pk"))
+        .order_by()
+        .values("auction")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+
+    annotations = {
+        "live_price": Coalesce(
+            Subquery(highest_bid.values("amount")[:1]), F("starting_price")
+        ),
+        "top_bidder_id": Subquery(highest_bid.values("bidder_id")[:1]),
+        "bid_count": Coalesce(
+            Subquery(bid_count, output_field=IntegerField()), Value(0)
+        ),
+    }
+    if fields is not None:
+        wanted = {SUMMARY_FIELDS[name] for name in fields if name in SUMMARY_FIELDS}
+        annotations = {k: v for k, v in annotations.items() if k in wanted}
+    return queryset.annotate(**annotations)
+
+
+def select_auction_relations(queryset, fields=None):
+    """
+    select_related()/prefetch_related() for the related rows the
+    AuctionSerializer ``fields`` given (default all) read
+    """
+    if fields is None or "seller_details" in fields:
+        queryset = queryset.select_related("seller")
+    if fields is None or "item_details" in fields:
+        queryset = queryset.select_related("item", "item__owner").prefetch_related(
+            "item__images__asset"
+        )
+    return queryset
+
+
+def with_bid_summary(queryset, fields=None):
+    """
+    annotate_bid_summary() plus the related rows AuctionSerializer reads,
+    for serializing auction instances without per-row queries
+    """
+    return annotate_bid_summary(select_auction_relations(queryset, fields), fields)
+
+
+def select_bid_relations(queryset, fields=None):
+    """select_related() for the related rows the BidSerializer ``fields`` read"""
+    if fields is None or {"bidder_details", "bidder_name"} & set(fields):
+        queryset = queryset.select_related("bidder")
+    if fields is None or "auction_title" in fields:
+        queryset = queryset.select_related("auction")
+    return queryset
+
+
+async def aget_auction_context(auctions, user=None, fields=None):
+    """
+    Load what PrefetchedAuctionSerializer needs for a page of auctions
+    annotated by with_bid_summary(), in at most two queries (one when the
+    watch sets are mirrored in Redis), skipping what the AuctionSerializer
+    ``fields`` given don't render
+
+    Returns:
+        dict to pass as serializer context (``bidders``, ``watched_ids``
+        and, when given, ``fields``)
+    """
+    bidders = {}
+    if fields is None or "highest_bidder" in fields:
+        bidder_ids = {a.top_bidder_id for a in auctions if a.top_bidder_id}
+        if bidder_ids:
+            bidders = {u.id: u async for u in User.objects.filter(id__in=bidder_ids)}
+
+    watched_ids = set()
+    if (
+        (fields is None or "is_watched" in fields)
+        and user is not None
+        and user.is_authenticated
+        and auctions
+    ):
+        watched_ids = await sync_to_async(watchlist.watched_ids)(
+            user.id, [a.id for a in auctions]
+        )
+
+    context = {"bidders": bidders, "watched_ids": watched_ids}
+    if fields is not None:
+        context["fields"] = fields
+    return context
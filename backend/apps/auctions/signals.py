@@ -1,17 +1,24 @@
-from django.db.models.signals import post_save, pre_save, pre_delete
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from decimal import Decimal
 
-from .models import Auction, Bid, AuctionWatch
+from . import autocomplete, price_alerts, trending, watchlist
+from .models import Auction, Bid, AuctionWatch, Category, Item
+from .tasks import ingest_item_images, percolate_auctions
 
 
 @receiver(post_save, sender=Auction)
 def handle_auction_creation(sender, instance, created, **kwargs):
     """Handle specialized operations for auction creation"""
     if created:
-        # Special operations for newly created auctions that aren't handled by triggers
-        pass
+        # Notify the saved searches matching it in a worker once committed
+        transaction.on_commit(
+            partial(percolate_auctions.delay, [instance.id]), robust=True
+        )
 
 
 # Disable the bid time extension signal since it's now handled by a trigger
@@ -31,6 +38,27 @@ def handle_auction_creation(sender, instance, created, **kwargs):
 #             auction.save(update_fields=["end_time"])
 
 
+@receiver(pre_save, sender=Item)
+def compare_item_image_urls(sender, instance, update_fields=None, **kwargs):
+    """Note whether the save gives an item image URLs it didn't have"""
+    instance._new_image_urls = bool(instance.image_urls) and (
+        instance._state.adding
+        or (update_fields is None or "image_urls" in update_fields)
+        and not Item.objects.filter(
+            id=instance.id, image_urls=instance.image_urls
+        ).exists()
+    )
+
+
+@receiver(post_save, sender=Item)
+def ingest_new_item_images(sender, instance, **kwargs):
+    """Fetch the item's new image URLs in a worker once committed"""
+    if instance._new_image_urls:
+        transaction.on_commit(
+            partial(ingest_item_images.delay, instance.id), robust=True
+        )
+
+
 @receiver(post_save, sender=Bid)
 def handle_bid_status_updates(sender, instance, created, **kwargs):
     """Handle bid status updates when a new bid is created"""
@@ -38,3 +66,93 @@ def handle_bid_status_updates(sender, instance, created, **kwargs):
         Bid.objects.filter(auction=instance.auction, status=Bid.STATUS_ACTIVE).exclude(
             id=instance.id
         ).update(status=Bid.STATUS_OUTBID)
+
+
+@receiver(post_save, sender=Auction)
+def update_autocomplete_auction(sender, instance, **kwargs):
+    """Index an auction that became active, drop one that no longer is"""
+    transaction.on_commit(
+        lambda: autocomplete.index_auctions([instance]), robust=True
+    )
+
+
+@receiver(post_save, sender=Auction)
+def forget_trending_auction(sender, instance, created, **kwargs):
+    """Only active auctions are ranked"""
+    if not created and instance.status != Auction.STATUS_ACTIVE:
+        transaction.on_commit(lambda: trending.forget(instance.id), robust=True)
+
+
+@receiver(post_delete, sender=Auction)
+def remove_autocomplete_auction(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: autocomplete.remove_auction(instance.id), robust=True
+    )
+
+
+@receiver(post_save, sender=Category)
+def update_autocomplete_category(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: autocomplete.index_category(instance), robust=True
+    )
+
+
+@receiver(post_delete, sender=Category)
+def remove_autocomplete_category(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: autocomplete.remove_category(instance.id), robust=True
+    )
+
+
+@receiver(post_save, sender=Bid)
+def count_bid_for_autocomplete(sender, instance, created, **kwargs):
+    """A bid makes its auction rank higher in suggestions"""
+    if created:
+        # robust: a failure is logged, the committed bid still succeeds
+        transaction.on_commit(
+            lambda: autocomplete.bump_auction(instance.auction_id), robust=True
+        )
+
+
+@receiver(post_save, sender=Bid)
+def count_bid_for_trending(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: trending.record_bid(instance), robust=True)
+
+
+@receiver(post_save, sender=Bid)
+def evaluate_price_alerts(sender, instance, created, **kwargs):
+    """Fire the price alerts a new bid crossed, outside its transaction"""
+    if created:
+        transaction.on_commit(
+            lambda: price_alerts.evaluate(instance.auction), robust=True
+        )
+
+
+@receiver(post_save, sender=AuctionWatch)
+def mirror_watch_added(sender, instance, created, **kwargs):
+    """
+    Write a new watch through to the Redis watch sets once committed, and
+    count it towards the auction's rank in suggestions and trending
+    """
+    if created:
+        transaction.on_commit(
+            lambda: watchlist.add(instance.user_id, instance.auction_id)
+        )
+        transaction.on_commit(
+            lambda: autocomplete.bump_auction(instance.auction_id), robust=True
+        )
+        transaction.on_commit(
+            lambda: trending.record_watch(instance.auction_id), robust=True
+        )
+
+
+@receiver(post_delete, sender=AuctionWatch)
+def mirror_watch_removed(sender, instance, **kwargs):
+    """Write a removed watch through to the Redis watch sets once committed"""
+    transaction.on_commit(
+        lambda: watchlist.remove(instance.user_id, instance.auction_id)
+    )
+    transaction.on_commit(
+        lambda: autocomplete.bump_auction(instance.auction_id, -1), robust=True
+    )
@@ -34,49 +34,90 @@ def check_auctions_status():
 @shared_task
 def cleanup_stale_auctions():
     """
-    Periodic task to clean up draft auctions that are older than 30 days
+    Periodic task to clean up draft auctions older than the stale_drafts
+    retention (30 days by default), in batches
     """
-    thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
-    stale_drafts = Auction.objects.filter(
-        status=Auction.STATUS_DRAFT, created_at__lt=thirty_days_ago
-    )
+    from apps.core.retention import apply_policy
 
-    count = stale_drafts.count()
-    stale_drafts.delete()
+    result = apply_policy("stale_drafts")
 
-    return {"cleaned_drafts": count}
+    return {"cleaned_drafts": result["deleted"], "complete": result["complete"]}
 
 
 @shared_task
 def notify_ending_soon_auctions():
     """
-    Notify watchers of auctions ending within 24 hours
+    Periodic task sending each watcher one reminder per threshold
+    (ENDING_SOON_REMINDER_MINUTES) as auctions approach their end
     """
-    from apps.notifications.models import Notification
-    from apps.notifications.services import create_notification
+    from .reminders import send_due_reminders
 
-    now = timezone.now()
-    end_threshold = now + timezone.timedelta(hours=24)
+    return send_due_reminders()
 
-    ending_soon = Auction.objects.filter(
-        status=Auction.STATUS_ACTIVE, end_time__gt=now, end_time__lte=end_threshold
-    )
 
-    notification_count = 0
+@shared_task
+def ingest_item_images(item_id):
+    """
+    Fetch an item's image_urls and store resized derivatives for the ones
+    not ingested yet
+    """
+    from .images import ingest_image_urls
+    from .models import Item
+
+    item = Item.objects.filter(id=item_id).first()
+    if item is None:
+        return {"ingested": 0, "failed": {}}
+    return ingest_image_urls(item)
 
-    for auction in ending_soon:
-        for watcher in auction.watchers.all():
-            user = watcher.user
 
-            create_notification(
-                recipient=user,
-                notification_type=Notification.TYPE_AUCTION_ENDED,
-                title=f"Auction ending soon: {auction.title}",
-                message=f"The auction '{auction.title}' you're watching is ending in less than 24 hours.",
-                priority=Notification.PRIORITY_MEDIUM,
-                related_object_id=auction.id,
-                related_object_type="auction",
-            )
-            notification_count += 1
+@shared_task
+def percolate_auctions(auction_ids):
+    """
+    Notify the users whose saved searches match new auctions, outside the
+    request that created them
+    """
+    from . import percolator
+
+    auctions = Auction.objects.filter(id__in=auction_ids).select_related("item")
+    return {"notified": percolator.percolate(auctions)}
 
-    return {"notifications_sent": notification_count}
+
+@shared_task
+def rebuild_autocomplete_index():
+    """
+    Periodic task reloading the autocomplete index, picking up changes made
+    outside the ORM (bulk updates, database triggers)
+    """
+    from . import autocomplete
+
+    return {"rebuilt": autocomplete.rebuild()}
+
+
+@shared_task
+def rebuild_watchlist_mirror():
+    """
+    Task rebuilding the Redis watch sets if Redis has no complete copy,
+    e.g. after a restart or a failed write-through; reads use the database
+    meanwhile
+    """
+    from . import watchlist
+
+    if watchlist.get_client() is None or watchlist.is_ready():
+        return {"rebuilt": False}
+    return {"rebuilt": watchlist.rebuild()}
+
+
+@shared_task
+def absorb_bid_sketches():
+    """
+    Task adding the bids queued by the bid trigger to the analytics
+    sketches, so bids never wait on the sketch rows' locks
+    """
+    from .analytics import ABSORB_BATCH_SIZE, absorb_bids
+
+    absorbed = 0
+    while True:
+        taken = absorb_bids()
+        absorbed += taken
+        if taken < ABSORB_BATCH_SIZE:
+            return {"absorbed": absorbed}
@@ -1,3 +1,2245 @@
-from django.test import TestCase
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import redis
+from celery import Task
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User, Wallet
+from apps.notifications.models import Notification, NotificationPreference
+from apps.transactions.models import AutoBid
+from apps.core.renderers import ORJSONRenderer
+from apps.core.sketches import CountMin, HyperLogLog, TDigest
+from . import (
+    analytics,
+    autocomplete,
+    images,
+    price_alerts,
+    price_history,
+    trending,
+    view_counts,
+    watchlist,
+)
+from .facets import facet_counts
+from .models import (
+    Auction,
+    AuctionReminder,
+    AuctionWatch,
+    Bid,
+    Category,
+    ImageAsset,
+    Item,
+    ItemImage,
+    PendingSketchBid,
+    PriceAlert,
+    AuctionViewCount,
+    SavedSearch,
+    TrendingScore,
+)
+from .admin_views import AdminAuctionViewSet, admin_auction_dashboard
+from .reminders import send_due_reminders
+from .rows import auction_page, auction_rows, bid_rows
+from .serializers import AuctionSerializer, AutoBidSerializer, BidSerializer
+from .tasks import (
+    absorb_bid_sketches,
+    ingest_item_images,
+    percolate_auctions,
+    rebuild_watchlist_mirror,
+)
+
+
+def queued_tasks(callbacks, task):
+    """The first argument of each call of ``task`` on-commit callbacks queue"""
+    return [
+        callback.args[0]
+        for callback in callbacks
+        if getattr(callback, "func", None) == task.delay
+    ]
+
+
+def run_callbacks(callbacks):
+    """Run on-commit callbacks, except those queueing tasks (there's no broker)"""
+    for callback in callbacks:
+        func = getattr(callback, "func", None)
+        if not isinstance(getattr(func, "__self__", None), Task):
+            callback()
+
+
+def explain(queryset):
+    """
+    EXPLAIN for a queryset with sequential scans disabled
+
+    At test-database size the planner rightly prefers a seq scan, so this
+    checks that an index can serve the query shape, not the cost estimate.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def index_names(index):
+    """The index and, for a partitioned table, its per-partition indexes"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [index],
+        )
+        return [index] + [row[0] for row in cursor.fetchall()]
+
+
+class HotQueryIndexTests(TestCase):
+    def assertUsesIndex(self, plan, index):
+        names = index_names(index)
+        self.assertTrue(
+            any(re.search(rf"\b{name}\b", plan) for name in names),
+            f"{index} not used in:\n{plan}",
+        )
+
+    def assertNoSort(self, plan):
+        # a Sort node, not the "Sort Key" of a Merge Append over partitions
+        self.assertNotRegex(plan, r"(^|->\s+)Sort\s+\(")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidder = User.objects.create_user(
+            email="bidder@example.com", password="pw", first_name="B", last_name="B"
+        )
+        other_seller = User.objects.create_user(
+            email="other@example.com", password="pw", first_name="O", last_name="O"
+        )
+        category = Category.objects.create(name="Test")
+        now = timezone.now()
+        statuses = [Auction.STATUS_ACTIVE, Auction.STATUS_PENDING, Auction.STATUS_ENDED]
+
+        auctions = []
+        for i in range(60):
+            # half by another seller, so a seller filter is selective
+            seller = cls.seller if i < 30 else other_seller
+            item = Item.objects.create(
+                name=f"Item {i}", description="", category=category, owner=seller
+            )
+            auctions.append(
+                Auction(
+                    item=item,
+                    seller=seller,
+                    title=f"Auction {i}",
+                    description="",
+                    starting_price=Decimal("10.00"),
+                    start_time=now - timedelta(hours=i),
+                    end_time=now + timedelta(hours=i),
+                    status=statuses[i % len(statuses)],
+                )
+            )
+        Auction.objects.bulk_create(auctions)
+        cls.auction = auctions[0]
+
+        Bid.objects.bulk_create(
+            Bid(auction=auction, bidder=cls.bidder, amount=Decimal(11 + n))
+            for auction in auctions
+            for n in range(5)
+        )
+        AuctionWatch.objects.create(user=cls.bidder, auction=cls.auction)
+
+    def test_highest_bid_uses_index(self):
+        plan = explain(
+            Bid.objects.filter(auction=self.auction, status=Bid.STATUS_ACTIVE)
+            .order_by("-amount")
+            .values("amount")[:1]
+        )
+        self.assertUsesIndex(plan, "bid_auction_status_amount_idx")
+        self.assertNoSort(plan)
+
+    def test_bidder_active_bids_use_index(self):
+        plan = explain(Bid.objects.filter(bidder=self.bidder, status=Bid.STATUS_ACTIVE))
+        self.assertUsesIndex(plan, "bid_bidder_status_idx")
+
+    def test_status_sweeps_use_index(self):
+        now = timezone.now()
+        plan = explain(
+            Auction.objects.filter(status=Auction.STATUS_ACTIVE, end_time__lte=now)
+        )
+        self.assertUsesIndex(plan, "auction_status_end_idx")
+
+        plan = explain(
+            Auction.objects.filter(status=Auction.STATUS_PENDING, start_time__lte=now)
+        )
+        self.assertUsesIndex(plan, "auction_status_start_idx")
+
+    def test_newest_active_auctions_use_partial_index(self):
+        plan = explain(
+            Auction.objects.filter(status=Auction.STATUS_ACTIVE).order_by(
+                "-created_at"
+            )[:3]
+        )
+        self.assertUsesIndex(plan, "auction_active_created_idx")
+
+    def test_seller_auctions_use_index(self):
+        # unordered, like the per-seller counts in the admin user stats
+        plan = explain(
+            Auction.objects.filter(
+                seller=self.seller, status=Auction.STATUS_ACTIVE
+            ).order_by()
+        )
+        self.assertUsesIndex(plan, "auction_seller_status_idx")
+
+    def test_watched_auctions_use_index(self):
+        # served by the (user, auction) unique constraint
+        plan = explain(AuctionWatch.objects.filter(user=self.bidder))
+        self.assertRegex(plan, r"Index (Only )?Scan using auctions_auctionwatch_user_id")
+
+
+class WatchlistTests(TestCase):
+    """Watch lookups; runs against Redis when WATCHLIST_TEST_REDIS_URL is set"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.watchers = [
+            User.objects.create_user(
+                email=f"watcher{i}@example.com", password="pw", first_name="W", last_name="W"
+            )
+            for i in range(3)
+        ]
+        category = Category.objects.create(name="Test")
+        now = timezone.now()
+        cls.auctions = [
+            Auction.objects.create(
+                item=Item.objects.create(
+                    name=f"Item {i}", description="", category=category, owner=cls.seller
+                ),
+                seller=cls.seller,
+                title=f"Auction {i}",
+                description="",
+                starting_price=Decimal("10.00"),
+                start_time=now,
+                end_time=now + timedelta(days=1),
+                status=Auction.STATUS_ACTIVE,
+            )
+            for i in range(2)
+        ]
+
+    def watch(self, user, auction):
+        with self.captureOnCommitCallbacks(execute=True):
+            return AuctionWatch.objects.create(user=user, auction=auction)
+
+    def assertWatchState(self):
+        first, second = self.auctions
+        self.assertTrue(watchlist.is_watching(self.watchers[0].id, first.id))
+        self.assertFalse(watchlist.is_watching(self.watchers[2].id, first.id))
+        self.assertEqual(watchlist.watcher_count(first.id), 2)
+        self.assertEqual(watchlist.watcher_count(second.id), 1)
+        self.assertCountEqual(
+            watchlist.watcher_ids(first.id), [w.id for w in self.watchers[:2]]
+        )
+        self.assertEqual(
+            watchlist.watched_ids(self.watchers[0].id), {first.id, second.id}
+        )
+        self.assertEqual(
+            watchlist.watched_ids(self.watchers[1].id, [first.id, second.id]),
+            {first.id},
+        )
+
+    def build_state(self):
+        first, second = self.auctions
+        self.watch(self.watchers[0], first)
+        self.watch(self.watchers[1], first)
+        self.watch(self.watchers[0], second)
+        removed = self.watch(self.watchers[2], first)
+        with self.captureOnCommitCallbacks(execute=True):
+            removed.delete()
+
+    @override_settings(WATCHLIST_REDIS_URL="")
+    def test_database_fallback(self):
+        self.build_state()
+        self.assertWatchState()
+
+    def test_failed_mirror_reads_fall_back_to_the_database(self):
+        class ReadyButUnreachable(redis.Redis):
+            """A mirror that looks complete, on a port nothing listens on"""
+
+            def exists(self, *names):
+                return 1
+
+        with override_settings(WATCHLIST_REDIS_URL=""):
+            self.build_state()
+        watchlist._client = ReadyButUnreachable.from_url(
+            "redis://127.0.0.1:1/0", socket_connect_timeout=0.5
+        )
+        self.addCleanup(setattr, watchlist, "_client", None)
+        with override_settings(WATCHLIST_REDIS_URL="redis://127.0.0.1:1/0"):
+            self.assertWatchState()
+
+    def test_incomplete_mirrors_are_not_rebuilt_in_requests(self):
+        class NotReady(redis.Redis):
+            """A mirror without a complete copy"""
+
+            def exists(self, *names):
+                return 0
+
+            def lock(self, *args, **kwargs):
+                raise AssertionError("rebuilt in a request")
+
+        with override_settings(WATCHLIST_REDIS_URL=""):
+            self.build_state()
+        watchlist._client = NotReady.from_url(
+            "redis://127.0.0.1:1/0", socket_connect_timeout=0.5
+        )
+        self.addCleanup(setattr, watchlist, "_client", None)
+        with override_settings(WATCHLIST_REDIS_URL="redis://127.0.0.1:1/0"):
+            self.assertWatchState()
+
+    @unittest.skipUnless(
+        os.environ.get("WATCHLIST_TEST_REDIS_URL"), "WATCHLIST_TEST_REDIS_URL not set"
+    )
+    def test_redis_mirror_write_through_and_rebuild(self):
+        with override_settings(WATCHLIST_REDIS_URL=os.environ["WATCHLIST_TEST_REDIS_URL"]):
+            watchlist._client = None
+            client = watchlist.get_client()
+            client.flushdb()
+            try:
+                self.build_state()
+                # from the database until the mirror is rebuilt
+                self.assertWatchState()
+                self.assertEqual(rebuild_watchlist_mirror(), {"rebuilt": True})
+                self.assertEqual(rebuild_watchlist_mirror(), {"rebuilt": False})
+
+                # answered from Redis alone
+                with self.assertNumQueries(0):
+                    self.assertWatchState()
+
+                client.flushdb()
+                self.assertWatchState()
+                self.assertFalse(watchlist.is_ready())
+            finally:
+                client.flushdb()
+                watchlist._client = None
+
+
+@override_settings(ENDING_SOON_REMINDER_MINUTES=[1440, 60, 5])
+class EndingSoonReminderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.watchers = [
+            User.objects.create_user(
+                email=f"watcher{i}@example.com", password="pw", first_name="W", last_name="W"
+            )
+            for i in range(3)
+        ]
+        now = timezone.now()
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Item",
+                description="",
+                category=Category.objects.create(name="Test"),
+                owner=cls.seller,
+            ),
+            seller=cls.seller,
+            title="Clock",
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(days=1),
+            end_time=now + timedelta(minutes=30),
+            status=Auction.STATUS_ACTIVE,
+        )
+        for watcher in cls.watchers:
+            AuctionWatch.objects.create(user=watcher, auction=cls.auction)
+        NotificationPreference.objects.filter(user=cls.watchers[2]).update(
+            auction_ended_notifications=False
+        )
+
+    def reminders(self):
+        return Notification.objects.filter(template_id="auction.reminder")
+
+    def test_each_threshold_fires_once(self):
+        self.assertEqual(send_due_reminders(), {"notifications_sent": 2})
+        self.assertEqual(send_due_reminders(), {"notifications_sent": 0})
+
+        # 24h and 1h are both due, only the closest one is sent
+        self.assertEqual(
+            {n.rendered_message for n in self.reminders()},
+            {"The auction 'Clock' you're watching ends in less than 1 hour."},
+        )
+        self.assertEqual(
+            set(AuctionReminder.objects.values_list("threshold", flat=True)), {1440, 60}
+        )
+
+        later = self.auction.end_time - timedelta(minutes=4)
+        self.assertEqual(send_due_reminders(now=later), {"notifications_sent": 2})
+        self.assertEqual(send_due_reminders(now=later), {"notifications_sent": 0})
+        self.assertFalse(self.reminders().filter(recipient=self.watchers[2]).exists())
+
+    def test_extending_end_time_rearms_pending_thresholds(self):
+        send_due_reminders()
+        Auction.objects.filter(id=self.auction.id).update(
+            end_time=timezone.now() + timedelta(hours=3)
+        )
+
+        # the 1h reminder is pending again, the 24h one stays sent
+        self.assertEqual(
+            set(AuctionReminder.objects.values_list("threshold", flat=True)), {1440}
+        )
+        self.assertEqual(send_due_reminders(), {"notifications_sent": 0})
+        soon = timezone.now() + timedelta(hours=2, minutes=30)
+        self.assertEqual(send_due_reminders(now=soon), {"notifications_sent": 2})
+
+
+def png(width, height, color):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@override_settings(
+    IMAGE_DERIVATIVE_WIDTHS=[160, 320],
+    IMAGE_DERIVATIVE_FORMATS=["webp"],
+    IMAGE_PROCESS_WORKERS=1,
+)
+class ItemImageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email="owner@example.com", password="pw", first_name="O", last_name="O"
+        )
+        category = Category.objects.create(name="Test")
+        cls.items = [
+            Item.objects.create(
+                name=f"Item {i}", description="", category=category, owner=cls.owner
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage_settings = override_settings(
+            STORAGES={
+                "images": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": location, "base_url": "/media/images/"},
+                },
+            }
+        )
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+        self.storage = storages["images"]
+
+    def test_identical_content_is_stored_once(self):
+        photo = png(400, 200, "red")
+        images.attach_images(self.items[0], [photo, png(100, 50, "blue")])
+        images.attach_images(self.items[1], [photo])
+        images.attach_images(self.items[1], [photo])
+
+        self.assertEqual(ImageAsset.objects.count(), 2)
+        self.assertEqual(ItemImage.objects.filter(item=self.items[1]).count(), 1)
+
+        asset = ImageAsset.objects.get(width=400)
+        self.assertEqual(asset.height, 200)
+        self.assertEqual(set(asset.derivatives["webp"]), {"160", "320"})
+        for key in asset.derivatives["webp"].values():
+            self.assertTrue(key.startswith(f"{asset.sha256[:2]}/{asset.sha256}/"))
+            self.assertTrue(self.storage.exists(key))
+
+        # never upscaled past the source width
+        small = ImageAsset.objects.get(width=100)
+        self.assertEqual(
+            small.derivatives,
+            {"webp": {"100": images.derivative_key(small.sha256, 100, "webp")}},
+        )
+
+    def test_upload_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = f"/api/v1/auctions/items/{self.items[0].id}/images/"
+
+        response = client.post(
+            url,
+            {
+                "images": [
+                    SimpleUploadedFile("a.png", png(640, 480, "green")),
+                    SimpleUploadedFile("b.png", png(320, 240, "white")),
+                ]
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        uploaded = response.json()["data"]["images"]
+        self.assertEqual([image["width"] for image in uploaded], [640, 320])
+        self.assertEqual(
+            uploaded[0]["derivatives"]["webp"]["160"],
+            "/media/images/" + images.derivative_key(uploaded[0]["id"], 160, "webp"),
+        )
+
+        response = client.post(
+            url,
+            {"images": [SimpleUploadedFile("c.png", b"not an image")]},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        other = User.objects.create_user(
+            email="other@example.com", password="pw", first_name="X", last_name="X"
+        )
+        client.force_authenticate(other)
+        response = client.post(
+            url,
+            {"images": [SimpleUploadedFile("d.png", png(10, 10, "black"))]},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_new_image_urls_are_queued_for_ingestion(self):
+        item = self.items[0]
+        with self.captureOnCommitCallbacks() as callbacks:
+            item.image_urls = ["https://example.com/a.jpg"]
+            item.save()
+        self.assertEqual(queued_tasks(callbacks, ingest_item_images), [item.id])
+
+        # unchanged, or not saved
+        with self.captureOnCommitCallbacks() as callbacks:
+            item.save()
+            item.image_urls.append("https://example.com/b.jpg")
+            item.save(update_fields=["name"])
+            self.items[1].save()
+        self.assertEqual(queued_tasks(callbacks, ingest_item_images), [])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            new = Item.objects.create(
+                name="New",
+                description="",
+                category=item.category,
+                owner=self.owner,
+                image_urls=["https://example.com/c.jpg"],
+            )
+        self.assertEqual(queued_tasks(callbacks, ingest_item_images), [new.id])
+
+    def test_image_urls_must_be_public(self):
+        for url in [
+            "ftp://example.com/a.png",
+            "http://127.0.0.1/a.png",
+            "http://localhost:8000/a.png",
+            "http://169.254.169.254/latest/meta-data/",
+            "http://10.0.0.5/a.png",
+            "http://[::1]/a.png",
+            "http://[::ffff:127.0.0.1]/a.png",
+        ]:
+            with self.subTest(url=url), self.assertRaises(ValueError):
+                images.fetch_image(url)
+
+        # a redirect from a public host is checked again
+        handler = images._PublicRedirectHandler()
+        request = images.Request("http://93.184.215.14/a.png")
+        for url in ["http://169.254.169.254/", "ftp://93.184.215.14/a.png"]:
+            with self.subTest(url=url), self.assertRaises(ValueError):
+                handler.redirect_request(request, None, 302, "Found", {}, url)
+
+
+@override_settings(WATCHLIST_REDIS_URL="")
+class RowReadPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidder = User.objects.create_user(
+            email="bidder@example.com", password="pw", first_name="B", last_name=""
+        )
+        category = Category.objects.create(name="Test")
+        now = timezone.now()
+        cls.auctions = []
+        for i, status in enumerate(
+            [Auction.STATUS_ACTIVE, Auction.STATUS_ACTIVE, Auction.STATUS_ENDED]
+        ):
+            cls.auctions.append(
+                Auction.objects.create(
+                    item=Item.objects.create(
+                        name=f"Item {i}",
+                        description="",
+                        image_urls=["https://example.com/a.jpg"],
+                        category=category,
+                        owner=cls.seller,
+                        weight=Decimal("1.50"),
+                    ),
+                    seller=cls.seller,
+                    title=f"Auction {i}",
+                    description="",
+                    starting_price=Decimal("10.00"),
+                    reserve_price=Decimal("20.00") if i else None,
+                    start_time=now - timedelta(days=1),
+                    end_time=now + timedelta(days=1),
+                    status=status,
+                )
+            )
+        ImageAsset.objects.create(
+            sha256="ab" * 32,
+            width=640,
+            height=480,
+            derivatives={"webp": {"320": f"ab/{'ab' * 32}/320.webp"}},
+        )
+        ItemImage.objects.create(item=cls.auctions[0].item, asset_id="ab" * 32)
+        for amount in (Decimal("12.00"), Decimal("15.50")):
+            Bid.objects.bulk_create(
+                [Bid(auction=cls.auctions[0], bidder=cls.bidder, amount=amount)]
+            )
+        AuctionWatch.objects.create(user=cls.bidder, auction=cls.auctions[1])
+
+    def render(self, data):
+        return ORJSONRenderer().render(data)
+
+    def assertSameJSON(self, rows, serialized):
+        for row in [*rows, *serialized]:
+            # computed against a slightly different "now"
+            row.pop("time_remaining", None)
+        self.assertEqual(
+            json.loads(self.render(rows)), json.loads(self.render(serialized))
+        )
+
+    def test_auction_rows_match_serializer(self):
+        request = type("Request", (), {"user": self.bidder})()
+        queryset = Auction.objects.order_by("title")
+
+        # auctions, item images, highest bidders, watches
+        with self.assertNumQueries(4):
+            rows = auction_rows(queryset, self.bidder)
+        serialized = AuctionSerializer(
+            queryset, many=True, context={"request": request}
+        ).data
+
+        self.assertEqual(rows[0]["total_bids"], 2)
+        self.assertEqual(rows[0]["highest_bidder"]["name"], "B")
+        self.assertTrue(rows[1]["is_watched"])
+        self.assertIsNone(rows[2]["time_remaining"])
+        self.assertEqual(len(rows[0]["item_details"]["images"]), 1)
+        self.assertSameJSON(rows, [dict(auction) for auction in serialized])
+
+    def test_bid_rows_match_serializer(self):
+        queryset = Bid.objects.order_by("amount")
+        with self.assertNumQueries(1):
+            rows = bid_rows(queryset)
+        serialized = BidSerializer(queryset, many=True).data
+        self.assertSameJSON(rows, [dict(bid) for bid in serialized])
+
+    def test_sparse_rows_skip_unrequested_queries(self):
+        queryset = Auction.objects.order_by("title")
+        full = auction_rows(queryset, self.bidder)
+
+        fields = ("id", "title", "current_price")
+        with CaptureQueriesContext(connection) as queries:
+            rows = auction_rows(queryset, self.bidder, fields)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("JOIN", queries[0]["sql"])
+        self.assertNotIn("bid_count", queries[0]["sql"])
+        self.assertEqual(
+            rows, [{name: row[name] for name in fields} for row in full]
+        )
+
+        with self.assertNumQueries(1):
+            rows = bid_rows(Bid.objects.order_by("amount"), ("amount", "status"))
+        self.assertEqual(rows[0], {"amount": "12.00", "status": Bid.STATUS_OUTBID})
+
+    def test_fields_and_exclude_params(self):
+        client = APIClient()
+        client.force_authenticate(self.seller)
+        auction = self.auctions[0]
+        url = f"/api/v1/auctions/auctions/{auction.id}/"
+
+        response = client.get(url, {"fields": "id,title,total_bids,unknown"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["data"],
+            {"id": str(auction.id), "title": "Auction 0", "total_bids": 2},
+        )
+
+        response = client.get(url, {"exclude": "item_details,seller_details"})
+        data = response.json()["data"]
+        self.assertNotIn("item_details", data)
+        self.assertEqual(data["current_price"], "15.50")
+
+        response = client.get(
+            "/api/v1/auctions/search/", {"fields": "title", "sort": "newest"}
+        )
+        self.assertEqual(
+            response.json()["data"], [{"title": "Auction 1"}, {"title": "Auction 0"}]
+        )
+
+
+# one countdown period for the whole test
+@override_settings(WATCHLIST_REDIS_URL="", ETAG_COUNTDOWN_SECONDS=10**9)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidder = User.objects.create_user(
+            email="bidder@example.com", password="pw", first_name="B", last_name="B"
+        )
+        now = timezone.now()
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Item",
+                description="",
+                category=Category.objects.create(name="Test"),
+                owner=cls.seller,
+            ),
+            seller=cls.seller,
+            title="Lamp",
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(days=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_auction_is_not_modified(self):
+        url = f"/api/v1/auctions/public/auctions/{self.auction.id}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_bids_and_edits_change_the_etag(self):
+        url = f"/api/v1/auctions/public/auctions/{self.auction.id}/"
+        first = self.client.get(url)
+
+        Bid.objects.bulk_create(
+            [Bid(auction=self.auction, bidder=self.bidder, amount=Decimal("12.00"))]
+        )
+        second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+
+        # a stale instance saved afterwards still moves the version forward
+        self.auction.description = "Brass"
+        self.auction.save()
+        self.auction.refresh_from_db()
+        self.assertEqual(self.auction.version, 3)
+        self.assertEqual(self.revalidate(url, second).status_code, 200)
+
+    def test_detail_etag_varies_with_watching(self):
+        self.client.force_authenticate(self.bidder)
+        url = f"/api/v1/auctions/auctions/{self.auction.id}/"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Authorization", first["Vary"])
+        self.assertEqual(self.revalidate(url, first).status_code, 304)
+
+        AuctionWatch.objects.create(user=self.bidder, auction=self.auction)
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+    def test_bid_listing(self):
+        self.client.force_authenticate(self.bidder)
+        Bid.objects.bulk_create(
+            [Bid(auction=self.auction, bidder=self.bidder, amount=Decimal("12.00"))]
+        )
+        url = f"/api/v1/auctions/auctions/{self.auction.id}/bids/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 1)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+    def test_countdown_is_revalidated_every_period(self):
+        url = f"/api/v1/auctions/public/auctions/{self.auction.id}/"
+        with self.settings(ETAG_COUNTDOWN_SECONDS=1):
+            response = self.client.get(url)
+            sparse = self.client.get(url, {"fields": "id,title"})
+            time.sleep(1)
+            self.assertEqual(self.revalidate(url, response).status_code, 200)
+            # without time_remaining the version alone decides
+            response = self.client.get(
+                url, {"fields": "id,title"}, HTTP_IF_NONE_MATCH=sparse["ETag"]
+            )
+            self.assertEqual(response.status_code, 304)
+
+    def test_featured_changes_when_an_auction_leaves_it(self):
+        url = "/api/v1/auctions/featured/"
+        response = self.client.get(url)
+        self.assertEqual(len(response.json()["data"]), 1)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+        self.auction.status = Auction.STATUS_ENDED
+        self.auction.save()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+
+# one countdown period for the whole test
+@override_settings(WATCHLIST_REDIS_URL="", ETAG_COUNTDOWN_SECONDS=10**9)
+class AuctionPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidders = [
+            User.objects.create_user(
+                email=f"bidder{i}@example.com",
+                password="pw",
+                first_name="B",
+                last_name=str(i),
+            )
+            for i in range(2)
+        ]
+        now = timezone.now()
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Item",
+                description="",
+                category=Category.objects.create(name="Test"),
+                owner=cls.seller,
+            ),
+            seller=cls.seller,
+            title="Lamp",
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(days=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+        ImageAsset.objects.create(
+            sha256="cd" * 32,
+            width=640,
+            height=480,
+            derivatives={"webp": {"320": f"cd/{'cd' * 32}/320.webp"}},
+        )
+        ItemImage.objects.create(item=cls.auction.item, asset_id="cd" * 32)
+        for bidder, amount in [
+            (cls.bidders[0], Decimal("12.00")),
+            (cls.bidders[1], Decimal("14.00")),
+            (cls.bidders[0], Decimal("16.50")),
+        ]:
+            Bid.objects.bulk_create(
+                [Bid(auction=cls.auction, bidder=bidder, amount=amount)]
+            )
+        cls.autobid = AutoBid.objects.create(
+            user=cls.bidders[1], auction=cls.auction, max_amount=Decimal("30.00")
+        )
+        AuctionWatch.objects.create(user=cls.bidders[1], auction=cls.auction)
+
+    def test_page_matches_the_separate_endpoints(self):
+        user = self.bidders[1]
+        queryset = Auction.objects.filter(id=self.auction.id)
+
+        # the page, then the watch lookup
+        with self.assertNumQueries(2):
+            page = auction_page(queryset, user, bids=2)
+
+        (auction,) = auction_rows(queryset, user)
+        for data in (auction, page["auction"]):
+            data.pop("time_remaining")
+        self.assertEqual(page["auction"], auction)
+        self.assertTrue(page["auction"]["is_watched"])
+        self.assertEqual(page["auction"]["highest_bidder"]["name"], "B 0")
+
+        bids = BidSerializer(Bid.objects.order_by("-amount")[:2], many=True).data
+        render = ORJSONRenderer().render
+        self.assertEqual(json.loads(render(page["bids"])), json.loads(render(bids)))
+        self.assertEqual(
+            page["stats"],
+            {
+                "total_bids": 3,
+                "unique_bidders": 2,
+                "highest_bid": "16.50",
+                "current_price": "16.50",
+            },
+        )
+        self.assertEqual(
+            json.loads(render(page["autobid"])),
+            json.loads(render(AutoBidSerializer(self.autobid).data)),
+        )
+        self.assertIsNone(auction_page(queryset, self.bidders[0])["autobid"])
+
+    def test_page_etag_follows_version_and_user_state(self):
+        client = APIClient()
+        client.force_authenticate(self.bidders[1])
+        url = f"/api/v1/auctions/auctions/{self.auction.id}/page/"
+        first = client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.json()["data"]["bids"]), 3)
+        self.assertIn("Authorization", first["Vary"])
+
+        with self.assertNumQueries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        AutoBid.objects.filter(id=self.autobid.id).update(
+            is_active=False, updated_at=timezone.now()
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["data"]["autobid"]["is_active"])
+
+        response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["data"]["autobid"])
+        self.assertEqual(
+            APIClient().get(
+                f"/api/v1/auctions/auctions/{self.seller.id}/page/"
+            ).status_code,
+            404,
+        )
+
+
+@override_settings(WATCHLIST_REDIS_URL="", BATCH_MAX_REQUESTS=5)
+class BatchRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        now = timezone.now()
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Item",
+                description="",
+                category=Category.objects.create(name="Test"),
+                owner=cls.seller,
+            ),
+            seller=cls.seller,
+            title="Lamp",
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(days=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        token = AccessToken.for_user(self.seller)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def batch(self, *requests):
+        response = self.client.post(
+            "/api/v1/batch/", {"requests": list(requests)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]["responses"]
+
+    def test_sub_requests_share_the_batch_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            bids, mine, notifications = self.batch(
+                {
+                    "id": "bids",
+                    "path": f"/api/v1/auctions/auctions/{self.auction.id}/bids/",
+                },
+                {"path": "/api/v1/auctions/auctions/my_auctions/?fields=title"},
+                {"path": "/api/v1/notifications/notifications/"},
+            )
+        # the user is loaded once, for the batch
+        user_queries = [q for q in queries if 'FROM "accounts_user"' in q["sql"]]
+        self.assertEqual(len(user_queries), 1)
+
+        self.assertEqual((bids["id"], bids["status"]), ("bids", 200))
+        self.assertEqual(bids["body"]["data"], [])
+        self.assertEqual((mine["id"], mine["body"]["data"]), (1, [{"title": "Lamp"}]))
+        self.assertEqual(notifications["status"], 200)
+
+    def test_sub_request_headers(self):
+        url = f"/api/v1/auctions/auctions/{self.auction.id}/stats/"
+        (stats,) = self.batch({"path": url})
+        self.assertIn("bid_history", stats["body"]["data"])
+
+        (revalidated,) = self.batch(
+            {"path": url, "headers": {"If-None-Match": stats["headers"]["ETag"]}}
+        )
+        self.assertEqual(revalidated["status"], 304)
+        self.assertIsNone(revalidated["body"])
+
+    def test_rejected_sub_requests(self):
+        responses = self.batch(
+            {"path": "/api/v1/missing/"},
+            {"path": "/api/v1/batch/"},
+            {"method": "POST", "path": "/api/v1/auctions/auctions/"},
+            {"path": "/admin/"},
+        )
+        self.assertEqual([r["status"] for r in responses], [404, 400, 405, 400])
+
+        anonymous = APIClient().post(
+            "/api/v1/batch/",
+            {"requests": [{"path": "/api/v1/auctions/auctions/my_auctions/"}]},
+            format="json",
+        )
+        self.assertEqual(anonymous.json()["data"]["responses"][0]["status"], 401)
+
+        too_many = self.client.post(
+            "/api/v1/batch/", {"requests": [{"path": "/api/"}] * 6}, format="json"
+        )
+        self.assertEqual(too_many.status_code, 400)
+
+
+# one countdown period for the whole test
+@override_settings(
+    WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="", ETAG_COUNTDOWN_SECONDS=10**9
+)
+class AsyncReadViewTests(TestCase):
+    """The ASGI read views against the sync views they stand in for"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidder = User.objects.create_user(
+            email="bidder@example.com", password="pw", first_name="B", last_name=""
+        )
+        category = Category.objects.create(name="Test")
+        now = timezone.now()
+        cls.auctions = [
+            Auction.objects.create(
+                item=Item.objects.create(
+                    name=f"Item {i}",
+                    description="",
+                    category=category,
+                    owner=cls.seller,
+                ),
+                seller=cls.seller,
+                title=f"Lamp {i}",
+                description="",
+                starting_price=Decimal("10.00"),
+                start_time=now - timedelta(days=1),
+                end_time=now + timedelta(days=1),
+                status=status,
+            )
+            for i, status in enumerate(
+                [Auction.STATUS_ACTIVE, Auction.STATUS_ACTIVE, Auction.STATUS_ENDED]
+            )
+        ]
+        Bid.objects.bulk_create(
+            [Bid(auction=cls.auctions[0], bidder=cls.bidder, amount=Decimal("12.00"))]
+        )
+        AuctionWatch.objects.create(user=cls.bidder, auction=cls.auctions[1])
+
+    def setUp(self):
+        cache.clear()
+
+    def get_both(self, path, user=None, **kwargs):
+        """``path`` from the sync (WSGI) and the async (ASGI) views"""
+        headers = {}
+        if user is not None:
+            headers["Authorization"] = f"Bearer {AccessToken.for_user(user)}"
+        sync = APIClient().get(path, headers=headers, **kwargs)
+        asynchronous = async_to_sync(AsyncClient().get)(path, headers=headers, **kwargs)
+        return sync, asynchronous
+
+    def assertSameResponse(self, sync, asynchronous):
+        self.assertEqual(asynchronous.status_code, sync.status_code)
+        self.assertEqual(
+            self.without_countdown(asynchronous.json()),
+            self.without_countdown(sync.json()),
+        )
+
+    def without_countdown(self, body):
+        # computed against a slightly different "now"
+        if isinstance(body, dict):
+            return {
+                key: self.without_countdown(value)
+                for key, value in body.items()
+                if key != "time_remaining"
+            }
+        if isinstance(body, list):
+            return [self.without_countdown(value) for value in body]
+        return body
+
+    def test_auction_list(self):
+        path = "/api/v1/auctions/auctions/"
+        for user in (None, self.bidder, self.seller):
+            sync, asynchronous = self.get_both(path, user)
+            self.assertEqual(sync.status_code, 200)
+            self.assertSameResponse(sync, asynchronous)
+        self.assertEqual(sync.json()["data"]["count"], 3)
+
+        sync, asynchronous = self.get_both(
+            path, self.bidder, data={"fields": "id,title,is_watched", "facets": "true"}
+        )
+        self.assertIn("facets", sync.json())
+        self.assertSameResponse(sync, asynchronous)
+
+    def test_search(self):
+        path = "/api/v1/auctions/search/"
+        sync, asynchronous = self.get_both(
+            path, self.bidder, data={"search": "lamp", "sort": "newest"}
+        )
+        self.assertEqual(
+            [auction["title"] for auction in sync.json()["data"]], ["Lamp 1", "Lamp 0"]
+        )
+        self.assertSameResponse(sync, asynchronous)
+
+        for headers in ({}, {"Authorization": "Bearer not-a-token"}):
+            sync = APIClient().get(path, headers=headers)
+            asynchronous = async_to_sync(AsyncClient().get)(path, headers=headers)
+            self.assertEqual(sync.status_code, 401)
+            self.assertSameResponse(sync, asynchronous)
+            self.assertEqual(
+                asynchronous["WWW-Authenticate"], sync["WWW-Authenticate"]
+            )
+
+    def test_featured(self):
+        path = "/api/v1/auctions/featured/"
+        for params in ({}, {"sort": "trending"}):
+            sync, asynchronous = self.get_both(path, data=params)
+            self.assertEqual(sync.status_code, 200)
+            self.assertSameResponse(sync, asynchronous)
+            self.assertEqual(asynchronous["ETag"], sync["ETag"])
+
+        # client errors, not server errors
+        for params in (
+            {"limit": "-1"},
+            {"limit": "many"},
+            {"sort": "trending", "category": "lamps"},
+        ):
+            sync, asynchronous = self.get_both(path, data=params)
+            self.assertEqual(sync.status_code, 400)
+            self.assertSameResponse(sync, asynchronous)
+
+    def test_public_auction_detail(self):
+        auction = self.auctions[0]
+        path = f"/api/v1/auctions/public/auctions/{auction.id}/"
+        sync, asynchronous = self.get_both(path)
+        self.assertEqual(sync.json()["current_price"], "12.00")
+        self.assertSameResponse(sync, asynchronous)
+        self.assertEqual(asynchronous["ETag"], sync["ETag"])
+
+        for auction_id, status in ((self.auctions[2].id, 200), (uuid.uuid4(), 404)):
+            sync, asynchronous = self.get_both(
+                f"/api/v1/auctions/public/auctions/{auction_id}/"
+            )
+            self.assertEqual(sync.status_code, status)
+            self.assertSameResponse(sync, asynchronous)
+
+    @override_settings(VIEW_COUNT_FLUSH_SECONDS=3600)
+    def test_public_auction_detail_views_are_counted_alike(self):
+        view_counts.flush()
+        self.addCleanup(view_counts.flush)
+        auction = self.auctions[0]
+        self.get_both(f"/api/v1/auctions/public/auctions/{auction.id}/", self.bidder)
+        # one distinct viewer, the user, on both paths
+        self.assertEqual(view_counts._pending[str(auction.id)], 2)
+        self.assertEqual(
+            view_counts._viewers[str(auction.id)], {f"user:{self.bidder.pk}"}
+        )
+
+    def test_writes_are_delegated_to_the_sync_views(self):
+        path = "/api/v1/auctions/auctions/"
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.seller)}"}
+        # an invalid auction, so the sync create returns its validation errors
+        sync = APIClient().post(path, {"title": ""}, format="json", headers=headers)
+        asynchronous = async_to_sync(AsyncClient().post)(
+            path, {"title": ""}, content_type="application/json", headers=headers
+        )
+        self.assertEqual(sync.status_code, 400)
+        self.assertSameResponse(sync, asynchronous)
+
+        sync = APIClient().post(path, {}, format="json")
+        asynchronous = async_to_sync(AsyncClient().post)(
+            path, {}, content_type="application/json"
+        )
+        self.assertEqual(sync.status_code, 401)
+        self.assertSameResponse(sync, asynchronous)
+        self.assertEqual(Auction.objects.count(), 3)
+
+
+@override_settings(WATCHLIST_REDIS_URL="", BULK_IMPORT_BATCH_SIZE=2)
+class BulkImportTests(TestCase):
+    url = "/api/v1/auctions/auctions/import/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.category = Category.objects.create(name="Lighting")
+
+    def setUp(self):
+        self.client = APIClient()
+        token = AccessToken.for_user(self.seller)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def upload(self, name, content, **data):
+        return self.client.post(
+            self.url,
+            {"file": SimpleUploadedFile(name, content.encode()), **data},
+            format="multipart",
+        )
+
+    def test_csv_import(self):
+        now = timezone.now()
+        start = (now + timedelta(days=1)).isoformat()
+        end = (now + timedelta(days=7)).isoformat()
+        content = "\n".join(
+            [
+                "title,description,category,starting_price,reserve_price,"
+                "start_time,end_time,image_urls",
+                f"Lamp,Brass,lighting,10.00,,,{end},"
+                "https://example.com/a.jpg|https://example.com/b.jpg",
+                f"Bulb,Spare,Lighting,5.00,2.00,,{end},",
+                f"Sconce,Pair,Lighting,20.00,30.00,{start},{end},",
+                f"Chair,Oak,Furniture,15.00,,,{end},",
+                f"Shade,,Lighting,abc,,,{end},",
+            ]
+        )
+        # one category lookup; items and auctions of the first two batches
+        # (of 2 rows) inserted together, then the one notification
+        with (
+            CaptureQueriesContext(connection) as queries,
+            self.captureOnCommitCallbacks() as callbacks,
+        ):
+            response = self.upload("auctions.csv", content)
+        self.assertEqual(response.status_code, 201)
+        category_queries = [
+            q for q in queries if 'FROM "auctions_category"' in q["sql"]
+        ]
+        self.assertEqual(len(category_queries), 1)
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 5)
+
+        report = response.json()["data"]
+        self.assertEqual(
+            (report["total"], report["created"], report["failed"]), (5, 2, 3)
+        )
+        self.assertEqual([e["row"] for e in report["errors"]], [2, 4, 5])
+        self.assertIn("reserve_price", report["errors"][0]["errors"])
+        self.assertIn("category", report["errors"][1]["errors"])
+        self.assertEqual(
+            set(report["errors"][2]["errors"]), {"description", "starting_price"}
+        )
+        self.assertIsNotNone(report["rows_per_second"])
+
+        lamp = Auction.objects.select_related("item").get(title="Lamp")
+        self.assertEqual(lamp.status, Auction.STATUS_ACTIVE)
+        self.assertEqual(lamp.item.owner, self.seller)
+        self.assertEqual(lamp.item.category, self.category)
+        self.assertEqual(len(lamp.item.image_urls), 2)
+        self.assertEqual(queued_tasks(callbacks, ingest_item_images), [lamp.item_id])
+        sconce = Auction.objects.get(title="Sconce")
+        self.assertEqual(
+            {id for ids in queued_tasks(callbacks, percolate_auctions) for id in ids},
+            {lamp.id, sconce.id},
+        )
+        self.assertEqual(sconce.status, Auction.STATUS_PENDING)
+        self.assertEqual(sconce.reserve_price, Decimal("30.00"))
+
+        notifications = Notification.objects.filter(recipient=self.seller)
+        self.assertEqual(notifications.count(), 1)
+        self.assertEqual(
+            notifications.get().message,
+            "2 auctions imported from auctions.csv, 3 rows rejected.",
+        )
+
+    def test_jsonl_import(self):
+        end = (timezone.now() + timedelta(days=7)).isoformat()
+        row = {
+            "title": "Lamp",
+            "description": "Brass",
+            "category": "Lighting",
+            "starting_price": "10.00",
+            "end_time": end,
+            "item_name": "Brass lamp",
+        }
+        content = "\n".join(
+            [json.dumps(row), "", "[1, 2]", "{not json", json.dumps(row)]
+        )
+        response = self.upload("export.txt", content, format="jsonl")
+        self.assertEqual(response.status_code, 201)
+        report = response.json()["data"]
+        self.assertEqual((report["created"], report["failed"]), (2, 2))
+        self.assertEqual([e["row"] for e in report["errors"]], [2, 3])
+        self.assertEqual(
+            Item.objects.filter(owner=self.seller, name="Brass lamp").count(), 2
+        )
+
+    def test_rejected_files(self):
+        self.assertEqual(self.upload("auctions.xlsx", "").status_code, 400)
+        with override_settings(BULK_IMPORT_MAX_ROWS=1):
+            response = self.upload("auctions.jsonl", "{}\n{}\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("file", response.json()["errors"])
+
+        response = self.upload("auctions.jsonl", "{}\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"]["failed"], 1)
+        self.assertFalse(Notification.objects.exists())
+
+        anonymous = APIClient().post(self.url, {}, format="multipart")
+        self.assertEqual(anonymous.status_code, 401)
+
+
+@override_settings(WATCHLIST_REDIS_URL="")
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.lighting = Category.objects.create(name="Lighting")
+        cls.seating = Category.objects.create(name="Seating")
+        now = timezone.now()
+        for title, category, price, auction_type, ends_in in [
+            ("Lamp", cls.lighting, "10.00", "standard", timedelta(minutes=30)),
+            ("Sconce", cls.lighting, "40.00", "reserve", timedelta(hours=5)),
+            ("Chair", cls.seating, "40.00", "standard", timedelta(days=3)),
+            ("Sofa", cls.seating, "2000.00", "standard", timedelta(days=30)),
+            ("Stool", cls.seating, "5.00", "standard", timedelta(days=1)),
+        ]:
+            Auction.objects.create(
+                item=Item.objects.create(
+                    name=title, description="", category=category, owner=cls.seller
+                ),
+                seller=cls.seller,
+                title=title,
+                description="",
+                starting_price=Decimal(price),
+                auction_type=auction_type,
+                start_time=now - timedelta(days=1),
+                end_time=now + ends_in,
+                status=Auction.STATUS_ACTIVE,
+            )
+        Auction.objects.filter(title="Stool").update(status=Auction.STATUS_PENDING)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        token = AccessToken.for_user(self.seller)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_counts_in_one_query(self):
+        queryset = Auction.objects.filter(status=Auction.STATUS_ACTIVE)
+        with self.assertNumQueries(1):
+            facets = facet_counts(queryset, "facets-test")
+        with self.assertNumQueries(0):
+            self.assertEqual(facet_counts(queryset, "facets-test"), facets)
+
+        self.assertEqual(facets["total"], 4)
+        self.assertEqual(
+            [(c["name"], c["count"]) for c in facets["category"]],
+            [("Lighting", 2), ("Seating", 2)],
+        )
+        self.assertEqual(
+            {
+                (band["min"], band["max"]): band["count"]
+                for band in facets["price"]
+                if band["count"]
+            },
+            {(0, 25): 1, (25, 50): 2, (1000, None): 1},
+        )
+        self.assertEqual(
+            facets["auction_type"],
+            {"standard": 3, "reserve": 1, "buy_now_only": 0},
+        )
+        self.assertEqual(facets["ending_within"], {"1h": 1, "24h": 2, "7d": 3})
+
+    def test_facets_with_results(self):
+        response = self.client.get(
+            "/api/v1/auctions/search/?max_price=100&facets=true&fields=title"
+        )
+        body = response.json()
+        self.assertEqual(len(body["data"]), 3)
+        self.assertEqual(body["facets"]["total"], 3)
+
+        # the seller's pending auction is listed for them
+        response = self.client.get(
+            f"/api/v1/auctions/auctions/?category={self.seating.id}&facets=true"
+        )
+        body = response.json()
+        self.assertEqual(body["data"]["count"], 3)
+        self.assertEqual(body["facets"]["total"], 3)
+        anonymous = APIClient().get(
+            f"/api/v1/auctions/auctions/?category={self.seating.id}&facets=true"
+        )
+        self.assertEqual(anonymous.json()["facets"]["total"], 2)
+
+        self.assertNotIn("facets", self.client.get("/api/v1/auctions/search/").json())
+
+
+@override_settings(WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="")
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidder = User.objects.create_user(
+            email="bidder@example.com", password="pw", first_name="B", last_name="B"
+        )
+        cls.lighting = Category.objects.create(name="Lighting")
+        cls.lamps = {
+            title: cls.create_auction(title, item_name)
+            for title, item_name in [
+                ("Brass desk lamp", "Lamp"),
+                ("Lamp shade", "Shade"),
+                ("Crème brûlée torch", "Lamplighter torch"),
+            ]
+        }
+        Bid.objects.bulk_create(
+            [Bid(auction=cls.lamps["Lamp shade"], bidder=cls.bidder, amount=12)]
+        )
+        pending = cls.create_auction("Lampshade frame", "Frame")
+        Auction.objects.filter(id=pending.id).update(status=Auction.STATUS_PENDING)
+
+    @classmethod
+    def create_auction(cls, title, item_name):
+        now = timezone.now()
+        return Auction.objects.create(
+            item=Item.objects.create(
+                name=item_name, description="", category=cls.lighting, owner=cls.seller
+            ),
+            seller=cls.seller,
+            title=title,
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(days=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        autocomplete.rebuild()
+
+    def labels(self, prefix):
+        return [s["label"] for s in autocomplete.suggest(prefix)]
+
+    def test_prefix_of_any_word_ranked_by_popularity(self):
+        with self.assertNumQueries(0):
+            labels = self.labels("LAMP")
+        # the bid ranks "Lamp shade" first, then the shortest label
+        self.assertEqual(
+            labels, ["Lamp shade", "Brass desk lamp", "Crème brûlée torch"]
+        )
+        self.assertEqual(self.labels("desk l"), ["Brass desk lamp"])
+        self.assertEqual(self.labels("creme bru"), ["Crème brûlée torch"])
+        self.assertEqual(
+            autocomplete.suggest("light"),
+            [{"type": "category", "id": str(self.lighting.id), "label": "Lighting"}],
+        )
+        self.assertEqual(self.labels("  "), [])
+
+    def test_incremental_updates(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_auction("Floor lamp", "Lamp")
+            Category.objects.create(name="Lamps & lanterns")
+            for user in (self.seller, self.bidder):
+                AuctionWatch.objects.create(
+                    user=user, auction=self.lamps["Crème brûlée torch"]
+                )
+            shade = self.lamps["Lamp shade"]
+            shade.status = Auction.STATUS_CANCELLED
+            shade.save()
+        run_callbacks(callbacks)
+
+        self.assertEqual(
+            self.labels("lamp"),
+            [
+                "Crème brûlée torch",
+                "Floor lamp",
+                "Brass desk lamp",
+                "Lamps & lanterns",
+            ],
+        )
+        # three active auctions in the category again
+        self.assertEqual(autocomplete._local.scores[f"category:{self.lighting.id}"], 3)
+
+    def test_index_hooks_cannot_fail_committed_saves(self):
+        queued = len(connection.run_on_commit)
+        auction = self.create_auction("Floor lamp", "Lamp")
+        category = Category.objects.create(name="Lanterns")
+        category.name = "Lamps & lanterns"
+        category.save()
+        auction.delete()
+        category.delete()
+        # robust callbacks log their errors instead of raising them
+        hooks = connection.run_on_commit[queued:]
+        self.assertGreaterEqual(len(hooks), 5)
+        self.assertTrue(all(robust for _, _, robust in hooks))
+
+    def test_database_answers_until_the_shared_index_is_ready(self):
+        local = {
+            prefix: autocomplete.suggest(prefix)
+            for prefix in ("lamp", "desk l", "light", "shade fr")
+        }
+        # configured, but unreachable: never rebuilt in the request
+        autocomplete._client = redis.Redis.from_url(
+            "redis://127.0.0.1:1/0", decode_responses=True, socket_connect_timeout=0.5
+        )
+        self.addCleanup(setattr, autocomplete, "_client", None)
+        autocomplete._local = None
+
+        for prefix, suggestions in local.items():
+            # auctions, categories
+            with self.assertNumQueries(2):
+                self.assertEqual(autocomplete.suggest(prefix), suggestions)
+        self.assertIsNone(autocomplete._local)
+
+    def test_endpoint(self):
+        response = APIClient().get("/api/v1/auctions/autocomplete/?q=bra&limit=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["data"],
+            [
+                {
+                    "type": "auction",
+                    "id": str(self.lamps["Brass desk lamp"].id),
+                    "label": "Brass desk lamp",
+                }
+            ],
+        )
+        response = APIClient().get("/api/v1/auctions/autocomplete/?q=bra&limit=x")
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="")
+class SavedSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.users = [
+            User.objects.create_user(
+                email=f"user{n}@example.com", password="pw", first_name="U", last_name="U"
+            )
+            for n in range(5)
+        ]
+        cls.furniture = Category.objects.create(name="Furniture")
+        cls.chairs = Category.objects.create(name="Chairs", parent=cls.furniture)
+        cls.books = Category.objects.create(name="Books")
+
+    def save_search(self, user, **criteria):
+        return SavedSearch.objects.create(user=user, **criteria)
+
+    def create_auction(self, title, category, price):
+        now = timezone.now()
+        return Auction.objects.create(
+            item=Item.objects.create(
+                name="Chair", description="Oak", category=category, owner=self.seller
+            ),
+            seller=self.seller,
+            title=title,
+            description="Solid wood, lightly used",
+            starting_price=Decimal(price),
+            start_time=now - timedelta(minutes=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def notified(self, auction):
+        return dict(
+            Notification.objects.filter(
+                related_object_id=auction.id, template_id="auction.saved_search"
+            ).values_list("recipient__email", "params__search")
+        )
+
+    def test_percolate(self):
+        a, b, c, d, e = self.users
+        self.save_search(a, name="Rocking chairs", query="Rocking  CHAIR")
+        self.save_search(a, query="oak", category=self.furniture)
+        self.save_search(b, category=self.furniture, max_price=100)
+        self.save_search(c, min_price=50, max_price=80)
+        self.save_search(d, query="rocking chair", category=self.books)
+        self.save_search(d, query="rocking sofa")
+        self.save_search(d, min_price=81)
+        self.save_search(e, query="rocking", notify=False)
+        self.save_search(self.seller, query="rocking")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            auction = self.create_auction("Rocking chair", self.chairs, "75.00")
+        # left to a worker, not percolated in the creating request
+        self.assertEqual(queued_tasks(callbacks, percolate_auctions), [[auction.id]])
+        with self.assertNumQueries(4):
+            # auction, categories, matching searches, notification insert
+            self.assertEqual(percolate_auctions([auction.id]), {"notified": 3})
+
+        # once per user, keywords and ancestor category matched
+        self.assertEqual(
+            self.notified(auction),
+            {
+                "user0@example.com": "Rocking chairs",
+                "user1@example.com": "",
+                "user2@example.com": "",
+            },
+        )
+        self.assertEqual(len(callbacks), 2)
+        notification = Notification.objects.filter(
+            recipient=a, related_object_id=auction.id
+        ).first()
+        self.assertEqual(
+            notification.rendered_title,
+            "New auction for 'Rocking chairs': Rocking chair",
+        )
+
+    def test_price_only_searches_use_the_interval_index(self):
+        search = self.save_search(self.users[0], min_price=10, max_price=20)
+        self.assertEqual(search.anchor, None)
+        self.assertEqual(
+            self.save_search(self.users[0], query="Oak chair").anchor, "t:chair"
+        )
+        plan = explain(
+            SavedSearch.objects.filter(
+                notify=True, anchor__isnull=True, price_range__contains=Decimal(15)
+            )
+        )
+        self.assertIn("saved_search_price_idx", plan)
+        plan = explain(SavedSearch.objects.filter(notify=True, anchor__in=["t:oak"]))
+        self.assertIn("saved_search_anchor_idx", plan)
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        url = "/api/v1/auctions/saved-searches/"
+
+        response = client.post(url, {"name": "Nothing"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = client.post(
+            url, {"min_price": "20.00", "max_price": "10.00"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = client.post(
+            url, {"query": "lamp", "category": self.books.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        search_id = response.json()["data"]["id"]
+
+        response = client.patch(
+            f"{url}{search_id}/", {"query": "desk lamp"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SavedSearch.objects.get(id=search_id).terms, ["desk", "lamp"])
+
+        other = APIClient()
+        other.force_authenticate(self.users[1])
+        self.assertEqual(other.get(f"{url}{search_id}/").status_code, 404)
+
+
+@override_settings(WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="")
+class PriceAlertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.users = [
+            User.objects.create_user(
+                email=f"user{n}@example.com", password="pw", first_name="U", last_name="U"
+            )
+            for n in range(5)
+        ]
+        cls.furniture = Category.objects.create(name="Furniture")
+        cls.chairs = Category.objects.create(name="Chairs", parent=cls.furniture)
+        now = timezone.now()
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Chair", description="", category=cls.chairs, owner=cls.seller
+            ),
+            seller=cls.seller,
+            title="Rocking chair",
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(minutes=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def alert(self, user, direction, threshold, **target):
+        return PriceAlert.objects.create(
+            user=user, direction=direction, threshold=threshold, **target
+        )
+
+    def bid(self, amount):
+        Bid.objects.bulk_create(
+            [Bid(auction=self.auction, bidder=self.users[4], amount=amount)]
+        )
+        return price_alerts.evaluate(self.auction)
+
+    def notified(self):
+        notifications = Notification.objects.filter(
+            related_object_id=self.auction.id, template__key__startswith="auction.price_"
+        )
+        result = {
+            (n.recipient.email, n.template_id, n.params["threshold"])
+            for n in notifications
+        }
+        notifications.delete()
+        return result
+
+    def test_crossed_alerts_fire_once(self):
+        a, b, c, d, _ = self.users
+        above, below = PriceAlert.DIRECTION_ABOVE, PriceAlert.DIRECTION_BELOW
+        self.alert(a, above, 50, auction=self.auction)
+        self.alert(b, above, 30, category=self.furniture)
+        self.alert(b, above, 20, auction=self.auction)
+        self.alert(c, below, 40, auction=self.auction)
+        self.alert(d, below, 20, category=self.chairs)
+        self.alert(d, above, 100, category=self.chairs)
+        self.alert(self.seller, above, 15, auction=self.auction)
+
+        self.assertEqual(self.bid(Decimal("35.00")), 2)
+        # one notification per user, for the highest threshold passed
+        self.assertEqual(
+            self.notified(),
+            {
+                ("user1@example.com", "auction.price_above", "30.00"),
+                ("user2@example.com", "auction.price_below", "40.00"),
+            },
+        )
+        # already evaluated at this price
+        self.assertEqual(price_alerts.evaluate(self.auction), 0)
+
+        self.assertEqual(self.bid(Decimal("60.00")), 1)
+        self.assertEqual(
+            self.notified(), {("user0@example.com", "auction.price_above", "50.00")}
+        )
+
+    def test_range_scans(self):
+        for n in range(50):
+            self.alert(
+                self.users[n % 4], PriceAlert.DIRECTION_ABOVE, n + 1, auction=self.auction
+            )
+            self.alert(
+                self.users[n % 4], PriceAlert.DIRECTION_BELOW, n + 1, category=self.chairs
+            )
+        plan = explain(price_alerts.crossed_alerts(self.auction, 10, 20))
+        self.assertIn("price_alert_auction_idx", plan)
+        self.assertIn("price_alert_category_idx", plan)
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        url = "/api/v1/auctions/price-alerts/"
+
+        response = client.post(
+            url,
+            {
+                "auction": str(self.auction.id),
+                "category": str(self.chairs.id),
+                "direction": "above",
+                "threshold": "50.00",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = client.post(
+            url,
+            {"category": str(self.chairs.id), "direction": "below", "threshold": "0"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = client.post(
+            url,
+            {"auction": str(self.auction.id), "direction": "above", "threshold": "50"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(client.get(url).json()["data"]), 1)
+
+
+@override_settings(
+    WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="", TRENDING_HALF_LIFE_HOURS=6
+)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidder = User.objects.create_user(
+            email="bidder@example.com", password="pw", first_name="B", last_name="B"
+        )
+        cls.furniture = Category.objects.create(name="Furniture")
+        cls.chairs = Category.objects.create(name="Chairs", parent=cls.furniture)
+        cls.books = Category.objects.create(name="Books")
+        cls.chair, cls.table, cls.book = (
+            cls.create_auction(title, category)
+            for title, category in [
+                ("Chair", cls.chairs),
+                ("Table", cls.furniture),
+                ("Book", cls.books),
+            ]
+        )
+
+    @classmethod
+    def create_auction(cls, title, category):
+        now = timezone.now()
+        return Auction.objects.create(
+            item=Item.objects.create(
+                name=title, description="", category=category, owner=cls.seller
+            ),
+            seller=cls.seller,
+            title=title,
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(hours=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def ranking(self, **params):
+        queryset = trending.featured_queryset({"sort": "trending", **params})
+        return [auction.title for auction in queryset]
+
+    def test_recent_activity_outranks_decayed_activity(self):
+        now = timezone.now()
+        # 8 watches 12 hours (two half-lives) ago weigh as 2 now
+        trending.record(
+            [(self.chair.id, trending.WATCH_WEIGHT)] * 8, now - timedelta(hours=12)
+        )
+        trending.record([(self.table.id, trending.WATCH_WEIGHT)] * 3, now)
+        trending.record([(self.book.id, trending.WATCH_WEIGHT)], now)
+        self.assertEqual(self.ranking(), ["Table", "Chair", "Book"])
+
+        trending.record([(self.chair.id, trending.WATCH_WEIGHT)] * 2, now)
+        self.assertEqual(self.ranking(limit=2), ["Chair", "Table"])
+        # the category and its subcategories
+        self.assertEqual(
+            self.ranking(category=str(self.furniture.id)), ["Chair", "Table"]
+        )
+        self.assertEqual(self.ranking(category=str(self.books.id)), ["Book"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chair.status = Auction.STATUS_CANCELLED
+            self.chair.save()
+        self.assertEqual(self.ranking(), ["Table", "Book"])
+        self.assertFalse(TrendingScore.objects.filter(auction=self.chair).exists())
+
+    def test_featured_limit_is_validated_and_capped(self):
+        for params in ({}, {"sort": "trending"}):
+            queryset = trending.featured_queryset({**params, "limit": "1000"})
+            self.assertEqual(queryset.query.high_mark, trending.MAX_LIMIT)
+            for limit in ("0", "-1", "x"):
+                with self.assertRaises(ValueError):
+                    trending.featured_queryset({**params, "limit": limit})
+        with self.assertRaises(ValueError):
+            self.ranking(category="furniture")
+
+    def test_events_update_the_score(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AuctionWatch.objects.create(user=self.bidder, auction=self.book)
+        score = TrendingScore.objects.get(auction=self.book)
+        self.assertEqual(score.category_id, self.books.id)
+
+        Bid.objects.bulk_create(
+            [Bid(auction=self.book, bidder=self.bidder, amount=Decimal("12.00"))]
+        )
+        trending.record_bid(Bid.objects.get(auction=self.book))
+        trending.record([(self.book.id, trending.VIEW_WEIGHT)])
+        score.refresh_from_db()
+        # watch, first bid by the bidder, one view, all just now
+        expected = trending._log_weight(
+            trending.WATCH_WEIGHT + trending.BID_WEIGHT + trending.NEW_BIDDER_WEIGHT
+            + trending.VIEW_WEIGHT,
+            timezone.now(),
+        )
+        self.assertAlmostEqual(score.score, expected, places=3)
+
+        response = APIClient().get(f"/api/v1/auctions/public/auctions/{self.chair.id}/")
+        self.assertEqual(response.status_code, 200)
+        view_counts.flush()
+        self.assertEqual(self.ranking(), ["Book", "Chair"])
+
+    def test_bid_hooks_cannot_fail_the_committed_bid(self):
+        Wallet.objects.filter(user=self.bidder).update(balance=Decimal("100.00"))
+        queued = len(connection.run_on_commit)
+        Bid.objects.create(
+            auction=self.book, bidder=self.bidder, amount=Decimal("12.00")
+        )
+        # robust callbacks log their errors instead of raising them
+        hooks = connection.run_on_commit[queued:]
+        self.assertEqual(len(hooks), 3)
+        self.assertTrue(all(robust for _, _, robust in hooks))
+
+    def test_top_n_reads_the_score_index(self):
+        trending.record([(self.chair.id, 1.0), (self.book.id, 2.0)])
+        with connection.cursor() as cursor:
+            # the ranking comes off the index in order, not from a sort
+            cursor.execute("SET LOCAL enable_sort = off")
+        plan = explain(trending.top_auctions(3))
+        self.assertIn("trending_score_idx", plan)
+        plan = explain(trending.top_auctions(3, self.books.id))
+        self.assertIn("trending_category_idx", plan)
+
+
+@override_settings(
+    WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="", VIEW_COUNT_FLUSH_SECONDS=3600
+)
+class ViewCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.admin = User.objects.create_user(
+            email="admin@example.com", password="pw", first_name="A", last_name="A",
+            role="admin",
+        )
+        category = Category.objects.create(name="Lighting")
+        now = timezone.now()
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Lamp", description="", category=category, owner=cls.seller
+            ),
+            seller=cls.seller,
+            title="Lamp",
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(hours=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        # views left over by other tests
+        view_counts.flush()
+
+    def test_views_are_counted_in_memory_and_flushed_in_one_write(self):
+        url = f"/api/v1/auctions/public/auctions/{self.auction.id}/"
+        for _ in range(2):
+            self.assertEqual(APIClient().get(url).status_code, 200)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(f"/api/v1/auctions/auctions/{self.auction.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(AuctionViewCount.objects.exists())
+
+        with self.assertNumQueries(10):
+            # the counters, the trending scores (in a savepoint), then the
+            # auctions' categories and the analytics sketches (insert, lock
+            # and update, in a savepoint)
+            self.assertEqual(view_counts.flush(), 3)
+        with self.settings(VIEW_COUNT_FLUSH_SECONDS=0):
+            view_counts.record_view(self.auction.id)
+        self.assertEqual(AuctionViewCount.objects.get(auction=self.auction).views, 4)
+        self.assertTrue(TrendingScore.objects.filter(auction=self.auction).exists())
+
+    def test_a_timer_flushes_the_counts_of_an_idle_process(self):
+        view_counts.record_view(self.auction.id)
+        timer = view_counts._timer
+        self.addCleanup(view_counts.flush)
+        self.addCleanup(setattr, view_counts, "_timer", None)
+        self.addCleanup(timer.cancel)
+        self.assertTrue(timer.is_alive())
+        self.assertLessEqual(timer.interval, settings.VIEW_COUNT_FLUSH_SECONDS)
+        # one timer for all the views of the interval
+        view_counts.record_view(self.auction.id)
+        self.assertIs(view_counts._timer, timer)
+
+    def test_seller_and_admin_see_views(self):
+        for _ in range(2):
+            view_counts.record_view(self.auction.id)
+        view_counts.flush()
+
+        client = APIClient()
+        client.force_authenticate(self.seller)
+        response = client.get("/api/v1/auctions/auctions/my_auctions/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [auction["views"] for auction in response.json()["data"]], [2]
+        )
+
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=self.admin)
+        response = AdminAuctionViewSet.as_view({"get": "analytics"})(
+            request, pk=self.auction.id
+        )
+        self.assertEqual(response.data["analytics"]["views"], 2)
+        response = admin_auction_dashboard(request)
+        self.assertEqual(response.data["overall_stats"]["total_views"], 2)
+        self.assertEqual(response.data["most_viewed"][0]["views"], 2)
+
+
+@override_settings(
+    WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="", VIEW_COUNT_FLUSH_SECONDS=3600
+)
+class AnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.admin = User.objects.create_user(
+            email="admin@example.com", password="pw", first_name="A", last_name="A",
+            role="admin",
+        )
+        cls.bidders = [
+            User.objects.create_user(
+                email=f"b{i}@example.com",
+                password="pw",
+                first_name="B",
+                last_name=str(i),
+            )
+            for i in range(3)
+        ]
+        Wallet.objects.filter(user=cls.bidders[0]).update(balance=Decimal("100.00"))
+        cls.furniture = Category.objects.create(name="Furniture")
+        chairs = Category.objects.create(name="Chairs", parent=cls.furniture)
+        now = timezone.now()
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Chair", description="", category=chairs, owner=cls.seller
+            ),
+            seller=cls.seller,
+            title="Chair",
+            description="",
+            starting_price=Decimal("5.00"),
+            start_time=now - timedelta(hours=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        # views left over by other tests
+        view_counts.flush()
+
+    def admin_get(self, action, **kwargs):
+        request = APIRequestFactory().get("/", kwargs.pop("params", {}))
+        force_authenticate(request, user=self.admin)
+        return AdminAuctionViewSet.as_view({"get": action})(request, **kwargs)
+
+    def test_sketches_merge_into_the_sketch_of_the_union(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(6000):
+            first.add(i)
+        for i in range(4000, 10000):
+            second.add(i)
+        self.assertAlmostEqual(
+            HyperLogLog(first.to_bytes()).merge(second).count(), 10000, delta=500
+        )
+
+        digest, other = TDigest(), TDigest()
+        for i in range(1, 5001):
+            digest.add(i)
+            other.add(i + 5000)
+        digest.merge(TDigest.from_dict(other.to_dict()))
+        self.assertAlmostEqual(digest.quantile(0.5), 5000, delta=50)
+        self.assertAlmostEqual(digest.quantile(0.99), 9900, delta=20)
+        self.assertEqual((digest.quantile(0), digest.quantile(1)), (1, 10000))
+
+        counts, more = CountMin(), CountMin()
+        for i in range(100):
+            counts.add(f"k{i}")
+        counts.add("heavy", 50)
+        more.add("heavy", 30)
+        more.add("k1", 20)
+        counts.merge(CountMin.from_dict(more.to_dict()))
+        self.assertEqual([key for key, _ in counts.most_common(2)], ["heavy", "k1"])
+        # never under the true count
+        self.assertGreaterEqual(counts.estimate("heavy"), 80)
+
+    def test_bids_are_queued_and_added_to_each_sketch(self):
+        Bid.objects.bulk_create(
+            Bid(auction=self.auction, bidder=self.bidders[i], amount=Decimal(amount))
+            for i, amount in [(0, "10.00"), (1, "20.00"), (0, "30.00"), (2, "40.00")]
+        )
+        self.assertEqual(PendingSketchBid.objects.count(), 4)
+        today = timezone.localdate()
+        # the queued bids are counted before they are absorbed, and once
+        queued = [
+            analytics.auction_summary(self.auction.id),
+            analytics.category_summary(self.furniture.id),
+            analytics.daily_summary(today, today),
+        ]
+        self.assertEqual(analytics.absorb_bids(), 4)
+        self.assertFalse(PendingSketchBid.objects.exists())
+        self.assertEqual(
+            queued,
+            [
+                analytics.auction_summary(self.auction.id),
+                analytics.category_summary(self.furniture.id),
+                analytics.daily_summary(today, today),
+            ],
+        )
+
+        summary = analytics.auction_summary(self.auction.id)
+        self.assertEqual(summary["total_bids"], 4)
+        self.assertEqual(summary["unique_bidders"], 3)
+        self.assertEqual(summary["highest_bid"], Decimal("40.00"))
+        self.assertEqual(summary["average_bid"], Decimal("25.00"))
+        self.assertEqual(summary["bid_quantiles"]["p50"], Decimal("25.00"))
+        self.assertEqual(
+            summary["top_bidders"][0], {"bidder_id": str(self.bidders[0].id), "bids": 2}
+        )
+        # the category's sketch rolls up into its parent's
+        self.assertEqual(analytics.category_summary(self.furniture.id)["total_bids"], 4)
+        week = analytics.daily_summary(today - timedelta(days=6), today)
+        self.assertEqual(week["unique_bidders"], 3)
+        with self.assertRaises(ValueError):
+            analytics.daily_summary(today, today - timedelta(days=1))
+
+    def test_stats_endpoints_read_the_sketches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Bid.objects.create(
+                auction=self.auction, bidder=self.bidders[0], amount=Decimal("15.00")
+            )
+        # left for the absorb task, not added on the bid's commit
+        self.assertEqual(PendingSketchBid.objects.count(), 1)
+        client = APIClient()
+        client.force_authenticate(self.bidders[1])
+        url = f"/api/v1/auctions/auctions/{self.auction.id}/stats/"
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual((data["total_bids"], data["unique_bidders"]), (1, 1))
+        self.assertEqual(data["highest_bid"], data["current_price"])
+
+        call_command("absorb_bid_sketches", stdout=StringIO())
+        self.assertFalse(PendingSketchBid.objects.exists())
+
+        # a new bid changes the ETag, absorbed or not
+        Bid.objects.bulk_create(
+            [Bid(auction=self.auction, bidder=self.bidders[2], amount=Decimal("16.00"))]
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual((data["total_bids"], data["unique_bidders"]), (2, 2))
+        self.assertEqual(data["highest_bid"], data["current_price"])
+        self.assertEqual(absorb_bid_sketches(), {"absorbed": 1})
+
+        view_counts.record_view(self.auction.id, "user:1")
+        view_counts.record_view(self.auction.id, "user:1")
+        view_counts.record_view(self.auction.id, "ip:10.0.0.1")
+        view_counts.flush()
+        response = self.admin_get("analytics", pk=self.auction.id)
+        data = response.data["analytics"]
+        self.assertEqual(data["total_bids"], 2)
+        self.assertEqual(data["average_bid"], Decimal("15.50"))
+        self.assertEqual((data["views"], data["unique_viewers"]), (3, 2))
+
+        response = self.admin_get("statistics", params={"category": self.furniture.id})
+        self.assertEqual(response.data["statistics"]["total_bids"], 2)
+        response = self.admin_get("statistics")
+        self.assertEqual(response.data["statistics"]["unique_viewers"], 2)
+        response = self.admin_get("statistics", params={"start_date": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(WATCHLIST_REDIS_URL="", AUTOCOMPLETE_REDIS_URL="")
+class PriceHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        cls.bidder = User.objects.create_user(
+            email="bidder@example.com", password="pw", first_name="B", last_name="B"
+        )
+        now = timezone.now()
+        cls.start = now - timedelta(hours=4)
+        cls.auction = Auction.objects.create(
+            item=Item.objects.create(
+                name="Clock",
+                description="",
+                category=Category.objects.create(name="Clocks"),
+                owner=cls.seller,
+            ),
+            seller=cls.seller,
+            title="Clock",
+            description="",
+            starting_price=Decimal("5.00"),
+            start_time=cls.start,
+            end_time=now + timedelta(hours=4),
+            status=Auction.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def bid(self, minutes, amount, status=Bid.STATUS_OUTBID):
+        (bid,) = Bid.objects.bulk_create(
+            [
+                Bid(
+                    auction=self.auction,
+                    bidder=self.bidder,
+                    amount=Decimal(amount),
+                    status=status,
+                )
+            ]
+        )
+        Bid.objects.filter(id=bid.id).update(
+            timestamp=self.start + timedelta(minutes=minutes)
+        )
+
+    def test_bids_are_aggregated_per_bucket(self):
+        self.bid(10, "10.00")
+        self.bid(20, "15.00")
+        self.bid(30, "12.00")
+        self.bid(40, "99.00", status=Bid.STATUS_CANCELLED)
+        self.bid(185, "20.00")
+
+        # 8 hours in 8 buckets
+        history = price_history.price_history(self.auction, 8)
+        self.assertEqual(history["interval"], 3600)
+        buckets = history["buckets"]
+        self.assertEqual(
+            [row["start"] for row in buckets],
+            [self.start, self.start + timedelta(hours=3)],
+        )
+        self.assertEqual(
+            [(row["open"], row["high"], row["low"], row["close"]) for row in buckets],
+            [
+                tuple(map(Decimal, ("10.00", "15.00", "10.00", "12.00"))),
+                tuple(map(Decimal, ("20.00",) * 4)),
+            ],
+        )
+        self.assertEqual([row["bids"] for row in buckets], [3, 1])
+
+        url = f"/api/v1/auctions/public/auctions/{self.auction.id}/price-history/"
+        response = APIClient().get(url, {"buckets": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["bids"] for row in response.json()["data"]["buckets"]], [4]
+        )
+        response = APIClient().get(url, {"buckets": 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_closed_auction_history_is_cached_for_good(self):
+        self.bid(10, "10.00")
+        self.auction.status = Auction.STATUS_ENDED
+        history = price_history.price_history(self.auction, 8)
+        self.bid(20, "15.00")
+        with self.assertNumQueries(0):
+            self.assertEqual(price_history.price_history(self.auction, 8), history)
+
+        # running auctions are aggregated on each request
+        self.auction.status = Auction.STATUS_ACTIVE
+        history = price_history.price_history(self.auction, 8)
+        self.assertEqual(history["buckets"][0]["bids"], 2)
@@ -0,0 +1,155 @@
+"""
+Trending auctions
+
+An auction's trending score is the sum of the weights of its bids, first
+bids by a new bidder, watches and views, each decayed by half every
+TRENDING_HALF_LIFE_HOURS. Instead of decaying every score as time passes,
+each event is weighted up by exp(t / tau) for its time t (forward decay):
+all scores would be divided by the same factor at any instant, so the
+ranking is the same. TrendingScore stores the log of that sum, which stays
+in range, and each event adds to it with one upsert (a log-add in SQL);
+nothing is recomputed from the bid or watch tables.
+
+The top N, overall or for a category and its subcategories, is then read
+off an index on the score in O(N).
+"""
+
+import math
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import Auction, Bid, TrendingScore
+from .percolator import category_parents
+
+BID_WEIGHT = 1.0
+# On top of the bid, for a bidder's first bid on the auction
+NEW_BIDDER_WEIGHT = 2.0
+WATCH_WEIGHT = 2.0
+VIEW_WEIGHT = 0.1
+
+DEFAULT_LIMIT = 3
+MAX_LIMIT = 50
+SORT_PARAM = "sort"
+SORT_TRENDING = "trending"
+
+# Event times are measured from here, to keep the exponents small
+EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _tau():
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+def _log_weight(weight, now):
+    return math.log(weight) + (now - EPOCH).total_seconds() / _tau()
+
+
+def record(events, now=None):
+    """
+    Add events to the trending scores of active auctions
+
+    Args:
+        events: iterable of (auction ID, weight)
+    """
+    weights = defaultdict(float)
+    for auction_id, weight in events:
+        weights[str(auction_id)] += weight
+    if not weights:
+        return
+
+    now = now or timezone.now()
+    # sorted, so concurrent upserts lock the rows in the same order
+    auction_ids = sorted(weights)
+    scores = [_log_weight(weights[auction_id], now) for auction_id in auction_ids]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {TrendingScore._meta.db_table} AS t
+                (auction_id, category_id, score)
+            SELECT a.id, i.category_id, e.score
+            FROM unnest(%s::uuid[], %s::float8[]) AS e(auction_id, score)
+            JOIN auctions_auction a ON a.id = e.auction_id
+            JOIN auctions_item i ON i.id = a.item_id
+            WHERE a.status = %s
+            ORDER BY a.id
+            ON CONFLICT (auction_id) DO UPDATE
+            SET score = GREATEST(t.score, EXCLUDED.score)
+                        + LN(1 + EXP(-ABS(t.score - EXCLUDED.score)))
+            """,
+            [auction_ids, scores, Auction.STATUS_ACTIVE],
+        )
+
+
+def record_bid(bid):
+    """Count a bid, and its bidder if it's their first bid on the auction"""
+    weight = BID_WEIGHT
+    bids = Bid.objects.filter(auction_id=bid.auction_id, bidder_id=bid.bidder_id)
+    if not bids.exclude(id=bid.id).exists():
+        weight += NEW_BIDDER_WEIGHT
+    record([(bid.auction_id, weight)])
+
+
+def record_watch(auction_id):
+    record([(auction_id, WATCH_WEIGHT)])
+
+
+def forget(auction_id):
+    """Drop an auction that is no longer active from the ranking"""
+    TrendingScore.objects.filter(auction_id=auction_id).delete()
+
+
+def category_subtree(category_id):
+    """The category and its descendants"""
+    children = defaultdict(list)
+    for child, parent in category_parents().items():
+        children[parent].append(child)
+    subtree = []
+    pending = [category_id]
+    while pending:
+        current = pending.pop()
+        if current not in subtree:
+            subtree.append(current)
+            pending.extend(children[current])
+    return subtree
+
+
+def top_auctions(limit, category_id=None):
+    """Active auctions by trending score, optionally in a category subtree"""
+    queryset = Auction.objects.filter(
+        status=Auction.STATUS_ACTIVE,
+        end_time__gt=timezone.now(),
+        trending__isnull=False,
+    )
+    if category_id is not None:
+        queryset = queryset.filter(trending__category_id__in=category_subtree(category_id))
+    return queryset.order_by("-trending__score")[:limit]
+
+
+def featured_queryset(params):
+    """
+    Auctions of the featured endpoints: the newest active ones, or with
+    ``sort=trending`` the trending ones (of ``category``, if given)
+
+    Args:
+        params: request.query_params or request.GET
+
+    Raises:
+        ValueError: ``limit`` is not a positive integer, or ``category``
+            not a UUID
+    """
+    limit = int(params.get("limit", DEFAULT_LIMIT))
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    limit = min(limit, MAX_LIMIT)
+    if params.get(SORT_PARAM) == SORT_TRENDING:
+        category = params.get("category")
+        category_id = uuid.UUID(category) if category else None
+        return top_auctions(limit, category_id)
+    return Auction.objects.filter(
+        status=Auction.STATUS_ACTIVE, end_time__gt=timezone.now()
+    ).order_by("-created_at")[:limit]
@@ -6,9 +6,14 @@ from .views import (
     AuctionViewSet,
     BidViewSet,
     AutoBidViewSet,
+    SavedSearchViewSet,
+    PriceAlertViewSet,
     search_auctions,
     auction_stats,
+    auction_price_history,
     search_items,
+    autocomplete_suggestions,
+    upload_item_images,
     list_all_categories,
     test_auth,
     create_auction,
@@ -28,12 +33,16 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'auctions', AuctionViewSet, basename='auction')
 router.register(r'bids', BidViewSet, basename='bid')
 router.register(r'autobids', AutoBidViewSet, basename='autobid')
+router.register(r'saved-searches', SavedSearchViewSet, basename='saved-search')
+router.register(r'price-alerts', PriceAlertViewSet, basename='price-alert')
 
 urlpatterns = [
     # Include router URLs
     path('', include(router.urls)),
     path('search/', search_auctions, name='search-auctions'),
     path('items/search/', search_items, name='search-items'),
+    path('autocomplete/', autocomplete_suggestions, name='autocomplete'),
+    path('items/<uuid:item_id>/images/', upload_item_images, name='upload-item-images'),
     path('categories/all/', list_all_categories, name='list-all-categories'),
     path('test-auth/', test_auth, name='test-auth'),
     path('create-auction/', create_auction, name='create-auction'),
@@ -50,6 +59,11 @@ urlpatterns = [
     # Public endpoints
     path('public/auctions/<uuid:auction_id>/', public_auction_detail, name='public-auction-detail'),
     path('public/auctions/<uuid:auction_id>/bids/', api.public_auction_bids, name='public-auction-bids'),
+    path(
+        'public/auctions/<uuid:auction_id>/price-history/',
+        auction_price_history,
+        name='auction-price-history',
+    ),
     path('public/test/', public_test, name='public-test'),
 
     # Featured auctions endpoint
@@ -0,0 +1,188 @@
+"""
+Buffered auction view counters
+
+Each process counts detail views in memory and writes the accumulated
+deltas to AuctionViewCount at most every VIEW_COUNT_FLUSH_SECONDS, with
+one upsert for all the auctions viewed in that interval, instead of an
+UPDATE per view. The flush is done by the first view after the interval
+has passed, or else by a timer thread once it has, so an idle process
+doesn't keep its counts, and at exit. The same deltas feed the trending
+scores, and the distinct viewers of the interval the analytics sketches.
+A process that dies loses at most one interval of views.
+
+Counts read back (view_counts()) are those flushed so far.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from . import analytics, trending
+from .models import AuctionViewCount
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = Counter()
+_viewers = defaultdict(set)
+_flushed_at = time.monotonic()
+_timer = None
+
+
+def viewer_key(request, user=None):
+    """Who viewed: the user if authenticated, else the client address"""
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def count_view(auction_id, viewer=None):
+    """
+    Count a view in memory
+
+    Args:
+        viewer: viewer_key(), for the distinct viewer counts
+
+    Returns:
+        bool - whether a flush is due
+    """
+    with _lock:
+        _pending[str(auction_id)] += 1
+        if viewer is not None:
+            _viewers[str(auction_id)].add(viewer)
+        _schedule_flush()
+        return _flush_due()
+
+
+def _flush_due():
+    return time.monotonic() - _flushed_at >= settings.VIEW_COUNT_FLUSH_SECONDS
+
+
+def _schedule_flush():
+    """Start the timer flushing the counts when due, with _lock held"""
+    global _timer
+    if _timer is None:
+        delay = settings.VIEW_COUNT_FLUSH_SECONDS - (time.monotonic() - _flushed_at)
+        _timer = threading.Timer(max(delay, 0), _timed_flush)
+        _timer.daemon = True
+        _timer.start()
+
+
+def _timed_flush():
+    global _timer
+    with _lock:
+        _timer = None
+        if not _flush_due():
+            # a view flushed the counts since the timer started
+            if _pending:
+                _schedule_flush()
+            return
+    try:
+        flush()
+    except Exception:
+        logger.warning("Could not flush auction view counts", exc_info=True)
+    finally:
+        # this thread's own connection
+        connection.close()
+    with _lock:
+        # views counted meanwhile, or kept after a failed write
+        if _pending:
+            _schedule_flush()
+
+
+def flush():
+    """
+    Write the views counted since the last flush
+
+    Returns:
+        int - number of views written
+    """
+    global _pending, _viewers, _flushed_at
+    with _lock:
+        pending, _pending = _pending, Counter()
+        viewers, _viewers = _viewers, defaultdict(set)
+        _flushed_at = time.monotonic()
+    if not pending:
+        return 0
+
+    # sorted, so concurrent flushes lock the rows in the same order
+    auction_ids = sorted(pending)
+    try:
+        _write(auction_ids, pending)
+    except DatabaseError:
+        # kept for the next flush
+        with _lock:
+            _pending.update(pending)
+            for auction_id, keys in viewers.items():
+                _viewers[auction_id].update(keys)
+        logger.warning("Could not save auction view counts", exc_info=True)
+        return 0
+    try:
+        # in a savepoint, so a failure doesn't break an enclosing transaction
+        with transaction.atomic():
+            trending.record(
+                (auction_id, views * trending.VIEW_WEIGHT)
+                for auction_id, views in pending.items()
+            )
+    except DatabaseError:
+        logger.warning("Could not add views to the trending scores", exc_info=True)
+    try:
+        analytics.record_views(pending, viewers)
+    except DatabaseError:
+        logger.warning("Could not add views to the analytics sketches", exc_info=True)
+    return sum(pending.values())
+
+
+def _write(auction_ids, pending):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {AuctionViewCount._meta.db_table} AS c
+                (auction_id, views, updated_at)
+            SELECT a.id, v.views, NOW()
+            FROM unnest(%s::uuid[], %s::bigint[]) AS v(auction_id, views)
+            JOIN auctions_auction a ON a.id = v.auction_id
+            ORDER BY a.id
+            ON CONFLICT (auction_id) DO UPDATE
+            SET views = c.views + EXCLUDED.views, updated_at = EXCLUDED.updated_at
+            """,
+            [auction_ids, [pending[auction_id] for auction_id in auction_ids]],
+        )
+
+
+def record_view(auction_id, viewer=None):
+    """Count a view, flushing the counts if due"""
+    if count_view(auction_id, viewer):
+        flush()
+
+
+async def arecord_view(auction_id, viewer=None):
+    if count_view(auction_id, viewer):
+        await sync_to_async(flush)()
+
+
+def view_counts(auction_ids):
+    """Flushed views per auction ID (as a string), for the auctions viewed"""
+    return {
+        str(auction_id): views
+        for auction_id, views in AuctionViewCount.objects.filter(
+            auction_id__in=auction_ids
+        ).values_list("auction_id", "views")
+    }
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        # the database may already be gone at interpreter exit
+        pass
+
+
+atexit.register(_flush_at_exit)
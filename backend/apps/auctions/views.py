@@ -1,31 +1,62 @@
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
-from django.db.models import Max, Q
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.urls import get_resolver
+from django.utils.decorators import method_decorator
 from django.http import JsonResponse
 
 from rest_framework import viewsets, permissions, status, filters
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (
+    action,
+    api_view,
+    parser_classes,
+    permission_classes,
+)
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_yasg.utils import swagger_auto_schema
+from drf_yasg.utils import no_body, swagger_auto_schema
 from drf_yasg import openapi
 
 from apps.accounts.permissions import IsAdmin
 from apps.transactions.models import AutoBid
 from apps.accounts.models import Wallet
 from apps.transactions.serializers import AutoBidSerializer
+from apps.core.conditional import conditional
+from apps.core.fieldsets import (
+    fieldset_parameters,
+    readable_fields,
+    requested_fields,
+    select_fields,
+)
 from apps.core.mixins import SwaggerSchemaMixin, ApiResponseMixin
 from apps.core.responses import api_response
 
-from .models import Category, Item, Auction, Bid, AuctionWatch
+from . import (
+    analytics,
+    autocomplete,
+    bulk_import,
+    etags,
+    images,
+    price_history,
+    trending,
+    view_counts,
+    watchlist,
+)
+from .facets import facet_counts, facet_parameters, filter_signature, wants_facets
+from .models import Category, Item, Auction, Bid, AuctionWatch, PriceAlert, SavedSearch
+from .rows import MAX_PAGE_BIDS, PAGE_BIDS, auction_page, auction_rows, bid_rows
+from .services import select_auction_relations, select_bid_relations
 from .serializers import (
     CategorySerializer,
     ItemSerializer,
     AuctionSerializer,
     BidSerializer,
+    SavedSearchSerializer,
+    PriceAlertSerializer,
     AuctionCreateSerializer  # Add this import
 )
 
@@ -135,7 +166,7 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
     # Update the get_permissions method
     def get_permissions(self):
         """Only require authentication for creating, updating, deleting auctions"""
-        if self.action in ["create", "update", "partial_update", "destroy", "my_auctions", "watch", "unwatch", "watched"]:
+        if self.action in ["create", "update", "partial_update", "destroy", "my_auctions", "watch", "unwatch", "watched", "bulk_import"]:
             self.permission_classes = [permissions.IsAuthenticated]
         else:
             self.permission_classes = [permissions.AllowAny]
@@ -151,21 +182,33 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
 
         # For unauthenticated users, only show active auctions
         if not user.is_authenticated:
-            return Auction.objects.filter(status=Auction.STATUS_ACTIVE).select_related("seller", "item")
+            return select_auction_relations(
+                Auction.objects.filter(status=Auction.STATUS_ACTIVE),
+                self.requested_fields,
+            )
 
         # For authenticated users, also show their own auctions
-        if self.action in ["list", "retrieve"]:
-            return Auction.objects.filter(
-                Q(status=Auction.STATUS_ACTIVE) | Q(seller=user)
-            ).select_related("seller", "item")
+        if self.action in ["list", "retrieve", "page"]:
+            return select_auction_relations(
+                Auction.objects.filter(
+                    Q(status=Auction.STATUS_ACTIVE) | Q(seller=user)
+                ),
+                self.requested_fields,
+            )
 
         return Auction.objects.filter(seller=user)
 
+    @property
+    def requested_fields(self):
+        """AuctionSerializer fields selected by ?fields= / ?exclude="""
+        return requested_fields(self.request.query_params, AuctionSerializer)
+
     @swagger_auto_schema(
         operation_id="list_auctions",
         operation_summary="List auctions",
         operation_description="Get all active auctions + user's own auctions",
         tags=["Auctions"],
+        manual_parameters=fieldset_parameters(AuctionSerializer) + facet_parameters(),
         responses={200: AuctionSerializer(many=True)},
     )
     def list(self, request, *args, **kwargs):
@@ -192,19 +235,31 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
         if featured and featured.lower() == 'true':
             queryset = queryset.filter(is_featured=True)
 
+        facets = None
+        if wants_facets(request.query_params):
+            # Authenticated users also see their own auctions
+            signature = filter_signature(request.query_params, "list", request.user.id)
+            facets = facet_counts(queryset, signature)
+
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(serializer.data)
+            if facets is not None:
+                response.data["facets"] = facets
+            return response
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
+        auctions = auction_rows(queryset, request.user, self.requested_fields)
+        body = {
             'success': True,
             'data': {
-                'auctions': serializer.data,
-                'count': queryset.count()
+                'auctions': auctions,
+                'count': len(auctions)
             }
-        })
+        }
+        if facets is not None:
+            body['facets'] = facets
+        return Response(body)
 
     @swagger_auto_schema(
         operation_id="create_auction",
@@ -309,15 +364,131 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
         operation_summary="Get auction details",
         operation_description="Get details for a specific auction",
         tags=["Auctions"],
+        manual_parameters=fieldset_parameters(AuctionSerializer),
         responses={200: AuctionSerializer},
     )
+    @method_decorator(conditional(etags.auction_detail, private=True))
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
+        view_counts.record_view(
+            instance.id, view_counts.viewer_key(request, request.user)
+        )
         serializer = self.get_serializer(instance)
         return api_response(
             data=serializer.data, message="Auction details retrieved successfully"
         )
 
+    @swagger_auto_schema(
+        operation_id="auction_page",
+        operation_summary="Get auction page",
+        operation_description=(
+            "The auction with its top bids, bid statistics and the current "
+            "user's watch and auto-bid state, in one request"
+        ),
+        tags=["Auctions"],
+        manual_parameters=[
+            openapi.Parameter(
+                "bids",
+                openapi.IN_QUERY,
+                description=(
+                    f"Number of top bids (default {PAGE_BIDS}, at most {MAX_PAGE_BIDS})"
+                ),
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={200: "Auction page", 404: "Not found"},
+    )
+    @action(detail=True, methods=["get"])
+    @method_decorator(conditional(etags.auction_page, private=True))
+    def page(self, request, pk=None):
+        try:
+            bids = int(request.query_params.get("bids", PAGE_BIDS))
+            bids = min(max(bids, 0), MAX_PAGE_BIDS)
+        except ValueError:
+            return api_response(
+                message="bids must be an integer",
+                success=False,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = auction_page(self.get_queryset().filter(pk=pk), request.user, bids)
+        if data is None:
+            return api_response(
+                message="Auction not found",
+                success=False,
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return api_response(data=data, message="Auction page retrieved successfully")
+
+    @swagger_auto_schema(
+        operation_id="import_auctions",
+        operation_summary="Import auctions",
+        operation_description=(
+            "Create an item and its auction for every row of a CSV or JSON "
+            "Lines file (multipart field 'file'). Columns: title, description, "
+            "category (name), starting_price, end_time, and optionally "
+            "start_time (default now), min_bid_increment, reserve_price, "
+            "buy_now_price, auction_type, item_name, item_description, "
+            "image_urls ('|'-separated in CSV), weight, dimensions. Invalid "
+            "rows are reported by row number; the others are created."
+        ),
+        tags=["Auctions"],
+        request_body=no_body,
+        manual_parameters=[
+            openapi.Parameter(
+                "file",
+                openapi.IN_FORM,
+                description="CSV or JSON Lines file",
+                type=openapi.TYPE_FILE,
+                required=True,
+            ),
+            openapi.Parameter(
+                "format",
+                openapi.IN_FORM,
+                description="csv or jsonl (default: from the file extension)",
+                type=openapi.TYPE_STRING,
+                enum=[*bulk_import.FORMATS],
+            ),
+        ],
+        responses={201: "Import report", 400: "Validation error"},
+        security=[{"Bearer": []}],
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def bulk_import(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return api_response(
+                success=False,
+                message="Validation error",
+                errors={"file": "No file uploaded."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        file_format = request.data.get("format") or upload.name.rpartition(".")[2]
+        try:
+            rows = bulk_import.read_rows(upload.file, file_format.lower())
+        except bulk_import.ImportFileError as exc:
+            return api_response(
+                success=False,
+                message="Validation error",
+                errors={"file": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        report = bulk_import.import_auctions(request.user, rows, source=upload.name)
+        imported = report["created"] > 0
+        return api_response(
+            data=report,
+            message=f"{report['created']} of {report['total']} auctions imported",
+            success=imported,
+            status=status.HTTP_201_CREATED if imported else status.HTTP_400_BAD_REQUEST,
+        )
+
     @swagger_auto_schema(
         operation_id="update_auction",
         operation_summary="Update auction",
@@ -440,15 +611,21 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if AuctionWatch.objects.filter(user=user, auction=auction).exists():
-            return api_response(
-                success=False,
-                message="Already watching this auction",
-                errors={"detail": "Already watching this auction."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        already_watching = api_response(
+            success=False,
+            message="Already watching this auction",
+            errors={"detail": "Already watching this auction."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+        if watchlist.is_watching(user.id, auction.id):
+            return already_watching
 
-        watch = AuctionWatch.objects.create(user=user, auction=auction)
+        # The unique (user, auction) constraint catches a stale mirror
+        try:
+            with transaction.atomic():
+                AuctionWatch.objects.create(user=user, auction=auction)
+        except IntegrityError:
+            return already_watching
         return api_response(
             message="Auction added to watchlist", status=status.HTTP_201_CREATED
         )
@@ -465,9 +642,8 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
         auction = self.get_object()
         user = request.user
 
-        watch = AuctionWatch.objects.filter(user=user, auction=auction).first()
-        if watch:
-            watch.delete()
+        deleted, _ = AuctionWatch.objects.filter(user=user, auction=auction).delete()
+        if deleted:
             return api_response(message="Auction removed from watchlist")
         else:
             return api_response(
@@ -482,15 +658,16 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
         operation_summary="Get watched auctions",
         operation_description="Get all auctions on user's watch list",
         tags=["Auctions"],
+        manual_parameters=fieldset_parameters(AuctionSerializer),
         responses={200: AuctionSerializer(many=True)},
     )
     @action(detail=False, methods=["get"])
     def watched(self, request):
         user = request.user
-        watched_auction_ids = AuctionWatch.objects.filter(user=user).values_list(
-            "auction_id", flat=True
+        queryset = select_auction_relations(
+            Auction.objects.filter(id__in=watchlist.watched_ids(user.id)),
+            self.requested_fields,
         )
-        queryset = Auction.objects.filter(id__in=watched_auction_ids)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -505,14 +682,19 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
     @swagger_auto_schema(
         operation_id="get_my_auctions",
         operation_summary="Get my auctions",
-        operation_description="Get all auctions created by current user",
+        operation_description=(
+            "Get all auctions created by current user, with their view counts"
+        ),
         tags=["Auctions"],
+        manual_parameters=fieldset_parameters(AuctionSerializer),
         responses={200: AuctionSerializer(many=True)},
     )
     @action(detail=False, methods=["get"])
     def my_auctions(self, request):
         user = request.user
-        queryset = Auction.objects.filter(seller=user)
+        queryset = select_auction_relations(
+            Auction.objects.filter(seller=user), self.requested_fields
+        )
 
         status_filter = request.query_params.get("status")
         if status_filter:
@@ -521,13 +703,25 @@ class AuctionViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(self._with_views(page, serializer.data))
 
-        serializer = self.get_serializer(queryset, many=True)
+        auctions = list(queryset)
+        serializer = self.get_serializer(auctions, many=True)
         return api_response(
-            data=serializer.data, message="Your auctions retrieved successfully"
+            data=self._with_views(auctions, serializer.data),
+            message="Your auctions retrieved successfully",
         )
 
+    def _with_views(self, auctions, data):
+        """Add each auction's view count for its seller, unless left out"""
+        available = (*readable_fields(AuctionSerializer), "views")
+        if "views" not in select_fields(self.request.query_params, available):
+            return data
+        counts = view_counts.view_counts([auction.id for auction in auctions])
+        for auction, row in zip(auctions, data):
+            row["views"] = counts.get(str(auction.id), 0)
+        return data
+
 
 class BidViewSet(viewsets.ModelViewSet):
     """ViewSet for managing bids"""
@@ -547,8 +741,23 @@ class BidViewSet(viewsets.ModelViewSet):
         auction_id = self.request.query_params.get('auction_id')
         if auction_id:
             queryset = queryset.filter(auction_id=auction_id)
+        if self.action == "retrieve":
+            queryset = select_bid_relations(queryset, self.requested_fields)
         return queryset
-        
+
+    @property
+    def requested_fields(self):
+        """BidSerializer fields selected by ?fields= / ?exclude="""
+        return requested_fields(self.request.query_params, BidSerializer)
+
+    @swagger_auto_schema(manual_parameters=fieldset_parameters(BidSerializer))
+    def list(self, request, *args, **kwargs):
+        return Response(bid_rows(self.get_queryset(), self.requested_fields))
+
+    @swagger_auto_schema(manual_parameters=fieldset_parameters(BidSerializer))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Set the bidder to the current user"""
         serializer.save(bidder=self.request.user)
@@ -561,6 +770,7 @@ class BidViewSet(viewsets.ModelViewSet):
     operation_summary="Search auctions",
     operation_description="Search for auctions by keyword, category, price range, etc.",
     tags=["Auctions"],
+    manual_parameters=fieldset_parameters(AuctionSerializer) + facet_parameters(),
 )
 def search_auctions(request):
     """Search for auctions with various filters"""
@@ -597,10 +807,18 @@ def search_auctions(request):
     elif sort == "price_high":
         queryset = queryset.order_by("-starting_price")
 
-    serializer = AuctionSerializer(queryset, many=True, context={"request": request})
-    return api_response(
-        data=serializer.data, message="Search results retrieved successfully"
+    response = api_response(
+        data=auction_rows(
+            queryset,
+            request.user,
+            requested_fields(request.query_params, AuctionSerializer),
+        ),
+        message="Search results retrieved successfully",
     )
+    if wants_facets(request.query_params):
+        signature = filter_signature(request.query_params, "search")
+        response.data["facets"] = facet_counts(queryset, signature)
+    return response
 
 
 @api_view(["GET"])
@@ -611,16 +829,12 @@ def search_auctions(request):
     operation_description="Get statistics about a specific auction",
     tags=["Auctions"],
 )
+@conditional(etags.auction_stats, private=True)
 def auction_stats(request, auction_id):
     """Get statistics about an auction"""
     auction = get_object_or_404(Auction, id=auction_id)
 
-    total_bids = auction.bids.count()
-    unique_bidders = auction.bids.values("bidder").distinct().count()
-    highest_bid = (
-        auction.bids.aggregate(max_bid=Max("amount"))["max_bid"]
-        or auction.starting_price
-    )
+    summary = analytics.auction_summary(auction.id)
 
     is_seller_or_admin = request.user == auction.seller or request.user.role == "admin"
 
@@ -628,9 +842,9 @@ def auction_stats(request, auction_id):
         "auction_id": auction.id,
         "title": auction.title,
         "current_price": auction.current_price,
-        "total_bids": total_bids,
-        "unique_bidders": unique_bidders,
-        "highest_bid": highest_bid,
+        "total_bids": summary["total_bids"],
+        "unique_bidders": summary["unique_bidders"],
+        "highest_bid": summary["highest_bid"] or auction.starting_price,
         "time_remaining": auction.time_remaining,
         "status": auction.status,
     }
@@ -645,6 +859,43 @@ def auction_stats(request, auction_id):
     )
 
 
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_id="get_auction_price_history",
+    operation_summary="Get auction price history",
+    operation_description=(
+        "The auction's bids aggregated into equal time buckets over its "
+        "schedule, each with its open, high, low and close amounts and bid "
+        "count, for price charts. Empty buckets are left out."
+    ),
+    tags=["Auctions"],
+    manual_parameters=[
+        openapi.Parameter(
+            price_history.BUCKETS_PARAM,
+            openapi.IN_QUERY,
+            description=(
+                f"Number of buckets (default {price_history.DEFAULT_BUCKETS}, "
+                f"at most {price_history.MAX_BUCKETS})"
+            ),
+            type=openapi.TYPE_INTEGER,
+        )
+    ],
+)
+@conditional(etags.public_auction)
+def auction_price_history(request, auction_id):
+    """Bucketed price history of an auction"""
+    auction = get_object_or_404(Auction, id=auction_id)
+    try:
+        buckets = price_history.bucket_count(request.query_params)
+    except ValueError as e:
+        return api_response(success=False, message=str(e), status=400)
+    return api_response(
+        data=price_history.price_history(auction, buckets),
+        message="Auction price history retrieved successfully",
+    )
+
+
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 @swagger_auto_schema(
@@ -666,6 +917,7 @@ def auction_stats(request, auction_id):
             type=openapi.TYPE_STRING,
             format=openapi.FORMAT_UUID,
         ),
+        *fieldset_parameters(ItemSerializer),
     ],
     responses={200: ItemSerializer(many=True)},
     security=[{"Bearer": []}],
@@ -689,10 +941,124 @@ def search_items(request):
     if category:
         queryset = queryset.filter(category=category)
 
-    serializer = ItemSerializer(queryset, many=True)
+    fields = requested_fields(request.query_params, ItemSerializer)
+    if "owner_details" in fields:
+        queryset = queryset.select_related("owner")
+    if "images" in fields:
+        queryset = queryset.prefetch_related("images__asset")
+
+    serializer = ItemSerializer(queryset, many=True, context={"fields": fields})
     return api_response(data=serializer.data, message="Items retrieved successfully")
 
 
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@swagger_auto_schema(
+    operation_id="autocomplete",
+    operation_summary="Autocomplete",
+    operation_description=(
+        "Active auctions and categories with a word of their title, item name "
+        "or name starting with the typed text, most popular first"
+    ),
+    tags=["Auctions"],
+    manual_parameters=[
+        openapi.Parameter(
+            "q", openapi.IN_QUERY, description="Typed text", type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            "limit",
+            openapi.IN_QUERY,
+            description=(
+                f"Number of suggestions (default 8, at most "
+                f"{autocomplete.MAX_SUGGESTIONS})"
+            ),
+            type=openapi.TYPE_INTEGER,
+        ),
+    ],
+)
+def autocomplete_suggestions(request):
+    """Typeahead suggestions from the autocomplete index"""
+    try:
+        limit = max(int(request.query_params.get("limit", 8)), 1)
+    except ValueError:
+        return api_response(
+            message="limit must be an integer",
+            success=False,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return api_response(
+        data=autocomplete.suggest(request.query_params.get("q", ""), limit),
+        message="Suggestions retrieved successfully",
+    )
+
+
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+@parser_classes([MultiPartParser])
+@swagger_auto_schema(
+    operation_id="upload_item_images",
+    operation_summary="Upload item images",
+    operation_description=(
+        "Upload one or more images (multipart field 'images') for an item you "
+        "own. Resized WebP/AVIF derivatives are generated for each image."
+    ),
+    tags=["Items"],
+    responses={201: ItemSerializer},
+    security=[{"Bearer": []}],
+)
+def upload_item_images(request, item_id):
+    """Store uploaded images and attach them to the item"""
+    item = get_object_or_404(Item, id=item_id)
+    if item.owner_id != request.user.id:
+        return api_response(
+            success=False,
+            message="Permission denied",
+            errors={"detail": "You do not have permission to change this item."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    uploads = request.FILES.getlist("images")
+    if not uploads:
+        return api_response(
+            success=False,
+            message="Validation error",
+            errors={"images": "No images uploaded."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    too_large = [
+        upload.name
+        for upload in uploads
+        if upload.size > settings.IMAGE_MAX_UPLOAD_BYTES
+    ]
+    if too_large:
+        return api_response(
+            success=False,
+            message="Validation error",
+            errors={
+                "images": f"Larger than {settings.IMAGE_MAX_UPLOAD_BYTES} bytes: "
+                + ", ".join(too_large)
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        images.attach_images(item, [upload.read() for upload in uploads])
+    except ValueError as exc:
+        return api_response(
+            success=False,
+            message="Validation error",
+            errors={"images": str(exc)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    item = Item.objects.prefetch_related("images__asset").get(id=item.id)
+    return api_response(
+        data=ItemSerializer(item).data,
+        message="Images uploaded successfully",
+        status=status.HTTP_201_CREATED,
+    )
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])  # Changed from IsAuthenticated to AllowAny
 @swagger_auto_schema(
@@ -829,6 +1195,168 @@ class AutoBidViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet
         )
 
 
+class SavedSearchViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet):
+    """
+    API endpoints for the current user's saved searches
+
+    New auctions matching a search with ``notify`` set are notified to its
+    owner (see percolator.py).
+    """
+
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    queryset = SavedSearch.objects.none()
+
+    def get_queryset(self):
+        if self.is_swagger_request:
+            return self.get_swagger_empty_queryset()
+        return SavedSearch.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @swagger_auto_schema(
+        operation_id="list_saved_searches",
+        operation_summary="List saved searches",
+        operation_description="Get the current user's saved searches",
+        tags=["Saved searches"],
+        responses={200: SavedSearchSerializer(many=True)},
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="create_saved_search",
+        operation_summary="Save a search",
+        operation_description=(
+            "Save keywords (all required), a category (including its "
+            "subcategories) and/or a starting price range, to be notified of "
+            "new auctions matching them"
+        ),
+        tags=["Saved searches"],
+        responses={201: SavedSearchSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="get_saved_search",
+        operation_summary="Get saved search",
+        tags=["Saved searches"],
+        responses={200: SavedSearchSerializer},
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="update_saved_search",
+        operation_summary="Update saved search",
+        tags=["Saved searches"],
+        responses={200: SavedSearchSerializer},
+    )
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="partial_update_saved_search",
+        operation_summary="Partially update saved search",
+        tags=["Saved searches"],
+        responses={200: SavedSearchSerializer},
+    )
+    def partial_update(self, request, *args, **kwargs):
+        return super().partial_update(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="delete_saved_search",
+        operation_summary="Delete saved search",
+        tags=["Saved searches"],
+        responses={204: "Deleted"},
+    )
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+
+class PriceAlertViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet):
+    """
+    API endpoints for the current user's price alerts
+
+    Bids crossing an alert's threshold notify its owner (see
+    price_alerts.py).
+    """
+
+    serializer_class = PriceAlertSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    queryset = PriceAlert.objects.none()
+
+    def get_queryset(self):
+        if self.is_swagger_request:
+            return self.get_swagger_empty_queryset()
+        return PriceAlert.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @swagger_auto_schema(
+        operation_id="list_price_alerts",
+        operation_summary="List price alerts",
+        operation_description="Get the current user's price alerts",
+        tags=["Price alerts"],
+        responses={200: PriceAlertSerializer(many=True)},
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="create_price_alert",
+        operation_summary="Create price alert",
+        operation_description=(
+            "Alert on an auction, or on every auction of a category and its "
+            "subcategories: 'above' notifies once when bidding reaches the "
+            "threshold, 'below' on each price change that stays below it"
+        ),
+        tags=["Price alerts"],
+        responses={201: PriceAlertSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="get_price_alert",
+        operation_summary="Get price alert",
+        tags=["Price alerts"],
+        responses={200: PriceAlertSerializer},
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="update_price_alert",
+        operation_summary="Update price alert",
+        tags=["Price alerts"],
+        responses={200: PriceAlertSerializer},
+    )
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="partial_update_price_alert",
+        operation_summary="Partially update price alert",
+        tags=["Price alerts"],
+        responses={200: PriceAlertSerializer},
+    )
+    def partial_update(self, request, *args, **kwargs):
+        return super().partial_update(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_id="delete_price_alert",
+        operation_summary="Delete price alert",
+        tags=["Price alerts"],
+        responses={204: "Deleted"},
+    )
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def test_auth(request):
@@ -884,13 +1412,18 @@ def create_auction(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional(etags.public_auction_detail)
 def public_auction_detail(request, auction_id):
     """
     Get auction details without requiring authentication
     """
+    fields = requested_fields(request.query_params, AuctionSerializer)
     try:
-        auction = Auction.objects.get(id=auction_id)
-        serializer = AuctionSerializer(auction)
+        auction = select_auction_relations(Auction.objects, fields).get(id=auction_id)
+        view_counts.record_view(
+            auction.id, view_counts.viewer_key(request, request.user)
+        )
+        serializer = AuctionSerializer(auction, context={"fields": fields})
         return Response(serializer.data)
     except Auction.DoesNotExist:
         return Response({"detail": "Auction not found"}, status=404)
@@ -1015,34 +1548,26 @@ def disable_auto_bid(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional(etags.featured_auctions)
 def featured_auctions(request):
     """
-    Get a list of featured auctions (newest active auctions)
+    Get a list of featured auctions (newest active auctions, or trending
+    ones with ?sort=trending, optionally of a &category=)
     """
     try:
-        # Get limit parameter, default to 3
-        limit = int(request.query_params.get('limit', 3))
-        
-        # Get current time
-        now = timezone.now()
-        
-        # Get newest active auctions
-        auctions = Auction.objects.filter(
-            status=Auction.STATUS_ACTIVE,
-            end_time__gt=now
-        ).order_by('-created_at')[:limit]
-        
-        serializer = AuctionSerializer(auctions, many=True)
-        
-        return Response({
-            'success': True,
-            'data': serializer.data
-        })
-    except Exception as e:
+        auctions = trending.featured_queryset(request.query_params)
+    except ValueError as e:
         return Response({
             'success': False,
             'message': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    fields = requested_fields(request.query_params, AuctionSerializer)
+
+    return Response({
+        'success': True,
+        'data': auction_rows(auctions, fields=fields)
+    })
 
 
 # Add this simple view to test if your auctions can be accessed:
@@ -0,0 +1,242 @@
+"""
+Watch sets mirrored in Redis
+
+AuctionWatch stays the source of truth. Its rows are mirrored as two kinds
+of Redis sets, the watchers of each auction and the auctions each user
+watches, so membership checks, watcher counts and notification fan-out
+don't query Postgres. Saves and deletes of AuctionWatch write through to
+Redis once their transaction commits (see signals.py).
+
+The sets are rebuilt from the table by the rebuild_watchlist_mirror task
+or ``manage.py rebuild_watchlist``, never in a request, e.g. after a Redis
+restart or a failed write-through. Changes written through during a
+rebuild are journaled and replayed over its snapshot
+(apps/core/redis_journal.py). Without WATCHLIST_REDIS_URL, while Redis has
+no complete copy or while it is unreachable, every function answers from
+the table instead.
+"""
+
+import logging
+import uuid
+from functools import partial
+
+import redis
+from django.conf import settings
+
+from apps.core import redis_journal
+from .models import AuctionWatch
+
+logger = logging.getLogger(__name__)
+
+READY_KEY = "watch:ready"
+REBUILD_LOCK_KEY = "watch:rebuild"
+JOURNAL_KEY = "watch:journal"
+REBUILD_BATCH_SIZE = 5000
+REBUILD_TIMEOUT = 300
+
+_client = None
+
+
+def _auction_key(auction_id):
+    return f"watch:auction:{auction_id}"
+
+
+def _user_key(user_id):
+    return f"watch:user:{user_id}"
+
+
+def get_client():
+    """Redis client for the mirror, or None if the mirror is disabled"""
+    global _client
+    if _client is None and settings.WATCHLIST_REDIS_URL:
+        # Short timeouts so an unreachable Redis falls back to the database
+        # instead of stalling requests
+        _client = redis.Redis.from_url(
+            settings.WATCHLIST_REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5,
+        )
+    return _client
+
+
+def _mirror():
+    """
+    Client holding a complete copy of the watch sets, or None to answer
+    from the database
+    """
+    client = get_client()
+    if client is None:
+        return None
+    try:
+        if is_ready(client):
+            return client
+    except redis.RedisError:
+        logger.warning("Watchlist mirror unavailable, using the database", exc_info=True)
+    return None
+
+
+def is_ready(client=None):
+    """Whether Redis holds a complete copy of the watch sets"""
+    client = client or get_client()
+    return client is not None and bool(client.exists(READY_KEY))
+
+
+def rebuild(client=None):
+    """
+    Reload the watch sets from AuctionWatch
+
+    Returns:
+        bool - False if the mirror is disabled, another process is already
+        rebuilding it or the rebuild outlasted its journal
+    """
+    client = client or get_client()
+    if client is None:
+        return False
+
+    lock = client.lock(REBUILD_LOCK_KEY, timeout=REBUILD_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return False
+    try:
+        redis_journal.start(client, JOURNAL_KEY, REBUILD_TIMEOUT)
+        client.delete(READY_KEY)
+        for pattern in (_auction_key("*"), _user_key("*")):
+            keys = list(client.scan_iter(match=pattern, count=1000))
+            for start in range(0, len(keys), 1000):
+                client.delete(*keys[start : start + 1000])
+
+        pipeline = client.pipeline(transaction=False)
+        rows = AuctionWatch.objects.values_list("user_id", "auction_id").iterator(
+            chunk_size=REBUILD_BATCH_SIZE
+        )
+        for count, (user_id, auction_id) in enumerate(rows, start=1):
+            pipeline.sadd(_auction_key(auction_id), str(user_id))
+            pipeline.sadd(_user_key(user_id), str(auction_id))
+            if count % REBUILD_BATCH_SIZE == 0:
+                pipeline.execute()
+        pipeline.execute()
+        return redis_journal.replay(
+            client,
+            JOURNAL_KEY,
+            partial(_replay, client),
+            lambda pipeline: pipeline.set(READY_KEY, 1),
+        )
+    finally:
+        lock.release()
+
+
+def _apply(pipeline, command, user_id, auction_id):
+    getattr(pipeline, command)(_auction_key(auction_id), str(user_id))
+    getattr(pipeline, command)(_user_key(user_id), str(auction_id))
+
+
+def _replay(client, changes):
+    pipeline = client.pipeline(transaction=False)
+    for command, user_id, auction_id in changes:
+        _apply(pipeline, command, user_id, auction_id)
+    pipeline.execute()
+
+
+def add(user_id, auction_id):
+    """Write a new watch through to the mirror"""
+    _write(user_id, auction_id, "sadd")
+
+
+def remove(user_id, auction_id):
+    """Write a removed watch through to the mirror"""
+    _write(user_id, auction_id, "srem")
+
+
+def _write(user_id, auction_id, command):
+    client = get_client()
+    if client is None:
+        return
+    try:
+        # Applied even to an incomplete copy, which nothing reads and the
+        # next rebuild clears; journaled for a rebuild in progress
+        pipeline = client.pipeline()
+        _apply(pipeline, command, user_id, auction_id)
+        redis_journal.record(
+            pipeline, JOURNAL_KEY, [command, str(user_id), str(auction_id)]
+        )
+        pipeline.execute()
+    except redis.RedisError:
+        logger.warning("Watchlist write-through failed", exc_info=True)
+        try:
+            client.delete(READY_KEY)
+        except redis.RedisError:
+            pass
+
+
+def _read_failed():
+    logger.warning("Watchlist mirror read failed, using the database", exc_info=True)
+
+
+def is_watching(user_id, auction_id):
+    client = _mirror()
+    if client is not None:
+        try:
+            return bool(client.sismember(_user_key(user_id), str(auction_id)))
+        except redis.RedisError:
+            _read_failed()
+    return AuctionWatch.objects.filter(user_id=user_id, auction_id=auction_id).exists()
+
+
+def watched_ids(user_id, auction_ids=None):
+    """
+    IDs of the auctions a user watches, limited to ``auction_ids`` if given
+
+    Returns:
+        set of auction UUIDs
+    """
+    if auction_ids is not None:
+        auction_ids = list(auction_ids)
+        if not auction_ids:
+            return set()
+
+    client = _mirror()
+    if client is not None:
+        try:
+            if auction_ids is None:
+                members = client.smembers(_user_key(user_id))
+                return {uuid.UUID(auction_id) for auction_id in members}
+            flags = client.smismember(_user_key(user_id), [str(a) for a in auction_ids])
+            return {auction_id for auction_id, flag in zip(auction_ids, flags) if flag}
+        except redis.RedisError:
+            _read_failed()
+
+    watches = AuctionWatch.objects.filter(user_id=user_id)
+    if auction_ids is not None:
+        watches = watches.filter(auction_id__in=auction_ids)
+    return set(watches.values_list("auction_id", flat=True))
+
+
+def watcher_count(auction_id):
+    client = _mirror()
+    if client is not None:
+        try:
+            return client.scard(_auction_key(auction_id))
+        except redis.RedisError:
+            _read_failed()
+    return AuctionWatch.objects.filter(auction_id=auction_id).count()
+
+
+def watcher_ids(auction_id):
+    """
+    IDs of the users watching an auction
+
+    Returns:
+        list of user UUIDs
+    """
+    client = _mirror()
+    if client is not None:
+        try:
+            members = client.smembers(_auction_key(auction_id))
+            return [uuid.UUID(user_id) for user_id in members]
+        except redis.RedisError:
+            _read_failed()
+    return list(
+        AuctionWatch.objects.filter(auction_id=auction_id).values_list(
+            "user_id", flat=True
+        )
+    )
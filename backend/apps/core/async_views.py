@@ -0,0 +1,116 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.urls import resolve
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from apps.core.renderers import dumps
+
+
+class AsyncAuthError(Exception):
+    """Raised when a request carries a bearer token that cannot be used"""
+
+    def __init__(self, exc):
+        super().__init__(str(exc))
+        self.detail = exc.detail
+        self.status_code = exc.status_code
+
+
+async def aauthenticate(request):
+    """
+    Resolve the JWT user for an async view
+
+    Mirrors JWTAuthentication: no Authorization header means an anonymous
+    user, a bad token raises AsyncAuthError.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is None:
+        return AnonymousUser()
+
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return AnonymousUser()
+
+    try:
+        validated_token = authenticator.get_validated_token(raw_token)
+        return await sync_to_async(authenticator.get_user)(validated_token)
+    except (InvalidToken, AuthenticationFailed) as exc:
+        raise AsyncAuthError(exc)
+
+
+def async_api_response(
+    data=None, message="", success=True, status=200, errors=None, raw=False
+):
+    """
+    JSON response for async views in the same format as api_response
+
+    Args:
+        raw: return data without the success/message envelope, for endpoints
+             whose sync counterpart does the same
+    """
+    if raw:
+        payload = data
+    else:
+        payload = {"success": success, "message": message}
+        if data is not None:
+            payload["data"] = data
+        if errors is not None:
+            payload["errors"] = errors
+
+    return HttpResponse(dumps(payload), status=status, content_type="application/json")
+
+
+def _auth_error(request, detail, status):
+    """The response DRF's exception handler gives the sync views"""
+    response = async_api_response(
+        data=detail if isinstance(detail, (dict, list)) else {"detail": detail},
+        status=status,
+        raw=True,
+    )
+    if status == 401:
+        response["WWW-Authenticate"] = JWTAuthentication().authenticate_header(
+            request
+        )
+    return response
+
+
+def async_read_view(auth_required=False):
+    """
+    Wrap an async GET handler so it can take over a URL served by a DRF view
+
+    GET/HEAD requests are authenticated and handled asynchronously. Every
+    other method is dispatched to whatever ROOT_URLCONF (the WSGI URL space)
+    routes the path to, so writes keep going through the existing views.
+    The handler receives the resolved user as ``request.api_user``.
+    """
+
+    def decorator(handler):
+        @csrf_exempt
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+                return await sync_to_async(match.func)(
+                    request, *match.args, **match.kwargs
+                )
+
+            try:
+                request.api_user = await aauthenticate(request)
+            except AsyncAuthError as exc:
+                return _auth_error(request, exc.detail, exc.status_code)
+
+            if auth_required and not request.api_user.is_authenticated:
+                return _auth_error(request, NotAuthenticated.default_detail, 401)
+
+            return await handler(request, *args, **kwargs)
+
+        return view
+
+    return decorator
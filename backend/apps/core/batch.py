@@ -0,0 +1,129 @@
+"""
+Request batching
+
+Runs GET sub-requests against ROOT_URLCONF inside one HTTP request: each
+is resolved and dispatched straight to its view, skipping the middleware
+stack, on the batch request's database connection. The user authenticated
+for the batch is handed to every sub-request (DRF's forced authentication),
+so the token is decoded and the user loaded once per batch, and related
+objects cached on that user instance are shared between sub-requests.
+
+Sub-requests always negotiate JSON; the batch response as a whole uses the
+client's renderer.
+"""
+
+import io
+from urllib.parse import urlsplit
+
+import orjson
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+
+API_PREFIX = "/api/"
+METHODS = ("GET",)
+
+# Request headers describing the batch request itself, not its sub-requests
+_BATCH_ONLY_META = (
+    "CONTENT_LENGTH",
+    "CONTENT_TYPE",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_CONTENT_LENGTH",
+    "HTTP_CONTENT_TYPE",
+)
+
+
+def _error(status, detail):
+    return {"status": status, "headers": {}, "body": {"detail": detail}}
+
+
+def _environ(request, path, query_string, headers):
+    environ = {
+        key: value
+        for key, value in request.META.items()
+        if isinstance(value, str) and key not in _BATCH_ONLY_META
+    }
+    environ.update(
+        {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query_string,
+            "SCRIPT_NAME": request.META.get("SCRIPT_NAME", ""),
+            "wsgi.input": io.BytesIO(b""),
+            "wsgi.url_scheme": request.scheme,
+            "HTTP_ACCEPT": "application/json",
+        }
+    )
+    for name, value in (headers or {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = str(value)
+    return environ
+
+
+def _body(response):
+    if response.streaming:
+        return None
+    content_type = response.get("Content-Type", "")
+    if not response.content:
+        return None
+    if content_type.startswith("application/json"):
+        return orjson.loads(response.content)
+    return response.content.decode(response.charset or "utf-8", errors="replace")
+
+
+def run(request, sub_request):
+    """
+    Execute one sub-request of a batch
+
+    Args:
+        request: the DRF request of the batch
+        sub_request: dict with ``path`` (may include a query string),
+            optional ``method`` (only GET) and ``headers``
+
+    Returns:
+        dict with the sub-response's ``status``, ``headers`` and ``body``
+        (decoded JSON, text, or None)
+    """
+    method = str(sub_request.get("method", "GET")).upper()
+    if method not in METHODS:
+        return _error(405, f"Method {method} is not allowed in a batch")
+
+    url = urlsplit(str(sub_request.get("path", "")))
+    if not url.path.startswith(API_PREFIX):
+        return _error(400, f"Path must start with {API_PREFIX}")
+
+    try:
+        match = resolve(url.path, urlconf=settings.ROOT_URLCONF)
+    except Resolver404:
+        return _error(404, "Not found.")
+    if getattr(match.func, "batch_endpoint", False):
+        return _error(400, "Batches can't be nested")
+
+    sub = WSGIRequest(
+        _environ(request, url.path, url.query, sub_request.get("headers"))
+    )
+    sub.resolver_match = match
+    sub.urlconf = settings.ROOT_URLCONF
+    sub.user = request.user
+    if request.user.is_authenticated:
+        # Picked up by rest_framework.request.Request instead of the
+        # authentication classes
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+    if hasattr(request._request, "session"):
+        sub.session = request._request.session
+
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+        if callable(getattr(response, "render", None)):
+            response = response.render()
+    except Exception as exc:
+        response = response_for_exception(sub, exc)
+
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name.lower() != "content-length"
+    }
+    return {"status": response.status_code, "headers": headers, "body": _body(response)}
@@ -0,0 +1,91 @@
+"""
+Conditional GET for read endpoints
+
+Like django.views.decorators.http.condition, but the ETag and
+Last-Modified come from one validators call, so both can be read in a
+single query, and it runs inside DRF's view wrapper so validators can use
+the authenticated ``request.user``.
+"""
+
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+
+def version_etag(*parts):
+    """Weak ETag from version stamps and representation variants"""
+    return "W/" + quote_etag(".".join(str(part) for part in parts))
+
+
+def conditional(validators, private=False):
+    """
+    Answer GET/HEAD with 304 Not Modified when the request's If-None-Match
+    or If-Modified-Since still match, without running the view
+
+    Args:
+        validators: callable taking the view's arguments and returning
+            (etag, last_modified) for the resource, or None when it doesn't
+            exist (the view then runs and reports it). Awaited when the view
+            is a coroutine.
+        private: the representation depends on the requesting user; it is
+            marked private and varies on Authorization
+    """
+
+    def check(request, result):
+        if request.method not in ("GET", "HEAD") or result is None:
+            return None, None, None
+        etag, last_modified = result
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        return response, etag, last_modified
+
+    def finish(response, etag, last_modified):
+        if etag is None or response.status_code not in (200, 304):
+            return response
+        response.headers.setdefault("ETag", etag)
+        if last_modified and not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(last_modified)
+        # Let clients keep the copy but revalidate it on every use
+        if private:
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Authorization"])
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                result = None
+                if request.method in ("GET", "HEAD"):
+                    result = await validators(request, *args, **kwargs)
+                response, etag, last_modified = check(request, result)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return finish(response, etag, last_modified)
+
+        else:
+
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                result = None
+                if request.method in ("GET", "HEAD"):
+                    result = validators(request, *args, **kwargs)
+                response, etag, last_modified = check(request, result)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return finish(response, etag, last_modified)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,50 @@
+import os
+
+from django.db import connections
+
+
+def pool_stats(alias="default"):
+    """
+    Connection pool metrics for the current worker process
+
+    Every web/Celery worker owns a separate pool, so the numbers describe
+    the process that serves the request (identified by worker_pid).
+
+    Returns:
+        dict with pool sizing, wait time and saturation, or None if pooling
+        is disabled for the alias
+    """
+    pool = connections[alias].pool
+    if pool is None:
+        return None
+
+    # get_stats() only reports counters that are non-zero
+    stats = pool.get_stats()
+    pool_max = stats.get("pool_max", pool.max_size)
+    pool_size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    in_use = pool_size - available
+    requests_num = stats.get("requests_num", 0)
+    requests_queued = stats.get("requests_queued", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+
+    return {
+        "worker_pid": os.getpid(),
+        "pool_name": pool.name,
+        "pool_min": stats.get("pool_min", pool.min_size),
+        "pool_max": pool_max,
+        "pool_size": pool_size,
+        "in_use": in_use,
+        "available": available,
+        "saturation": round(in_use / pool_max, 3) if pool_max else 0,
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests_total": requests_num,
+        "requests_queued": requests_queued,
+        "requests_errors": stats.get("requests_errors", 0),
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": round(wait_ms / requests_queued, 2) if requests_queued else 0,
+        "connections_opened": stats.get("connections_num", 0),
+        "connections_errors": stats.get("connections_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+        "returns_bad": stats.get("returns_bad", 0),
+    }
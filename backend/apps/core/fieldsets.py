@@ -0,0 +1,110 @@
+"""
+Sparse fieldsets
+
+Clients choose the fields a read endpoint renders with ``?fields=a,b``
+(only these) and/or ``?exclude=c`` (all but these). SparseFieldsMixin
+drops the other fields from a serializer; views pass requested_fields() to
+their query builders so fields nobody asked for cost no joins, prefetches
+or per-row queries. Unknown names are ignored. Only top-level fields can be
+selected: a nested object is rendered whole or not at all.
+"""
+
+from functools import cache
+
+from drf_yasg import openapi
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+def _names(value):
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+@cache
+def readable_fields(serializer_class):
+    """Names of the fields a serializer class renders, in order"""
+    fields = serializer_class().fields
+    return tuple(name for name, field in fields.items() if not field.write_only)
+
+
+def select_fields(params, available):
+    """
+    The names in ``available`` selected by the ``fields`` and ``exclude``
+    query params
+
+    Args:
+        params: request.query_params or request.GET
+        available: field names in rendering order
+
+    Returns:
+        tuple in the order of ``available``
+    """
+    selected = tuple(available)
+    if params.get(FIELDS_PARAM):
+        wanted = _names(params[FIELDS_PARAM])
+        selected = tuple(name for name in selected if name in wanted)
+    if params.get(EXCLUDE_PARAM):
+        unwanted = _names(params[EXCLUDE_PARAM])
+        selected = tuple(name for name in selected if name not in unwanted)
+    return selected
+
+
+def requested_fields(params, serializer_class):
+    """select_fields() over a serializer class's readable fields"""
+    return select_fields(params, readable_fields(serializer_class))
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin rendering only the fields selected by the request's
+    query params, or by a ``fields`` context entry (for views without a DRF
+    request). Write-only fields are kept so the serializer still validates
+    input.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        # Nested serializers share the root's context but aren't trimmed
+        parent = self.parent
+        if parent is not None and not (
+            isinstance(parent, ListSerializer) and parent.parent is None
+        ):
+            return fields
+
+        selected = self.context.get("fields")
+        if selected is None:
+            # DRF's Request or a plain HttpRequest
+            request = self.context.get("request")
+            params = getattr(request, "query_params", getattr(request, "GET", None))
+            if params is None:
+                return fields
+            readable = [name for name, field in fields.items() if not field.write_only]
+            selected = select_fields(params, readable)
+
+        selected = set(selected)
+        for name in list(fields):
+            if name not in selected and not fields[name].write_only:
+                del fields[name]
+        return fields
+
+
+def fieldset_parameters(serializer_class):
+    """Swagger query parameters for an endpoint rendering ``serializer_class``"""
+    names = ", ".join(readable_fields(serializer_class))
+    return [
+        openapi.Parameter(
+            FIELDS_PARAM,
+            openapi.IN_QUERY,
+            description=f"Comma-separated fields to return, from: {names}",
+            type=openapi.TYPE_STRING,
+        ),
+        openapi.Parameter(
+            EXCLUDE_PARAM,
+            openapi.IN_QUERY,
+            description="Comma-separated fields to leave out",
+            type=openapi.TYPE_STRING,
+        ),
+    ]
@@ -0,0 +1,64 @@
+"""
+Image derivative generation
+
+Pure Pillow code with no Django imports, so it can run in a spawned
+process pool without setting Django up in every worker.
+"""
+
+import hashlib
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+CONTENT_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def supported_formats(formats):
+    """The formats this Pillow build can encode, in the given order"""
+    Image.init()
+    return [fmt for fmt in formats if fmt.upper() in Image.SAVE]
+
+
+def render_derivatives(data, widths, formats, quality):
+    """
+    Decode an image and encode it at each width (never upscaling) in each
+    format
+
+    Raises:
+        ValueError: if ``data`` is not an image Pillow can read
+
+    Returns:
+        dict with the source ``width`` and ``height`` and a list of
+        ``derivatives`` as (format, width, height, bytes)
+    """
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ValueError(f"Unreadable image: {exc}") from exc
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    source_width, source_height = image.size
+    targets = sorted({min(width, source_width) for width in widths})
+
+    derivatives = []
+    # Downscale from the previous (larger) size, which is much cheaper than
+    # resampling the full-size source for every width
+    current = image
+    for width in reversed(targets):
+        height = max(1, round(source_height * width / source_width))
+        if current.size != (width, height):
+            current = current.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            buffer = BytesIO()
+            current.save(buffer, format=fmt.upper(), quality=quality)
+            derivatives.append((fmt, width, height, buffer.getvalue()))
+
+    return {"width": source_width, "height": source_height, "derivatives": derivatives}
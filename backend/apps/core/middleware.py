@@ -0,0 +1,32 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators import sync_and_async_middleware
+
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    """
+    Route requests served over ASGI through ASGI_ROOT_URLCONF
+
+    That URLconf puts the async read views in front of the regular URL
+    patterns, so both servers expose the same URL space.
+    """
+
+    def route(request):
+        if isinstance(request, ASGIRequest):
+            request.urlconf = settings.ASGI_ROOT_URLCONF
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            route(request)
+            return await get_response(request)
+
+    else:
+
+        def middleware(request):
+            route(request)
+            return get_response(request)
+
+    return middleware
@@ -11,10 +11,7 @@ class ApiResponseMixin:
         if getattr(response, "accepted_renderer", None) and not getattr(
             response, "_is_rendered", False
         ):
-            if (
-                response.accepted_renderer.format == "api"
-                or response.accepted_renderer.format == "json"
-            ):
+            if response.accepted_renderer.format in ("api", "json", "msgpack"):
                 if isinstance(response.data, dict) and "success" in response.data:
                     return response
 
@@ -0,0 +1,263 @@
+"""
+Monthly range partitioning for the append-heavy tables
+
+Each table is partitioned on its creation timestamp into ``<table>_pYYYYMM``
+partitions plus a ``<table>_default`` partition that catches rows no
+monthly partition covers yet, so inserts never fail if maintenance lapses.
+maintain_partitions() pre-creates upcoming months and detaches months past
+their retention into PARTITION_ARCHIVE_SCHEMA.
+
+Postgres requires the partition key in every unique constraint, so the
+primary key of a partitioned table is (id, <timestamp>). Indexes on these
+tables can no longer be built CONCURRENTLY on the parent.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection as default_connection
+from django.db import transaction
+from django.utils import timezone
+
+# table -> partition key column
+PARTITIONED_TABLES = {
+    "auctions_bid": "timestamp",
+    "notifications_notification": "created_at",
+    "transactions_transactionlog": "timestamp",
+}
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def _table_definition(cursor, table):
+    """Indexes, foreign keys, triggers and primary key name of a table"""
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+        [table],
+    )
+    pk_name = cursor.fetchone()[0]
+
+    cursor.execute(
+        """
+        SELECT i.indexname, i.indexdef FROM pg_indexes i
+        WHERE i.schemaname = current_schema() AND i.tablename = %s
+          AND i.indexname <> %s
+        """,
+        [table, pk_name],
+    )
+    indexes = cursor.fetchall()
+
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f' AND conparentid = 0
+        """,
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+
+    cursor.execute(
+        """
+        SELECT pg_get_triggerdef(oid) FROM pg_trigger
+        WHERE tgrelid = %s::regclass AND NOT tgisinternal AND tgparentid = 0
+        """,
+        [table],
+    )
+    triggers = [row[0] for row in cursor.fetchall()]
+
+    return pk_name, indexes, foreign_keys, triggers
+
+
+def _rebuild(cursor, table, column):
+    """
+    Recreate ``table`` with the same columns, indexes, foreign keys and
+    triggers, copying its rows across
+
+    With a ``column`` the new table is partitioned by month on it, without
+    one it is a plain table again.
+    """
+    pk_name, indexes, foreign_keys, triggers = _table_definition(cursor, table)
+    old = f"{table}_old"
+
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    cursor.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{pk_name}" TO "{pk_name[:59]}_old"')
+    for name, _ in indexes:
+        cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:59]}_old"')
+
+    if column:
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ("{column}")'
+        )
+        cursor.execute(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{pk_name}" PRIMARY KEY (id, "{column}")'
+        )
+        cursor.execute(f'SELECT min("{column}") FROM "{old}"')
+        oldest = cursor.fetchone()[0] or timezone.now()
+        cursor.execute(
+            f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT'
+        )
+        create_partitions(table, since=oldest, cursor=cursor)
+    else:
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{pk_name}" PRIMARY KEY (id)')
+
+    for _, definition in indexes:
+        cursor.execute(definition)
+
+    # Copy before recreating the triggers so bid side effects don't fire again
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+    cursor.execute(f'DROP TABLE "{old}" CASCADE')
+    for definition in triggers:
+        cursor.execute(definition)
+
+
+def partition_table(schema_editor, table):
+    """Convert a plain table into monthly partitions (migration helper)"""
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild(cursor, table, PARTITIONED_TABLES[table])
+
+
+def unpartition_table(schema_editor, table):
+    """Turn a partitioned table back into a plain one (migration helper)"""
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild(cursor, table, None)
+
+
+def _attached_months(cursor, table):
+    cursor.execute(
+        """
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        """,
+        [table],
+    )
+    prefix = f"{table}_p"
+    months = {}
+    for (name,) in cursor.fetchall():
+        if name.startswith(prefix):
+            suffix = name[len(prefix):]
+            months[datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=dt_timezone.utc)] = name
+    return months
+
+
+def create_partitions(table, since=None, months_ahead=None, cursor=None):
+    """
+    Make sure monthly partitions exist from ``since`` (default: this month)
+    through ``months_ahead`` months from now
+
+    Rows already sitting in the default partition for a new month are moved
+    into it.
+
+    Returns:
+        list of created partition names
+    """
+    if cursor is None:
+        with transaction.atomic(), default_connection.cursor() as cursor:
+            return create_partitions(table, since, months_ahead, cursor)
+
+    column = PARTITIONED_TABLES[table]
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_PREMAKE_MONTHS
+    now = timezone.now()
+    month = month_start(since or now)
+    last = add_months(month_start(now), months_ahead)
+    existing = _attached_months(cursor, table)
+
+    created = []
+    while month <= last:
+        if month not in existing:
+            _create_partition(cursor, table, column, month)
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return created
+
+
+def _create_partition(cursor, table, column, month):
+    name = partition_name(table, month)
+    bounds = [month, add_months(month, 1)]
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM "{table}_default" '
+        f'WHERE "{column}" >= %s AND "{column}" < %s)',
+        bounds,
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+            bounds,
+        )
+        return
+
+    # Attaching validates that the default partition has no rows in range,
+    # so move them into the new table first
+    cursor.execute(
+        f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{table}_default" '
+        f'WHERE "{column}" >= %s AND "{column}" < %s RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        bounds,
+    )
+    cursor.execute(
+        f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+        bounds,
+    )
+
+
+def archive_partitions(table, retain_months, cursor=None):
+    """
+    Detach monthly partitions that ended more than ``retain_months`` ago
+    and move them to PARTITION_ARCHIVE_SCHEMA, where they can be dumped or
+    dropped without touching the live table
+
+    Returns:
+        list of archived partition names
+    """
+    if cursor is None:
+        with transaction.atomic(), default_connection.cursor() as cursor:
+            return archive_partitions(table, retain_months, cursor)
+
+    cutoff = add_months(month_start(timezone.now()), -retain_months)
+    schema = settings.PARTITION_ARCHIVE_SCHEMA
+    archived = []
+    for month, name in sorted(_attached_months(cursor, table).items()):
+        if month >= cutoff:
+            break
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+        cursor.execute(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"')
+        archived.append(name)
+    return archived
+
+
+def maintain_partitions():
+    """
+    Pre-create upcoming partitions for every partitioned table and archive
+    those past their retention (PARTITION_RETENTION_MONTHS, 0 keeps all)
+    """
+    report = {}
+    for table in PARTITIONED_TABLES:
+        retain_months = settings.PARTITION_RETENTION_MONTHS.get(table, 0)
+        report[table] = {
+            "created": create_partitions(table),
+            "archived": archive_partitions(table, retain_months) if retain_months else [],
+        }
+    return report
@@ -0,0 +1,66 @@
+"""
+Changes made to a Redis copy of database rows while it is rebuilt
+
+A rebuild loads a snapshot of the rows, so a change written through after
+the snapshot was taken would be overwritten or missed. While a rebuild
+runs, its journal (a Redis list) is open. Write-throughs append their
+change to it as well, and the rebuild replays the changes over its
+snapshot before declaring the copy complete.
+
+Writers append with RPUSHX, which does nothing while no journal is open,
+so they need no check of their own. ``replay`` finishes the rebuild in
+the same MULTI that closes the journal, under WATCH, so a change appended
+after the last replay makes it replay again instead of being dropped.
+"""
+
+import orjson
+import redis
+
+_START = "start"
+
+
+def start(client, key, timeout):
+    """
+    Open a journal, before the rebuild takes its snapshot
+
+    It expires after ``timeout`` seconds, the longest a rebuild may take.
+    """
+    pipeline = client.pipeline()
+    pipeline.delete(key)
+    pipeline.rpush(key, _START)
+    pipeline.expire(key, timeout)
+    pipeline.execute()
+
+
+def record(client, key, change):
+    """Append a change (JSON-serializable) if a journal is open"""
+    client.rpushx(key, orjson.dumps(change))
+
+
+def replay(client, key, apply, finish):
+    """
+    Pass the journaled changes to ``apply`` until there are no more, then
+    queue the commands completing the rebuild with ``finish(pipeline)`` and
+    close the journal at once
+
+    Returns:
+        bool - False if the journal expired, so changes may have been lost
+    """
+    replayed = 1
+    while True:
+        with client.pipeline() as pipeline:
+            try:
+                pipeline.watch(key)
+                if not pipeline.exists(key):
+                    return False
+                changes = pipeline.lrange(key, replayed, -1)
+                if not changes:
+                    pipeline.multi()
+                    finish(pipeline)
+                    pipeline.delete(key)
+                    pipeline.execute()
+                    return True
+            except redis.WatchError:
+                continue
+        apply([orjson.loads(change) for change in changes])
+        replayed += len(changes)
@@ -0,0 +1,145 @@
+"""
+Batched purges for data with a retention period
+
+Rows are deleted in small batches, keyset-ordered on the primary key, each
+batch in its own transaction and followed by a short pause. Locks are held
+only for one batch and replicas can keep up. The last deleted key is
+checkpointed in the cache, so an interrupted purge resumes where it
+stopped. The checkpoint survives restarts when CACHES uses a shared
+backend.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _checkpoint_key(name):
+    return f"retention:checkpoint:{name}"
+
+
+def purge(queryset, batch_size=None, pause=None, checkpoint=None, time_limit=None):
+    """
+    Delete every row matched by ``queryset`` in keyset-ordered batches
+
+    Each batch re-applies the queryset filter, so rows that stopped matching
+    since they were selected are kept. Deletes go through the ORM, so
+    cascades and delete signals still run.
+
+    Args:
+        batch_size: rows per batch (default RETENTION_BATCH_SIZE)
+        pause: seconds to sleep between batches (default RETENTION_BATCH_PAUSE)
+        checkpoint: name to checkpoint progress under, for resumable purges
+        time_limit: stop after this many seconds, leaving the rest
+
+    Returns:
+        dict with the number of ``deleted`` rows (not counting cascades),
+        ``batches`` and whether the purge is ``complete``
+    """
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    pause = settings.RETENTION_BATCH_PAUSE if pause is None else pause
+    deadline = time.monotonic() + time_limit if time_limit else None
+
+    last_pk = cache.get(_checkpoint_key(checkpoint)) if checkpoint else None
+    deleted = batches = 0
+    complete = False
+
+    while True:
+        keys = queryset.order_by("pk")
+        if last_pk is not None:
+            keys = keys.filter(pk__gt=last_pk)
+        batch = list(keys.values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            complete = True
+            break
+
+        with transaction.atomic():
+            _, per_model = queryset.filter(pk__in=batch).delete()
+        deleted += per_model.get(queryset.model._meta.label, 0)
+        batches += 1
+        last_pk = batch[-1]
+
+        if checkpoint:
+            cache.set(_checkpoint_key(checkpoint), last_pk, None)
+            logger.info(
+                "retention %s: batch %d, %d rows deleted", checkpoint, batches, deleted
+            )
+
+        if len(batch) < batch_size:
+            complete = True
+            break
+        if deadline and time.monotonic() >= deadline:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if checkpoint and complete:
+        cache.delete(_checkpoint_key(checkpoint))
+
+    return {"deleted": deleted, "batches": batches, "complete": complete}
+
+
+def _stale_drafts(cutoff):
+    from apps.auctions.models import Auction
+
+    return Auction.objects.filter(status=Auction.STATUS_DRAFT, created_at__lt=cutoff)
+
+
+def _read_notifications(cutoff):
+    from apps.notifications.models import Notification
+
+    return Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+
+def _expired_tokens(cutoff):
+    # BlacklistedToken rows cascade with their OutstandingToken
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+    return OutstandingToken.objects.filter(expires_at__lt=cutoff)
+
+
+def _admin_log(cutoff):
+    from django.contrib.admin.models import LogEntry
+
+    return LogEntry.objects.filter(action_time__lt=cutoff)
+
+
+def _reminder_ledger(cutoff):
+    from apps.auctions.models import AuctionReminder
+
+    return AuctionReminder.objects.filter(auction__end_time__lt=cutoff)
+
+
+# policy name -> function building the queryset of rows older than a cutoff.
+# Retention in days comes from RETENTION_DAYS; transaction logs are handled
+# by archiving whole partitions (apps/core/partitioning.py).
+RETENTION_POLICIES = {
+    "stale_drafts": _stale_drafts,
+    "read_notifications": _read_notifications,
+    "expired_tokens": _expired_tokens,
+    "admin_log": _admin_log,
+    "reminder_ledger": _reminder_ledger,
+}
+
+
+def apply_policy(name, time_limit=None):
+    """Purge the rows that are past retention for one policy"""
+    days = settings.RETENTION_DAYS[name]
+    queryset = RETENTION_POLICIES[name](timezone.now() - timedelta(days=days))
+    return purge(queryset, checkpoint=name, time_limit=time_limit)
+
+
+def apply_policies(time_limit=None):
+    """Run every retention policy whose retention is configured (> 0 days)"""
+    return {
+        name: apply_policy(name, time_limit=time_limit)
+        for name in RETENTION_POLICIES
+        if settings.RETENTION_DAYS.get(name)
+    }
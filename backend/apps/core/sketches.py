@@ -0,0 +1,227 @@
+"""
+Mergeable approximate-statistics sketches
+
+Plain Python with no Django imports. Each sketch has a fixed size (or, for
+the t-digest, a bounded one) whatever it has counted, and two sketches of
+the same kind merge into the sketch of the union of their inputs, so
+per-day sketches roll up into any date range.
+
+- HyperLogLog: distinct count, about 1.6% standard error
+- TDigest: quantiles, most accurate near the tails
+- CountMin: occurrence counts, never under the true count, with the most
+  frequent keys kept alongside
+"""
+
+import hashlib
+import math
+
+
+def _hash(value, size):
+    return hashlib.blake2b(str(value).encode(), digest_size=size).digest()
+
+
+class HyperLogLog:
+    """Distinct count of values, in 2**PRECISION one-byte registers"""
+
+    PRECISION = 12
+
+    def __init__(self, registers=b""):
+        size = 1 << self.PRECISION
+        self.registers = bytearray(registers) if registers else bytearray(size)
+        if len(self.registers) != size:
+            raise ValueError(f"HyperLogLog needs {size} registers")
+
+    def add(self, value):
+        hashed = int.from_bytes(_hash(value, 8), "big")
+        bits = 64 - self.PRECISION
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # linear counting, more accurate for small counts
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+
+class TDigest:
+    """
+    Quantiles of a stream of numbers (merging t-digest, k1 scale function)
+
+    Values are clustered into at most about COMPRESSION centroids, small
+    near the extremes and large around the median; the minimum and maximum
+    are kept exactly.
+    """
+
+    COMPRESSION = 100
+    BUFFER_SIZE = 500
+
+    def __init__(self, centroids=(), minimum=None, maximum=None):
+        self.centroids = [list(centroid) for centroid in centroids]
+        self.min = minimum
+        self.max = maximum
+        self._buffer = []
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get("centroids", ()), data.get("min"), data.get("max"))
+
+    def to_dict(self):
+        self._compress()
+        if not self.centroids:
+            return {}
+        return {"centroids": self.centroids, "min": self.min, "max": self.max}
+
+    @property
+    def count(self):
+        return sum(weight for _, weight in self.centroids + self._buffer)
+
+    def add(self, value, weight=1):
+        value = float(value)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._buffer.append([value, weight])
+        if len(self._buffer) >= self.BUFFER_SIZE:
+            self._compress()
+
+    def merge(self, other):
+        other._compress()
+        if not other.centroids:
+            return self
+        self._buffer.extend(list(centroid) for centroid in other.centroids)
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _k(self, q):
+        return self.COMPRESSION / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k):
+        return (math.sin(k * 2 * math.pi / self.COMPRESSION) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+
+        merged = [points[0]]
+        before = 0
+        limit = self._q(self._k(0) + 1) * total
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            if before + current[1] + weight <= limit:
+                current[1] += weight
+                current[0] += (mean - current[0]) * weight / current[1]
+            else:
+                before += current[1]
+                limit = self._q(min(self._k(before / total) + 1, self._k(1))) * total
+                merged.append([mean, weight])
+        self.centroids = merged
+
+    def quantile(self, q):
+        """The value at quantile ``q`` (0 to 1), or None if empty"""
+        self._compress()
+        if not self.centroids:
+            return None
+        total = sum(weight for _, weight in self.centroids)
+        target = q * total
+
+        # interpolate between the centroid centers, from the exact minimum
+        # to the exact maximum
+        previous_position, previous_value = 0.0, self.min
+        position = 0.0
+        for mean, weight in self.centroids:
+            center = position + weight / 2
+            if target < center:
+                span = center - previous_position
+                fraction = (target - previous_position) / span if span else 0
+                return previous_value + fraction * (mean - previous_value)
+            previous_position, previous_value = center, mean
+            position += weight
+        span = total - previous_position
+        fraction = (target - previous_position) / span if span else 1
+        return previous_value + min(fraction, 1) * (self.max - previous_value)
+
+
+class CountMin:
+    """
+    Approximate count of each key, over at most WIDTH * DEPTH counters, with
+    the TOP keys counted most often
+
+    Counts are over by at most 2 / WIDTH of the total with probability
+    1 - 2**-DEPTH.
+    """
+
+    WIDTH = 256
+    DEPTH = 4
+    TOP = 10
+
+    def __init__(self, counts=None, top=None):
+        self.counts = counts or [[0] * self.WIDTH for _ in range(self.DEPTH)]
+        self.top = dict(top or {})
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get("counts"), data.get("top"))
+
+    def to_dict(self):
+        if not self.top:
+            return {}
+        return {"counts": self.counts, "top": self.top}
+
+    def _cells(self, key):
+        digest = _hash(key, 4 * self.DEPTH)
+        return [
+            (row, int.from_bytes(digest[4 * row : 4 * row + 4], "big") % self.WIDTH)
+            for row in range(self.DEPTH)
+        ]
+
+    def estimate(self, key):
+        return min(self.counts[row][column] for row, column in self._cells(key))
+
+    def add(self, key, count=1):
+        key = str(key)
+        for row, column in self._cells(key):
+            self.counts[row][column] += count
+        self._keep(key, self.estimate(key))
+
+    def merge(self, other):
+        self.counts = [
+            [a + b for a, b in zip(mine, theirs)]
+            for mine, theirs in zip(self.counts, other.counts)
+        ]
+        for key in set(self.top) | set(other.top):
+            self.top[key] = self.estimate(key)
+        self._trim()
+        return self
+
+    def _keep(self, key, estimate):
+        self.top[key] = estimate
+        self._trim()
+
+    def _trim(self):
+        if len(self.top) > self.TOP:
+            self.top = dict(self.most_common())
+
+    def most_common(self, n=None):
+        """The keys counted most often, with their estimates"""
+        ranked = sorted(self.top.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[: self.TOP if n is None else n]
@@ -23,6 +23,7 @@ swagger_tags = [
         "name": "Notification Preferences",
         "description": "User notification preferences",
     },
+    {"name": "System", "description": "Request batching"},
 ]
 
 
@@ -0,0 +1,21 @@
+from celery import shared_task
+
+from apps.core.partitioning import maintain_partitions
+from apps.core.retention import apply_policies
+
+
+@shared_task
+def maintain_table_partitions():
+    """
+    Daily task creating upcoming monthly partitions and archiving the ones
+    past their retention
+    """
+    return maintain_partitions()
+
+
+@shared_task
+def apply_retention_policies():
+    """
+    Daily task purging rows past their retention in small batches
+    """
+    return apply_policies()
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import db_pool_stats
+
+urlpatterns = [
+    path("admin/db-pool/", db_pool_stats, name="admin-db-pool-stats"),
+]
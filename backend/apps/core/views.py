@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.views.static import serve
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+
+from apps.accounts.permissions import IsAdmin
+from apps.core import batch
+from apps.core.db import pool_stats
+from apps.core.responses import api_response
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+@swagger_auto_schema(
+    operation_id="admin_db_pool_stats",
+    operation_summary="Database pool metrics (Admin)",
+    operation_description="Connection pool wait time and saturation for the worker serving the request",
+    tags=["Admin - System"],
+    responses={200: "Pool metrics", 403: "Permission Denied"},
+)
+def db_pool_stats(request):
+    """Get connection pool metrics for this worker process"""
+    stats = pool_stats()
+    if stats is None:
+        return api_response(data={"pooling": False}, message="Connection pooling is disabled")
+
+    return api_response(
+        data={"pooling": True, "pool": stats},
+        message="Pool metrics retrieved successfully",
+    )
+
+
+def serve_image(request, path):
+    """
+    Serve a stored image derivative from the local "images" storage with
+    IMAGE_CACHE_CONTROL. Derivative keys are content addressed, so they can
+    be cached forever.
+    """
+    response = serve(
+        request, path, document_root=settings.IMAGE_STORAGE_OPTIONS["location"]
+    )
+    response["Cache-Control"] = settings.IMAGE_CACHE_CONTROL
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([permissions.AllowAny])
+@swagger_auto_schema(
+    operation_id="batch_requests",
+    operation_summary="Batch GET requests",
+    operation_description=(
+        "Run up to BATCH_MAX_REQUESTS GET requests to /api/ endpoints in one "
+        "round trip, as the batch's user. Responses come back in request order."
+    ),
+    tags=["System"],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "requests": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "id": openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            description="Echoed in the response (default: index)",
+                        ),
+                        "method": openapi.Schema(type=openapi.TYPE_STRING, enum=["GET"]),
+                        "path": openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            description="e.g. /api/v1/accounts/wallet/?limit=5",
+                        ),
+                        "headers": openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            description="e.g. If-None-Match",
+                        ),
+                    },
+                    required=["path"],
+                ),
+            ),
+        },
+        required=["requests"],
+    ),
+    responses={200: "id, status, headers and body of every sub-request"},
+)
+def batch_requests(request):
+    """Execute a list of GET sub-requests and return their responses"""
+    sub_requests = request.data.get("requests") if isinstance(request.data, dict) else None
+    if not isinstance(sub_requests, list) or not all(
+        isinstance(sub_request, dict) for sub_request in sub_requests
+    ):
+        return api_response(
+            message="requests must be a list of objects",
+            success=False,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(sub_requests) > settings.BATCH_MAX_REQUESTS:
+        return api_response(
+            message=f"At most {settings.BATCH_MAX_REQUESTS} requests per batch",
+            success=False,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    responses = [
+        {"id": sub_request.get("id", index), **batch.run(request, sub_request)}
+        for index, sub_request in enumerate(sub_requests)
+    ]
+    return api_response(data={"responses": responses}, message="Batch executed")
+
+
+batch_requests.batch_endpoint = True
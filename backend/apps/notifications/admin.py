@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification, NotificationPreference
+from .models import Notification, NotificationPreference, NotificationTemplate
 
 
 @admin.register(Notification)
@@ -7,7 +7,7 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = (
         "notification_type",
         "recipient",
-        "title",
+        "rendered_title",
         "is_read",
         "priority",
         "created_at",
@@ -17,12 +17,19 @@ class NotificationAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at",)
     fieldsets = (
         (None, {"fields": ("recipient", "notification_type", "title", "message")}),
+        ("Template", {"fields": ("template", "params")}),
         ("Status", {"fields": ("is_read", "priority")}),
         ("Related Object", {"fields": ("related_object_id", "related_object_type")}),
         ("Timestamps", {"fields": ("created_at",)}),
     )
 
 
+@admin.register(NotificationTemplate)
+class NotificationTemplateAdmin(admin.ModelAdmin):
+    list_display = ("key", "title")
+    search_fields = ("key", "title", "message")
+
+
 @admin.register(NotificationPreference)
 class NotificationPreferenceAdmin(admin.ModelAdmin):
     list_display = (
@@ -1,4 +1,5 @@
-from django.db.models import Count, Q
+from django.conf import settings
+from django.db.models import Count, Q, Sum
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
@@ -7,7 +8,8 @@ from drf_yasg import openapi
 
 from apps.accounts.permissions import IsAdmin
 from apps.accounts.models import User
-from .models import Notification, NotificationPreference
+from apps.core.retention import purge
+from .models import Notification, NotificationCounter, NotificationPreference
 from .serializers import NotificationSerializer, NotificationPreferenceSerializer
 from .services import create_notification
 
@@ -90,7 +92,7 @@ class AdminNotificationViewSet(viewsets.ModelViewSet):
     @swagger_auto_schema(
         operation_id="admin_delete_read_notifications",
         operation_summary="Delete read notifications (Admin)",
-        operation_description="Admin can delete all read notifications",
+        operation_description="Admin can delete all read notifications. Deletes run in batches for a limited time; repeat the request while `complete` is false.",
         tags=["Admin - Notifications"],
         manual_parameters=[
             openapi.Parameter(
@@ -109,15 +111,54 @@ class AdminNotificationViewSet(viewsets.ModelViewSet):
         user_id = request.query_params.get("user_id")
 
         if user_id:
-            Notification.objects.filter(recipient_id=user_id, is_read=True).delete()
+            # No pause between batches, and bounded like system-wide purges
+            result = purge(
+                Notification.objects.filter(recipient_id=user_id, is_read=True),
+                pause=0,
+                time_limit=settings.RETENTION_REQUEST_TIME_LIMIT,
+            )
+            if not result["complete"]:
+                return Response(
+                    {
+                        "message": f"{result['deleted']} read notifications for "
+                        f"user {user_id} deleted, more remain - repeat the "
+                        "request to continue",
+                        "deleted": result["deleted"],
+                        "complete": False,
+                    },
+                    status=status.HTTP_200_OK,
+                )
             return Response(
-                {"message": f"All read notifications for user {user_id} deleted"},
+                {
+                    "message": f"All read notifications for user {user_id} deleted",
+                    "deleted": result["deleted"],
+                    "complete": True,
+                },
                 status=status.HTTP_200_OK,
             )
 
-        Notification.objects.filter(is_read=True).delete()
+        # System-wide purges are batched and bounded in time; whatever is left
+        # is deleted by calling again
+        result = purge(
+            Notification.objects.filter(is_read=True),
+            time_limit=settings.RETENTION_REQUEST_TIME_LIMIT,
+        )
+        if not result["complete"]:
+            return Response(
+                {
+                    "message": f"{result['deleted']} read notifications deleted, "
+                    "more remain - repeat the request to continue",
+                    "deleted": result["deleted"],
+                    "complete": False,
+                },
+                status=status.HTTP_200_OK,
+            )
         return Response(
-            {"message": "All read notifications deleted system-wide"},
+            {
+                "message": "All read notifications deleted system-wide",
+                "deleted": result["deleted"],
+                "complete": True,
+            },
             status=status.HTTP_200_OK,
         )
 
@@ -229,7 +270,9 @@ def admin_send_notification(request):
 def admin_notification_stats(request):
     """Get notification statistics for admin dashboard"""
     total_notifications = Notification.objects.count()
-    unread_notifications = Notification.objects.filter(is_read=False).count()
+    unread_notifications = (
+        NotificationCounter.objects.aggregate(total=Sum("unread_count"))["total"] or 0
+    )
 
     by_type = Notification.objects.values("notification_type").annotate(
         count=Count("id")
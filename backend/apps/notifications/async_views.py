@@ -0,0 +1,36 @@
+from apps.core.async_views import async_api_response, async_read_view
+from apps.core.fieldsets import requested_fields
+from .models import Notification
+from .rendering import aload_templates
+from .serializers import NotificationSerializer
+
+
+@async_read_view(auth_required=True)
+async def notification_list(request):
+    """Async GET for NotificationViewSet.list; other methods go to the viewset"""
+    user = request.api_user
+    params = request.GET
+
+    if user.role == "admin" and "user_id" in params:
+        queryset = Notification.objects.filter(recipient_id=params["user_id"])
+    else:
+        queryset = Notification.objects.filter(recipient=user)
+    fields = requested_fields(params, NotificationSerializer)
+    if "recipient_email" in fields:
+        queryset = queryset.select_related("recipient")
+    queryset = queryset.order_by("-created_at")
+
+    if params.get("unread_only", "false").lower() == "true":
+        queryset = queryset.filter(is_read=False)
+    if params.get("notification_type"):
+        queryset = queryset.filter(notification_type=params["notification_type"])
+
+    notifications = [notification async for notification in queryset]
+    if {"title", "message"} & set(fields):
+        await aload_templates({n.template_id for n in notifications if n.template_id})
+    return async_api_response(
+        data=NotificationSerializer(
+            notifications, many=True, context={"fields": fields}
+        ).data,
+        message="Notifications retrieved successfully",
+    )
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:00
+
+from django.db import migrations
+
+from apps.core.partitioning import partition_table, unpartition_table
+
+
+def partition_notifications(apps, schema_editor):
+    partition_table(schema_editor, "notifications_notification")
+
+
+def unpartition_notifications(apps, schema_editor):
+    unpartition_table(schema_editor, "notifications_notification")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_notificatio_related_e0a5d0_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_notifications, unpartition_notifications),
+    ]
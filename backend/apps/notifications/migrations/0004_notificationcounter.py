@@ -0,0 +1,80 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_partition_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION bump_unread_notification_count(
+                p_user_id UUID, p_delta INTEGER
+            ) RETURNS VOID AS $$
+            BEGIN
+                INSERT INTO notifications_notificationcounter (user_id, unread_count, updated_at)
+                VALUES (p_user_id, GREATEST(p_delta, 0), NOW())
+                ON CONFLICT (user_id) DO UPDATE
+                SET unread_count = GREATEST(
+                        notifications_notificationcounter.unread_count + p_delta, 0
+                    ),
+                    updated_at = NOW();
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION maintain_unread_notification_count()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_read THEN
+                    IF TG_OP = 'DELETE'
+                       OR NEW.is_read
+                       OR NEW.recipient_id <> OLD.recipient_id THEN
+                        PERFORM bump_unread_notification_count(OLD.recipient_id, -1);
+                    END IF;
+                END IF;
+
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_read THEN
+                    IF TG_OP = 'INSERT'
+                       OR OLD.is_read
+                       OR NEW.recipient_id <> OLD.recipient_id THEN
+                        PERFORM bump_unread_notification_count(NEW.recipient_id, 1);
+                    END IF;
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER unread_notification_count_trigger
+            AFTER INSERT OR DELETE OR UPDATE OF is_read, recipient_id
+            ON notifications_notification
+            FOR EACH ROW EXECUTE FUNCTION maintain_unread_notification_count();
+
+            INSERT INTO notifications_notificationcounter (user_id, unread_count, updated_at)
+            SELECT recipient_id, COUNT(*), NOW()
+            FROM notifications_notification
+            WHERE NOT is_read
+            GROUP BY recipient_id;
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS unread_notification_count_trigger ON notifications_notification;
+            DROP FUNCTION IF EXISTS maintain_unread_notification_count();
+            DROP FUNCTION IF EXISTS bump_unread_notification_count(UUID, INTEGER);
+            """,
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:00
+
+import django.db.models.functions.datetime
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notificationcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='event_count',
+            field=models.PositiveIntegerField(db_default=1, default=1),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='last_event_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='latest_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='bid_coalesce_window',
+            field=models.PositiveIntegerField(default=300, help_text='Seconds during which new bids update one notification (0 disables)'),
+        ),
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='outbid_coalesce_window',
+            field=models.PositiveIntegerField(default=300, help_text='Seconds during which outbids update one notification (0 disables)'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'notification_type', 'related_object_id', '-created_at'], name='notification_coalesce_idx'),
+        ),
+        migrations.RunSQL(
+            sql="UPDATE notifications_notification SET last_event_at = created_at",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # Used by the bid triggers; create_notification() does the same in
+        # the ORM. Windows of users without preferences default to 300s
+        # (NotificationPreference.DEFAULT_COALESCE_WINDOW).
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION coalesce_notification(
+                p_recipient_id UUID,
+                p_notification_type TEXT,
+                p_related_object_id UUID,
+                p_message TEXT,
+                p_amount NUMERIC
+            ) RETURNS BOOLEAN AS $$
+            DECLARE
+                coalesce_window INTEGER;
+                target RECORD;
+            BEGIN
+                SELECT CASE p_notification_type
+                           WHEN 'bid' THEN bid_coalesce_window
+                           WHEN 'outbid' THEN outbid_coalesce_window
+                           ELSE 0
+                       END
+                INTO coalesce_window
+                FROM notifications_notificationpreference
+                WHERE user_id = p_recipient_id;
+
+                IF NOT FOUND THEN
+                    coalesce_window := CASE
+                        WHEN p_notification_type IN ('bid', 'outbid') THEN 300
+                        ELSE 0
+                    END;
+                END IF;
+
+                IF coalesce_window = 0 OR p_related_object_id IS NULL THEN
+                    RETURN FALSE;
+                END IF;
+
+                SELECT id, created_at INTO target
+                FROM notifications_notification
+                WHERE recipient_id = p_recipient_id
+                  AND notification_type = p_notification_type
+                  AND related_object_id = p_related_object_id
+                  AND NOT is_read
+                  AND created_at >= NOW() - make_interval(secs => coalesce_window)
+                ORDER BY created_at DESC
+                LIMIT 1
+                FOR UPDATE;
+
+                IF NOT FOUND THEN
+                    RETURN FALSE;
+                END IF;
+
+                UPDATE notifications_notification
+                SET event_count = event_count + 1,
+                    message = p_message,
+                    latest_amount = p_amount,
+                    last_event_at = NOW()
+                WHERE id = target.id AND created_at = target.created_at;
+
+                RETURN TRUE;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            reverse_sql="""
+            DROP FUNCTION IF EXISTS coalesce_notification(UUID, TEXT, UUID, TEXT, NUMERIC);
+            """,
+        ),
+    ]
@@ -0,0 +1,188 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TEMPLATES = {
+    "bid.new": (
+        "New bid on your auction: $auction_title",
+        "A bid of $amount was placed by $bidder_email",
+    ),
+    "auction.outbid": (
+        "You've been outbid on $auction_title",
+        "Your bid of $previous_amount on '$auction_title' has been outbid. "
+        "The new highest bid is $amount by another user.",
+    ),
+    "auction.outbid_by_bid": (
+        "You've been outbid on $auction_title",
+        "Someone placed a higher bid of $amount on '$auction_title'. "
+        "The auction ends on $end_time.",
+    ),
+    "auction.won": (
+        "You won the auction for $auction_title",
+        "Congratulations! You won the auction for '$auction_title' with a bid of $amount. "
+        "Please proceed to checkout to complete your purchase.",
+    ),
+    "auction.ended.sold": (
+        "Your auction for $auction_title has ended",
+        "Your auction for '$auction_title' has ended with a winning bid of $amount. "
+        "The buyer will be notified to complete the payment.",
+    ),
+    "auction.ended.reserve_not_met": (
+        "Your auction for $auction_title has ended",
+        "Your auction for '$auction_title' has ended but the reserve price was not met. "
+        "The highest bid was $amount.",
+    ),
+    "auction.ended.no_bids": (
+        "Your auction for $auction_title has ended",
+        "Your auction for '$auction_title' has ended with no bids.",
+    ),
+    "auction.new": (
+        "New auction: $auction_title",
+        "A new auction '$auction_title' has been listed in a category you follow. "
+        "Starting price: $starting_price.",
+    ),
+    "auction.cancelled": (
+        "Auction cancelled: $auction_title",
+        "The auction '$auction_title' you bid on has been cancelled by the seller or admin. "
+        "No charges have been applied.",
+    ),
+    "auction.ending_soon": (
+        "Auction ending soon: $auction_title",
+        "The auction '$auction_title' you're watching is ending in less than 24 hours.",
+    ),
+    "payment.sent": (
+        "Payment Sent",
+        "Your payment of $amount for '$reference' was processed successfully. "
+        "Transaction ID: $transaction_id",
+    ),
+    "payment.received": (
+        "Payment Received",
+        "You received a payment of $amount for '$reference'. "
+        "Transaction ID: $transaction_id",
+    ),
+}
+
+COALESCE_FUNCTION = """
+CREATE OR REPLACE FUNCTION coalesce_notification(
+    p_recipient_id UUID,
+    p_notification_type TEXT,
+    p_related_object_id UUID,
+    p_message TEXT,
+    p_amount NUMERIC%s
+) RETURNS BOOLEAN AS $$
+DECLARE
+    coalesce_window INTEGER;
+    target RECORD;
+BEGIN
+    SELECT CASE p_notification_type
+               WHEN 'bid' THEN bid_coalesce_window
+               WHEN 'outbid' THEN outbid_coalesce_window
+               ELSE 0
+           END
+    INTO coalesce_window
+    FROM notifications_notificationpreference
+    WHERE user_id = p_recipient_id;
+
+    IF NOT FOUND THEN
+        coalesce_window := CASE
+            WHEN p_notification_type IN ('bid', 'outbid') THEN 300
+            ELSE 0
+        END;
+    END IF;
+
+    IF coalesce_window = 0 OR p_related_object_id IS NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    SELECT id, created_at INTO target
+    FROM notifications_notification
+    WHERE recipient_id = p_recipient_id
+      AND notification_type = p_notification_type
+      AND related_object_id = p_related_object_id
+      AND NOT is_read
+      AND created_at >= NOW() - make_interval(secs => coalesce_window)
+    ORDER BY created_at DESC
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    UPDATE notifications_notification
+    SET event_count = event_count + 1,
+        message = p_message,%s
+        latest_amount = p_amount,
+        last_event_at = NOW()
+    WHERE id = target.id AND created_at = target.created_at;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def create_templates(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.bulk_create(
+        NotificationTemplate(key=key, title=title, message=message)
+        for key, (title, message) in TEMPLATES.items()
+    )
+
+
+def delete_templates(apps, schema_editor):
+    NotificationTemplate = apps.get_model("notifications", "NotificationTemplate")
+    NotificationTemplate.objects.filter(key__in=TEMPLATES).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationTemplate',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='params',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='message',
+            field=models.TextField(blank=True, db_default='', default=''),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='title',
+            field=models.CharField(blank=True, db_default='', default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='notifications.notificationtemplate'),
+        ),
+        migrations.RunPython(create_templates, delete_templates),
+        # coalesce_notification() also replaces the params of template
+        # notifications
+        migrations.RunSQL(
+            sql=[
+                "DROP FUNCTION coalesce_notification(UUID, TEXT, UUID, TEXT, NUMERIC)",
+                COALESCE_FUNCTION
+                % (",\n    p_params JSONB DEFAULT NULL", "\n        params = p_params,"),
+            ],
+            reverse_sql=[
+                "DROP FUNCTION coalesce_notification(UUID, TEXT, UUID, TEXT, NUMERIC, JSONB)",
+                COALESCE_FUNCTION % ("", ""),
+            ],
+        ),
+    ]
@@ -1,9 +1,29 @@
 from django.db import models
+from django.db.models.functions import Now
+from django.utils import timezone
 import uuid
 
 from apps.accounts.models import User
 
 
+class NotificationTemplate(models.Model):
+    """
+    Title and message template shared by many notifications
+
+    Placeholders use string.Template syntax ($name) and are filled from the
+    notification's params when it is read. Templates are cached per process
+    (see rendering.py), so change wording by adding a new key rather than
+    editing a template in use.
+    """
+
+    key = models.CharField(max_length=50, primary_key=True)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+
+    def __str__(self):
+        return self.key
+
+
 class Notification(models.Model):
     """Base model for all notification types"""
 
@@ -44,8 +64,18 @@ class Notification(models.Model):
         User, on_delete=models.CASCADE, related_name="notifications"
     )
     notification_type = models.CharField(max_length=50, choices=NOTIFICATION_TYPES)
-    title = models.CharField(max_length=255)
-    message = models.TextField()
+    # Either stored text, or empty with the text rendered from template and
+    # params on read (rendered_title / rendered_message)
+    title = models.CharField(max_length=255, blank=True, default="", db_default="")
+    message = models.TextField(blank=True, default="", db_default="")
+    template = models.ForeignKey(
+        NotificationTemplate,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    params = models.JSONField(null=True, blank=True)
     related_object_id = models.UUIDField(null=True, blank=True)
     related_object_type = models.CharField(max_length=50, null=True, blank=True)
     is_read = models.BooleanField(default=False)
@@ -53,11 +83,27 @@ class Notification(models.Model):
         max_length=20, choices=PRIORITY_CHOICES, default=PRIORITY_MEDIUM
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bursts of events on the same object are coalesced into one unread
+    # notification (see NotificationPreference.coalesce_window)
+    event_count = models.PositiveIntegerField(default=1, db_default=1)
+    latest_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    last_event_at = models.DateTimeField(default=timezone.now, db_default=Now())
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["recipient", "is_read"]),
+            models.Index(
+                fields=[
+                    "recipient",
+                    "notification_type",
+                    "related_object_id",
+                    "-created_at",
+                ],
+                name="notification_coalesce_idx",
+            ),
             models.Index(fields=["notification_type"]),
             models.Index(
                 fields=["related_object_id", "related_object_type"]
@@ -65,7 +111,42 @@ class Notification(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.notification_type}: {self.title} (to {self.recipient.email})"
+        return f"{self.notification_type}: {self.rendered_title} (to {self.recipient.email})"
+
+    @property
+    def rendered_title(self):
+        from .rendering import render_title
+
+        return render_title(self)
+
+    @property
+    def rendered_message(self):
+        from .rendering import render_message
+
+        return render_message(self)
+
+
+class NotificationCounter(models.Model):
+    """
+    Unread notification count per user
+
+    Maintained by a database trigger on notifications_notification (see
+    migration 0004), so every insert, read-state change and delete is
+    counted whether it comes from the ORM or from another trigger.
+    repair_unread_counts() fixes any drift.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.unread_count} unread notifications for {self.user.email}"
 
 
 class NotificationPreference(models.Model):
@@ -73,6 +154,13 @@ class NotificationPreference(models.Model):
 
     IN_APP = "in_app"
 
+    DEFAULT_COALESCE_WINDOW = 300
+    # notification type -> field holding its coalescing window in seconds
+    COALESCE_WINDOW_FIELDS = {
+        Notification.TYPE_BID: "bid_coalesce_window",
+        Notification.TYPE_OUTBID: "outbid_coalesce_window",
+    }
+
     CHANNEL_CHOICES = [
         (IN_APP, "In-App Notification"),
     ]
@@ -88,10 +176,32 @@ class NotificationPreference(models.Model):
     payment_notifications = models.BooleanField(default=True)
     admin_notifications = models.BooleanField(default=True)
     preferred_channels = models.JSONField(default=list)
+    bid_coalesce_window = models.PositiveIntegerField(
+        default=DEFAULT_COALESCE_WINDOW,
+        help_text="Seconds during which new bids update one notification (0 disables)",
+    )
+    outbid_coalesce_window = models.PositiveIntegerField(
+        default=DEFAULT_COALESCE_WINDOW,
+        help_text="Seconds during which outbids update one notification (0 disables)",
+    )
 
     def __str__(self):
         return f"Notification preferences for {self.user.email}"
 
+    @classmethod
+    def coalesce_window(cls, preferences, notification_type):
+        """
+        Coalescing window in seconds for a notification type, 0 if the type
+        is never coalesced. ``preferences`` may be None for users without
+        saved preferences.
+        """
+        field = cls.COALESCE_WINDOW_FIELDS.get(notification_type)
+        if field is None:
+            return 0
+        if preferences is None:
+            return cls.DEFAULT_COALESCE_WINDOW
+        return getattr(preferences, field)
+
     @property
     def enabled_channels(self):
         """Get list of enabled notification channels"""
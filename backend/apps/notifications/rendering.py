@@ -0,0 +1,74 @@
+"""
+Render-on-read for template notifications
+
+Template notifications store only a template key and a small params dict;
+the title and message are rendered when the notification is read. Every
+template is loaded in one query and kept per process for
+NOTIFICATION_TEMPLATE_CACHE_TTL seconds, so rendering a page of
+notifications costs at most one extra query.
+"""
+
+import time
+from string import Template
+
+from django.conf import settings
+
+# key -> (title, message) compiled templates
+_templates = {}
+_loaded_at = None
+
+
+def _is_fresh(keys):
+    return (
+        _loaded_at is not None
+        and time.monotonic() - _loaded_at < settings.NOTIFICATION_TEMPLATE_CACHE_TTL
+        and all(key in _templates for key in keys)
+    )
+
+
+def _store(templates):
+    global _templates, _loaded_at
+
+    _templates = {
+        template.key: (Template(template.title), Template(template.message))
+        for template in templates
+    }
+    _loaded_at = time.monotonic()
+
+
+def get_template(key):
+    """Compiled (title, message) templates for a key"""
+    if not _is_fresh([key]):
+        from .models import NotificationTemplate
+
+        _store(NotificationTemplate.objects.all())
+    return _templates[key]
+
+
+async def aload_templates(keys):
+    """Load templates from async code so rendering won't query the database"""
+    if not _is_fresh(keys):
+        from .models import NotificationTemplate
+
+        _store([template async for template in NotificationTemplate.objects.all()])
+
+
+def clear_template_cache():
+    global _loaded_at
+
+    _templates.clear()
+    _loaded_at = None
+
+
+def render_title(notification):
+    if notification.template_id is None:
+        return notification.title
+    title, _ = get_template(notification.template_id)
+    return title.safe_substitute(notification.params or {})
+
+
+def render_message(notification):
+    if notification.template_id is None:
+        return notification.message
+    _, message = get_template(notification.template_id)
+    return message.safe_substitute(notification.params or {})
@@ -1,10 +1,14 @@
 from rest_framework import serializers
+
+from apps.core.fieldsets import SparseFieldsMixin
 from .models import Notification, NotificationPreference
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     recipient_email = serializers.EmailField(source="recipient.email", read_only=True)
-    recipient_id = serializers.UUIDField(source="recipient.id", read_only=True)
+    recipient_id = serializers.UUIDField(read_only=True)
+    title = serializers.CharField(source="rendered_title", read_only=True)
+    message = serializers.CharField(source="rendered_message", read_only=True)
 
     class Meta:
         model = Notification
@@ -20,6 +24,9 @@ class NotificationSerializer(serializers.ModelSerializer):
             "is_read",
             "priority",
             "created_at",
+            "event_count",
+            "latest_amount",
+            "last_event_at",
         ]
         read_only_fields = [
             "id",
@@ -32,6 +39,9 @@ class NotificationSerializer(serializers.ModelSerializer):
             "related_object_type",
             "priority",
             "created_at",
+            "event_count",
+            "latest_amount",
+            "last_event_at",
         ]
 
 
@@ -52,5 +62,7 @@ class NotificationPreferenceSerializer(serializers.ModelSerializer):
             "payment_notifications",
             "admin_notifications",
             "preferred_channels",
+            "bid_coalesce_window",
+            "outbid_coalesce_window",
         ]
         read_only_fields = ["id", "user_id", "user_email"]
@@ -1,17 +1,27 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
 from apps.accounts.models import User
-from .models import Notification, NotificationPreference
+from .models import Notification, NotificationCounter, NotificationPreference
 
+NOTIFICATION_BATCH_SIZE = 1000
 
-def create_notification(recipient, notification_type, title, message, **kwargs):
+
+def create_notification(recipient, notification_type, title="", message="", **kwargs):
     """
     Create a notification for a user
 
     Args:
         recipient: User object - the user to send the notification to
         notification_type: str - type of notification
-        title: str - notification title
-        message: str - notification message
-        **kwargs: additional fields for the notification
+        title: str - notification title, unless a template is given
+        message: str - notification message, unless a template is given
+        **kwargs: additional fields for the notification; ``template`` and
+            ``params`` store a NotificationTemplate key and its values
+            instead of the text, ``amount`` is kept as the latest amount of
+            a coalesced notification
 
     Returns:
         Notification object
@@ -19,20 +29,40 @@ def create_notification(recipient, notification_type, title, message, **kwargs):
     priority = kwargs.get("priority", Notification.PRIORITY_MEDIUM)
     related_object_id = kwargs.get("related_object_id")
     related_object_type = kwargs.get("related_object_type")
+    amount = kwargs.get("amount")
+    template = kwargs.get("template")
+    params = kwargs.get("params")
+
+    preferences = NotificationPreference.objects.filter(user=recipient).first()
+
+    notification = None
+    window = NotificationPreference.coalesce_window(preferences, notification_type)
+    if window and related_object_id:
+        notification = _coalesce_notification(
+            recipient,
+            notification_type,
+            related_object_id,
+            window,
+            message,
+            params,
+            amount,
+        )
 
-    notification = Notification.objects.create(
-        recipient=recipient,
-        notification_type=notification_type,
-        title=title,
-        message=message,
-        priority=priority,
-        related_object_id=related_object_id,
-        related_object_type=related_object_type,
-    )
-
-    try:
-        preferences = NotificationPreference.objects.get(user=recipient)
+    if notification is None:
+        notification = Notification.objects.create(
+            recipient=recipient,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            priority=priority,
+            related_object_id=related_object_id,
+            related_object_type=related_object_type,
+            template_id=template,
+            params=params,
+            latest_amount=amount,
+        )
 
+    if preferences is not None:
         if (
             notification_type == Notification.TYPE_BID
             and not preferences.bid_notifications
@@ -63,12 +93,57 @@ def create_notification(recipient, notification_type, title, message, **kwargs):
             and not preferences.admin_notifications
         ):
             return None
-    except NotificationPreference.DoesNotExist:
-        pass
 
     return notification
 
 
+def _coalesce_notification(
+    recipient, notification_type, related_object_id, window, message, params, amount
+):
+    """
+    Fold an event into the recipient's unread notification for the same
+    object if one was created within ``window`` seconds
+
+    Mirrors the coalesce_notification() SQL function used by the bid
+    triggers (auctions migration 0010).
+
+    Returns:
+        the updated Notification, or None if there is none to coalesce into
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        notification = (
+            Notification.objects.select_for_update()
+            .filter(
+                recipient=recipient,
+                notification_type=notification_type,
+                related_object_id=related_object_id,
+                is_read=False,
+                created_at__gte=now - timedelta(seconds=window),
+            )
+            .order_by("-created_at")
+            .first()
+        )
+        if notification is None:
+            return None
+
+        notification.event_count += 1
+        notification.message = message
+        notification.params = params
+        notification.latest_amount = amount
+        notification.last_event_at = now
+        notification.save(
+            update_fields=[
+                "event_count",
+                "message",
+                "params",
+                "latest_amount",
+                "last_event_at",
+            ]
+        )
+    return notification
+
+
 def send_outbid_notification(bid):
     """
     Send notification to the previous highest bidder that they've been outbid
@@ -85,19 +160,19 @@ def send_outbid_notification(bid):
     outbid_bid = outbid_bids.first()
     outbid_user = outbid_bid.bidder
 
-    notification_message = (
-        f"Your bid of {outbid_bid.amount} on '{auction.title}' has been outbid. "
-        f"The new highest bid is {bid.amount} by another user."
-    )
-
     create_notification(
         recipient=outbid_user,
         notification_type=Notification.TYPE_OUTBID,
-        title=f"You've been outbid on {auction.title}",
-        message=notification_message,
+        template="auction.outbid",
+        params={
+            "auction_title": auction.title,
+            "previous_amount": str(outbid_bid.amount),
+            "amount": str(bid.amount),
+        },
         priority=Notification.PRIORITY_HIGH,
         related_object_id=auction.id,
         related_object_type="auction",
+        amount=bid.amount,
     )
 
 
@@ -110,16 +185,11 @@ def send_auction_won_notification(auction, winning_bid):
 
     winner = winning_bid.bidder
 
-    notification_message = (
-        f"Congratulations! You won the auction for '{auction.title}' with a bid of {winning_bid.amount}. "
-        f"Please proceed to checkout to complete your purchase."
-    )
-
     create_notification(
         recipient=winner,
         notification_type=Notification.TYPE_AUCTION_WON,
-        title=f"You won the auction for {auction.title}",
-        message=notification_message,
+        template="auction.won",
+        params={"auction_title": auction.title, "amount": str(winning_bid.amount)},
         priority=Notification.PRIORITY_HIGH,
         related_object_id=auction.id,
         related_object_type="auction",
@@ -140,57 +210,62 @@ def send_auction_ended_notification(auction):
         not auction.reserve_price or highest_bid.amount >= auction.reserve_price
     )
 
+    params = {"auction_title": auction.title}
     if has_bids and reserve_met:
-        notification_message = (
-            f"Your auction for '{auction.title}' has ended with a winning bid of {highest_bid.amount}. "
-            f"The buyer will be notified to complete the payment."
-        )
+        template = "auction.ended.sold"
+        params["amount"] = str(highest_bid.amount)
     elif has_bids:
-        notification_message = (
-            f"Your auction for '{auction.title}' has ended but the reserve price was not met. "
-            f"The highest bid was {highest_bid.amount}."
-        )
+        template = "auction.ended.reserve_not_met"
+        params["amount"] = str(highest_bid.amount)
     else:
-        notification_message = (
-            f"Your auction for '{auction.title}' has ended with no bids."
-        )
+        template = "auction.ended.no_bids"
 
     create_notification(
         recipient=seller,
         notification_type=Notification.TYPE_AUCTION_ENDED,
-        title=f"Your auction for {auction.title} has ended",
-        message=notification_message,
+        template=template,
+        params=params,
         priority=Notification.PRIORITY_HIGH,
         related_object_id=auction.id,
         related_object_type="auction",
     )
 
 
-def send_new_auction_notification(auction, category_followers=None):
+def send_new_auction_notification(auction, followers=None):
     """
-    Send notification to users who follow this category
-    """
-    if not category_followers:
-        return
-
-    for user in category_followers:
-        if user == auction.seller:
-            continue
+    Notify the users following a saved search that a new auction matches
+    (apps.auctions.percolator), with bulk inserts
 
-        notification_message = (
-            f"A new auction '{auction.title}' has been listed in a category you follow. "
-            f"Starting price: {auction.starting_price}."
-        )
+    Args:
+        followers: dict of user ID -> name of the search they follow
 
-        create_notification(
-            recipient=user,
-            notification_type=Notification.TYPE_NEW_AUCTION,
-            title=f"New auction: {auction.title}",
-            message=notification_message,
-            priority=Notification.PRIORITY_MEDIUM,
-            related_object_id=auction.id,
-            related_object_type="auction",
-        )
+    Returns:
+        int - number of notifications created
+    """
+    if not followers:
+        return 0
+
+    notifications = Notification.objects.bulk_create(
+        (
+            Notification(
+                recipient_id=user_id,
+                notification_type=Notification.TYPE_NEW_AUCTION,
+                template_id="auction.saved_search",
+                params={
+                    "auction_title": auction.title,
+                    "starting_price": str(auction.starting_price),
+                    "search": search,
+                },
+                priority=Notification.PRIORITY_MEDIUM,
+                related_object_id=auction.id,
+                related_object_type="auction",
+            )
+            for user_id, search in followers.items()
+            if user_id != auction.seller_id
+        ),
+        batch_size=NOTIFICATION_BATCH_SIZE,
+    )
+    return len(notifications)
 
 
 def send_auction_cancelled_notification(auction):
@@ -204,16 +279,11 @@ def send_auction_cancelled_notification(auction):
         try:
             bidder = User.objects.get(id=bidder_id)
 
-            notification_message = (
-                f"The auction '{auction.title}' you bid on has been cancelled by the seller or admin. "
-                f"No charges have been applied."
-            )
-
             create_notification(
                 recipient=bidder,
                 notification_type=Notification.TYPE_AUCTION_CANCELLED,
-                title=f"Auction cancelled: {auction.title}",
-                message=notification_message,
+                template="auction.cancelled",
+                params={"auction_title": auction.title},
                 priority=Notification.PRIORITY_HIGH,
                 related_object_id=auction.id,
                 related_object_type="auction",
@@ -226,25 +296,85 @@ def send_payment_notification(user, transaction, is_sender=True):
     """
     Send notification about a payment/transaction
     """
-    if is_sender:
-        title = "Payment Sent"
-        message = (
-            f"Your payment of {transaction.amount} for '{transaction.reference}' was processed successfully. "
-            f"Transaction ID: {transaction.id}"
-        )
-    else:
-        title = "Payment Received"
-        message = (
-            f"You received a payment of {transaction.amount} for '{transaction.reference}'. "
-            f"Transaction ID: {transaction.id}"
-        )
-
     create_notification(
         recipient=user,
         notification_type=Notification.TYPE_PAYMENT,
-        title=title,
-        message=message,
+        template="payment.sent" if is_sender else "payment.received",
+        params={
+            "amount": str(transaction.amount),
+            "reference": transaction.reference,
+            "transaction_id": str(transaction.id),
+        },
         priority=Notification.PRIORITY_HIGH,
         related_object_id=transaction.id,
         related_object_type="transaction",
     )
+
+
+def get_unread_count(user):
+    """
+    Unread notification count for a user, read from the denormalized
+    counter instead of counting notification rows
+    """
+    return (
+        NotificationCounter.objects.filter(user=user)
+        .values_list("unread_count", flat=True)
+        .first()
+        or 0
+    )
+
+
+def repair_unread_counts(batch_size=1000):
+    """
+    Recount unread notifications and fix counters that drifted
+
+    Users are processed in primary-key batches. Within a batch the counter
+    rows are locked before counting, so the trigger cannot change them
+    between the count and the fix.
+
+    Returns:
+        int - number of counters corrected
+    """
+    repaired = 0
+    last_id = None
+    while True:
+        users = User.objects.order_by("id")
+        if last_id is not None:
+            users = users.filter(id__gt=last_id)
+        batch = list(users.values_list("id", flat=True)[:batch_size])
+        if not batch:
+            break
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT user_id FROM notifications_notificationcounter
+                WHERE user_id = ANY(%s) FOR UPDATE
+                """,
+                [batch],
+            )
+            cursor.execute(
+                """
+                INSERT INTO notifications_notificationcounter
+                    (user_id, unread_count, updated_at)
+                SELECT u.id, COALESCE(n.unread, 0), NOW()
+                FROM unnest(%s::uuid[]) AS u(id)
+                LEFT JOIN (
+                    SELECT recipient_id, COUNT(*) AS unread
+                    FROM notifications_notification
+                    WHERE NOT is_read AND recipient_id = ANY(%s)
+                    GROUP BY recipient_id
+                ) n ON n.recipient_id = u.id
+                ON CONFLICT (user_id) DO UPDATE
+                SET unread_count = EXCLUDED.unread_count, updated_at = NOW()
+                WHERE notifications_notificationcounter.unread_count
+                      <> EXCLUDED.unread_count
+                """,
+                [batch, batch],
+            )
+            repaired += cursor.rowcount
+
+        last_id = batch[-1]
+        if len(batch) < batch_size:
+            break
+    return repaired
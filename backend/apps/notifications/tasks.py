@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .services import repair_unread_counts
+
+
+@shared_task
+def repair_notification_counters():
+    """
+    Nightly task recounting unread notifications and fixing any counter
+    that drifted from the notification rows
+    """
+    return repair_unread_counts()
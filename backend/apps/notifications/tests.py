@@ -1,3 +1,391 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.partitioning import (
+    add_months,
+    archive_partitions,
+    create_partitions,
+    month_start,
+    partition_name,
+)
+from apps.core.retention import purge
+from .models import (
+    Notification,
+    NotificationCounter,
+    NotificationPreference,
+    NotificationTemplate,
+)
+from .rendering import clear_template_cache
+from .serializers import NotificationSerializer
+from .services import create_notification, get_unread_count, repair_unread_counts
+
+TABLE = "notifications_notification"
+
+
+def rows_in(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM "{table}"')
+        return cursor.fetchone()[0]
+
+
+class NotificationPartitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pw", first_name="U", last_name="U"
+        )
+
+    def notify(self, created_at=None):
+        notification = Notification.objects.create(
+            recipient=self.user,
+            notification_type=Notification.TYPE_ADMIN,
+            title="Hello",
+            message="Hello",
+        )
+        if created_at:
+            Notification.objects.filter(id=notification.id).update(created_at=created_at)
+        return notification
+
+    def test_time_range_query_prunes_partitions(self):
+        this_month = month_start(timezone.now())
+        plan = Notification.objects.filter(
+            created_at__gte=this_month, created_at__lt=add_months(this_month, 1)
+        ).explain()
+
+        self.assertIn(partition_name(TABLE, this_month), plan)
+        self.assertNotIn(partition_name(TABLE, add_months(this_month, 1)), plan)
+        self.assertNotIn(f"{TABLE}_default", plan)
+
+    def test_new_partition_takes_rows_from_default(self):
+        ahead = settings.PARTITION_PREMAKE_MONTHS + 2
+        month = add_months(month_start(timezone.now()), ahead)
+        self.notify(created_at=month)
+        self.assertEqual(rows_in(f"{TABLE}_default"), 1)
+
+        created = create_partitions(TABLE, months_ahead=ahead)
+
+        self.assertIn(partition_name(TABLE, month), created)
+        self.assertEqual(rows_in(f"{TABLE}_default"), 0)
+        self.assertEqual(rows_in(partition_name(TABLE, month)), 1)
+
+    def test_expired_partitions_are_archived(self):
+        old_month = add_months(month_start(timezone.now()), -12)
+        create_partitions(TABLE, since=old_month)
+        old = self.notify(created_at=old_month)
+        recent = self.notify()
+
+        archived = archive_partitions(TABLE, retain_months=6)
+
+        self.assertIn(partition_name(TABLE, old_month), archived)
+        self.assertFalse(Notification.objects.filter(id=old.id).exists())
+        self.assertTrue(Notification.objects.filter(id=recent.id).exists())
+        self.assertEqual(
+            rows_in(
+                f'{settings.PARTITION_ARCHIVE_SCHEMA}"."{partition_name(TABLE, old_month)}'
+            ),
+            1,
+        )
+
+
+class BatchedPurgeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pw", first_name="U", last_name="U"
+        )
+        Notification.objects.bulk_create(
+            Notification(
+                recipient=cls.user,
+                notification_type=Notification.TYPE_ADMIN,
+                title="Hello",
+                message="Hello",
+                is_read=i < 5,
+            )
+            for i in range(7)
+        )
+
+    def test_purge_deletes_matching_rows_in_batches(self):
+        result = purge(Notification.objects.filter(is_read=True), batch_size=2, pause=0)
+
+        self.assertEqual(result, {"deleted": 5, "batches": 3, "complete": True})
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_interrupted_purge_resumes_from_checkpoint(self):
+        read = Notification.objects.filter(is_read=True)
+        first = purge(read, batch_size=2, pause=0, checkpoint="test", time_limit=1e-9)
+        self.assertEqual(first, {"deleted": 2, "batches": 1, "complete": False})
+
+        second = purge(read, batch_size=2, pause=0, checkpoint="test")
+        self.assertEqual(second["deleted"], 3)
+        self.assertTrue(second["complete"])
+        self.assertFalse(read.exists())
+
+
+    def test_admin_user_purge_is_bounded_without_pauses(self):
+        admin = User.objects.create_user(
+            email="admin@example.com", password="pw", first_name="A", last_name="A",
+            role="admin",
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        url = (
+            "/api/v1/notifications/admin/notifications/delete_read/"
+            f"?user_id={self.user.id}"
+        )
+        with self.settings(
+            RETENTION_BATCH_SIZE=2,
+            RETENTION_BATCH_PAUSE=60,
+            RETENTION_REQUEST_TIME_LIMIT=1e-9,
+        ):
+            response = client.delete(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["deleted"], response.data["complete"]), (2, False))
+
+        response = client.delete(url)
+        self.assertEqual((response.data["deleted"], response.data["complete"]), (3, True))
+        self.assertFalse(Notification.objects.filter(is_read=True).exists())
+
+    def test_own_purge_is_bounded_without_pauses(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = "/api/v1/notifications/notifications/delete_all_read/"
+        with self.settings(
+            RETENTION_BATCH_SIZE=2,
+            RETENTION_BATCH_PAUSE=60,
+            RETENTION_REQUEST_TIME_LIMIT=1e-9,
+        ):
+            response = client.delete(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual((data["deleted"], data["complete"]), (2, False))
+        self.assertIn("repeat", response.json()["message"])
+
+        data = client.delete(url).json()["data"]
+        self.assertEqual((data["deleted"], data["complete"]), (3, True))
+        self.assertFalse(Notification.objects.filter(is_read=True).exists())
+
+
+class UnreadCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pw", first_name="U", last_name="U"
+        )
+
+    def notify(self):
+        return create_notification(
+            recipient=self.user,
+            notification_type=Notification.TYPE_ADMIN,
+            title="Hello",
+            message="Hello",
+        )
+
+    def test_counter_follows_notification_writes(self):
+        first, second, third = self.notify(), self.notify(), self.notify()
+        self.assertEqual(get_unread_count(self.user), 3)
+
+        first.is_read = True
+        first.save()
+        self.assertEqual(get_unread_count(self.user), 2)
+
+        Notification.objects.filter(recipient=self.user, is_read=False).update(
+            is_read=True
+        )
+        self.assertEqual(get_unread_count(self.user), 0)
+
+        Notification.objects.filter(id=second.id).update(is_read=False)
+        Notification.objects.filter(id__in=[second.id, third.id]).delete()
+        self.assertEqual(get_unread_count(self.user), 0)
+
+    def test_repair_fixes_drift(self):
+        self.notify()
+        self.notify()
+        NotificationCounter.objects.filter(user=self.user).update(unread_count=7)
+
+        self.assertEqual(repair_unread_counts(batch_size=1), 1)
+        self.assertEqual(get_unread_count(self.user), 2)
+        self.assertEqual(repair_unread_counts(), 0)
+
+
+class NotificationCoalescingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pw", first_name="U", last_name="U"
+        )
+        cls.auction_id = uuid.uuid4()
+
+    def notify_bid(self, amount):
+        return create_notification(
+            recipient=self.user,
+            notification_type=Notification.TYPE_BID,
+            title="New bid",
+            message=f"A bid of {amount} was placed",
+            related_object_id=self.auction_id,
+            related_object_type="auction",
+            amount=Decimal(amount),
+        )
+
+    def test_burst_updates_one_notification(self):
+        first = self.notify_bid("10.00")
+        second = self.notify_bid("12.00")
+
+        self.assertEqual(first.id, second.id)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.event_count, 2)
+        self.assertEqual(notification.latest_amount, Decimal("12.00"))
+        self.assertEqual(notification.message, "A bid of 12.00 was placed")
+        self.assertEqual(get_unread_count(self.user), 1)
+
+    def test_read_or_expired_notifications_are_not_reused(self):
+        first = self.notify_bid("10.00")
+        Notification.objects.filter(id=first.id).update(is_read=True)
+        second = self.notify_bid("12.00")
+        self.assertNotEqual(first.id, second.id)
+
+        Notification.objects.filter(id=second.id).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        third = self.notify_bid("14.00")
+        self.assertNotEqual(second.id, third.id)
+
+    def test_zero_window_disables_coalescing(self):
+        NotificationPreference.objects.filter(user=self.user).update(
+            bid_coalesce_window=0
+        )
+        self.notify_bid("10.00")
+        self.notify_bid("12.00")
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_outbid_trigger_coalesces(self):
+        from apps.auctions.models import Auction, Bid, Category, Item
+
+        seller = User.objects.create_user(
+            email="seller@example.com", password="pw", first_name="S", last_name="S"
+        )
+        rival = User.objects.create_user(
+            email="rival@example.com", password="pw", first_name="R", last_name="R"
+        )
+        item = Item.objects.create(
+            name="Item", description="", category=Category.objects.create(name="C"),
+            owner=seller,
+        )
+        now = timezone.now()
+        auction = Auction.objects.create(
+            item=item,
+            seller=seller,
+            title="Auction",
+            description="",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(hours=1),
+            end_time=now + timedelta(days=1),
+            status=Auction.STATUS_ACTIVE,
+        )
+        for bidder, amount in [(self.user, 11), (rival, 12), (rival, 13)]:
+            Bid.objects.bulk_create(
+                [Bid(auction=auction, bidder=bidder, amount=Decimal(amount))]
+            )
+
+        outbid = Notification.objects.get(
+            recipient=self.user, notification_type=Notification.TYPE_OUTBID
+        )
+        self.assertEqual(outbid.event_count, 2)
+        self.assertEqual(outbid.latest_amount, Decimal("13.00"))
+        self.assertEqual(outbid.template_id, "auction.outbid_by_bid")
+        self.assertEqual(outbid.message, "")
+        self.assertTrue(
+            outbid.rendered_message.startswith(
+                "Someone placed a higher bid of 13.00 on 'Auction'."
+            )
+        )
+
+
+class NotificationTemplateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pw", first_name="U", last_name="U"
+        )
+
+    def setUp(self):
+        clear_template_cache()
+
+    def test_template_notification_renders_on_read(self):
+        notification = create_notification(
+            recipient=self.user,
+            notification_type=Notification.TYPE_AUCTION_CANCELLED,
+            template="auction.cancelled",
+            params={"auction_title": "Vase"},
+        )
+        stored = Notification.objects.values("title", "message").get(id=notification.id)
+        self.assertEqual(stored, {"title": "", "message": ""})
+
+        data = NotificationSerializer(Notification.objects.get(id=notification.id)).data
+        self.assertEqual(data["title"], "Auction cancelled: Vase")
+        self.assertEqual(
+            data["message"],
+            "The auction 'Vase' you bid on has been cancelled by the seller or admin. "
+            "No charges have been applied.",
+        )
+
+    def test_templates_are_loaded_once(self):
+        for title in ["One", "Two", "Three"]:
+            create_notification(
+                recipient=self.user,
+                notification_type=Notification.TYPE_AUCTION_STARTED,
+                template="auction.ending_soon",
+                params={"auction_title": title},
+            )
+        notifications = list(Notification.objects.all())
+
+        with self.assertNumQueries(1):
+            titles = [n.rendered_title for n in notifications]
+        with self.assertNumQueries(0):
+            [n.rendered_message for n in notifications]
+        self.assertIn("Auction ending soon: Two", titles)
+
+    def test_literal_notifications_are_unchanged(self):
+        notification = create_notification(
+            recipient=self.user,
+            notification_type=Notification.TYPE_ADMIN,
+            title="Maintenance",
+            message="Back soon",
+        )
+        self.assertIsNone(notification.template_id)
+        self.assertEqual(notification.rendered_title, "Maintenance")
+        self.assertEqual(notification.rendered_message, "Back soon")
+        self.assertTrue(NotificationTemplate.objects.filter(key="bid.new").exists())
+
+    def test_sparse_fields_skip_templates_and_recipient(self):
+        create_notification(
+            recipient=self.user,
+            notification_type=Notification.TYPE_AUCTION_CANCELLED,
+            template="auction.cancelled",
+            params={"auction_title": "Vase"},
+        )
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = "/api/v1/notifications/notifications/"
+
+        # the notifications only: no recipient join, no template load
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, {"fields": "id,is_read,recipient_id"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("JOIN", queries[0]["sql"])
+        notification = response.json()["data"][0]
+        self.assertEqual(set(notification), {"id", "is_read", "recipient_id"})
+        self.assertEqual(notification["recipient_id"], str(self.user.id))
 
-# Create your tests here.
+        response = client.get(url, {"exclude": "message,recipient_email"})
+        notification = response.json()["data"][0]
+        self.assertEqual(notification["title"], "Auction cancelled: Vase")
+        self.assertNotIn("message", notification)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import permissions, status, viewsets
@@ -5,11 +6,14 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from apps.accounts.permissions import IsOwner
+from apps.core.fieldsets import fieldset_parameters, requested_fields
 from apps.core.mixins import SwaggerSchemaMixin, ApiResponseMixin
 from apps.core.responses import api_response
+from apps.core.retention import purge
 
 from .models import Notification, NotificationPreference
 from .serializers import NotificationPreferenceSerializer, NotificationSerializer
+from .services import get_unread_count
 
 
 class NotificationViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelViewSet):
@@ -27,10 +31,14 @@ class NotificationViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelVi
         user = self.request.user
         if user.role == "admin" and "user_id" in self.request.query_params:
             user_id = self.request.query_params.get("user_id")
-            return Notification.objects.filter(recipient_id=user_id).order_by(
-                "-created_at"
-            )
-        return Notification.objects.filter(recipient=user).order_by("-created_at")
+            queryset = Notification.objects.filter(recipient_id=user_id)
+        else:
+            queryset = Notification.objects.filter(recipient=user)
+
+        fields = requested_fields(self.request.query_params, NotificationSerializer)
+        if "recipient_email" in fields:
+            queryset = queryset.select_related("recipient")
+        return queryset.order_by("-created_at")
 
     def get_permissions(self):
         """Only allow users to access their own notifications"""
@@ -56,6 +64,7 @@ class NotificationViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelVi
                 description="Filter by notification type",
                 type=openapi.TYPE_STRING,
             ),
+            *fieldset_parameters(NotificationSerializer),
         ],
         responses={200: NotificationSerializer(many=True)},
         security=[{"Bearer": []}],
@@ -81,11 +90,28 @@ class NotificationViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelVi
             data=serializer.data, message="Notifications retrieved successfully"
         )
 
+    @swagger_auto_schema(
+        operation_id="unread_notification_count",
+        operation_summary="Get unread notification count",
+        operation_description="Get the number of unread notifications for the current user",
+        tags=["Notifications"],
+        responses={200: "Unread notification count"},
+        security=[{"Bearer": []}],
+    )
+    @action(detail=False, methods=["get"])
+    def unread_count(self, request):
+        """Unread count from the per-user counter, without counting rows"""
+        return api_response(
+            data={"unread_count": get_unread_count(request.user)},
+            message="Unread count retrieved successfully",
+        )
+
     @swagger_auto_schema(
         operation_id="retrieve_notification",
         operation_summary="Get notification details",
         operation_description="Get details of a specific notification",
         tags=["Notifications"],
+        manual_parameters=fieldset_parameters(NotificationSerializer),
         responses={200: NotificationSerializer, 404: "Not found"},
         security=[{"Bearer": []}],
     )
@@ -125,7 +151,7 @@ class NotificationViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelVi
     def mark_all_read(self, request):
         """Mark all notifications as read"""
         queryset = self.get_queryset()
-        queryset.update(is_read=True)
+        queryset.filter(is_read=False).update(is_read=True)
         return api_response(message="All notifications marked as read")
 
     @swagger_auto_schema(
@@ -156,8 +182,20 @@ class NotificationViewSet(ApiResponseMixin, SwaggerSchemaMixin, viewsets.ModelVi
     def delete_all_read(self, request):
         """Delete all read notifications"""
         queryset = self.get_queryset().filter(is_read=True)
-        queryset.delete()
-        return api_response(message="All read notifications deleted successfully")
+        # No pause between batches, and bounded like the admin purges
+        result = purge(
+            queryset, pause=0, time_limit=settings.RETENTION_REQUEST_TIME_LIMIT
+        )
+        data = {"deleted": result["deleted"], "complete": result["complete"]}
+        if not result["complete"]:
+            return api_response(
+                data=data,
+                message=f"{result['deleted']} read notifications deleted, more "
+                "remain - repeat the request to continue",
+            )
+        return api_response(
+            data=data, message="All read notifications deleted successfully"
+        )
 
 
 class NotificationPreferenceViewSet(
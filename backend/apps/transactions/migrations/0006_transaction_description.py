@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_merge_20250318_1610'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='description',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-19 10:00
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('transactions', '0006_transaction_description'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_type', 'status'], name='txn_user_type_status_idx'),
+        ),
+        # covered by txn_user_type_status_idx
+        RemoveIndexConcurrently(
+            model_name='transaction',
+            name='transaction_user_id_98a6b3_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-created_at'], name='txn_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transactionlog',
+            index=models.Index(fields=['transaction', 'action'], name='txlog_transaction_action_idx'),
+        ),
+    ]
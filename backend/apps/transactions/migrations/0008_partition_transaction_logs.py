@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:00
+
+from django.db import migrations
+
+from apps.core.partitioning import partition_table, unpartition_table
+
+
+def partition_transaction_logs(apps, schema_editor):
+    partition_table(schema_editor, "transactions_transactionlog")
+
+
+def unpartition_transaction_logs(apps, schema_editor):
+    unpartition_table(schema_editor, "transactions_transactionlog")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_transaction_logs, unpartition_transaction_logs),
+    ]
@@ -60,6 +60,17 @@ class Transaction(models.Model):
     reference = models.CharField(max_length=255, blank=True, null=True)
     reference_id = models.UUIDField(blank=True, null=True)
     payment_method = models.ForeignKey('accounts.PaymentMethod', on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "transaction_type", "status"],
+                name="txn_user_type_status_idx",
+            ),
+            models.Index(fields=["user", "-created_at"], name="txn_user_created_idx"),
+            models.Index(fields=["status", "created_at"], name="transaction_status_d2f80b_idx"),
+            models.Index(fields=["reference_id"], name="transaction_referen_1bb812_idx"),
+        ]
     
     def __str__(self):
         return f"{self.transaction_type} - ${self.amount} - {self.status}"
@@ -87,6 +98,11 @@ class TransactionLog(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(
+                fields=["transaction", "action"], name="txlog_transaction_action_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.action} - {self.transaction_id} ({self.timestamp})"
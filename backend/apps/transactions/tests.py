@@ -1,3 +1,101 @@
+import re
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from apps.accounts.models import User
+from .models import Transaction, TransactionLog
+
+
+def explain(queryset):
+    """
+    EXPLAIN for a queryset with sequential scans disabled
+
+    At test-database size the planner rightly prefers a seq scan, so this
+    checks that an index can serve the query shape, not the cost estimate.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def index_names(index):
+    """The index and, for a partitioned table, its per-partition indexes"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [index],
+        )
+        return [index] + [row[0] for row in cursor.fetchall()]
+
+
+class HotQueryIndexTests(TestCase):
+    def assertUsesIndex(self, plan, index):
+        names = index_names(index)
+        self.assertTrue(
+            any(re.search(rf"\b{name}\b", plan) for name in names),
+            f"{index} not used in:\n{plan}",
+        )
+
+    def assertNoSort(self, plan):
+        # a Sort node, not the "Sort Key" of a Merge Append over partitions
+        self.assertNotRegex(plan, r"(^|->\s+)Sort\s+\(")
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            User.objects.create_user(
+                email=f"user{i}@example.com", password="pw", first_name="U", last_name="U"
+            )
+            for i in range(5)
+        ]
+        cls.user = users[0]
+        types = [choice for choice, _ in Transaction.TRANSACTION_TYPES]
+        statuses = [choice for choice, _ in Transaction.STATUS_CHOICES]
+        # bulk_create skips the wallet side effects of the post_save signal
+        transactions = Transaction.objects.bulk_create(
+            Transaction(
+                user=user,
+                transaction_type=types[i % len(types)],
+                amount=Decimal("5.00"),
+                status=statuses[i % len(statuses)],
+            )
+            for user in users
+            for i in range(60)
+        )
+        cls.transaction = transactions[0]
+        TransactionLog.objects.bulk_create(
+            TransactionLog(transaction=transaction, action="processed wallet effect")
+            for transaction in transactions
+        )
+
+    def test_recent_transactions_use_index(self):
+        plan = explain(
+            Transaction.objects.filter(user=self.user).order_by("-created_at")[:5]
+        )
+        self.assertUsesIndex(plan, "txn_user_created_idx")
+        self.assertNoSort(plan)
+
+    def test_wallet_totals_use_index(self):
+        plan = explain(
+            Transaction.objects.filter(
+                user=self.user,
+                transaction_type=Transaction.TYPE_PURCHASE,
+                status=Transaction.STATUS_COMPLETED,
+            ).order_by()
+        )
+        self.assertUsesIndex(plan, "txn_user_type_status_idx")
+
+    def test_signal_log_lookup_uses_index(self):
+        plan = explain(
+            TransactionLog.objects.filter(
+                transaction=self.transaction, action="processed wallet effect"
+            ).order_by()
+        )
+        self.assertUsesIndex(plan, "txlog_transaction_action_idx")
@@ -0,0 +1,46 @@
+"""
+URL configuration used for requests served over ASGI.
+
+The read-heavy endpoints below are answered by async views using the async
+ORM; everything else (including non-GET requests to the same paths) is
+handled by the regular URL patterns from auctionhouse.urls.
+"""
+
+from django.urls import path
+
+from apps.accounts.async_views import wallet_summary
+from apps.auctions import async_views as auction_views
+from apps.notifications.async_views import notification_list
+
+from .urls import urlpatterns as sync_urlpatterns
+
+async_urlpatterns = [
+    path(
+        "api/v1/auctions/auctions/",
+        auction_views.auction_list,
+        name="async-auction-list",
+    ),
+    path(
+        "api/v1/auctions/search/",
+        auction_views.search_auctions,
+        name="async-search-auctions",
+    ),
+    path(
+        "api/v1/auctions/featured/",
+        auction_views.featured_auctions,
+        name="async-featured-auctions",
+    ),
+    path(
+        "api/v1/auctions/public/auctions/<uuid:auction_id>/",
+        auction_views.public_auction_detail,
+        name="async-public-auction-detail",
+    ),
+    path(
+        "api/v1/notifications/notifications/",
+        notification_list,
+        name="async-notification-list",
+    ),
+    path("api/v1/accounts/wallet/", wallet_summary, name="async-wallet-summary"),
+]
+
+urlpatterns = async_urlpatterns + sync_urlpatterns
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
 from dotenv import load_dotenv
 
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # This must be at the top
+    "apps.core.middleware.asgi_urlconf_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     # CORS Middleware
@@ -69,6 +71,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "auctionhouse.urls"
 
+# Requests served over ASGI resolve against this URLconf first, which swaps
+# the hot read endpoints for async ORM views and falls back to ROOT_URLCONF
+ASGI_ROOT_URLCONF = "auctionhouse.asgi_urls"
+
 # For development, allow all origins
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -128,6 +134,34 @@ WSGI_APPLICATION = "auctionhouse.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Each web and Celery worker process keeps its own psycopg connection pool.
+# Set DB_POOL_ENABLED=False to fall back to persistent connections
+# (CONN_MAX_AGE), e.g. when an external pooler already multiplexes clients.
+DB_POOL_ENABLED = os.environ.get("DB_POOL_ENABLED", "True").lower() == "true"
+
+# Running behind pgbouncer in transaction mode: no server-side cursors, and
+# prepared statements stay disabled (Django's default with psycopg 3).
+DB_BEHIND_PGBOUNCER = os.environ.get("DB_BEHIND_PGBOUNCER", "False").lower() == "true"
+
+DB_OPTIONS = {
+    "client_encoding": "UTF8",
+    "connect_timeout": 10,
+}
+
+if DB_POOL_ENABLED:
+    DB_OPTIONS["pool"] = {
+        "name": "default",
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+        # Seconds a request may wait for a free connection before failing
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        # Recycle connections so server-side memory and pgbouncer
+        # assignments don't live forever
+        "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+        "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+        "max_waiting": int(os.environ.get("DB_POOL_MAX_WAITING", 0)),
+    }
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -136,13 +170,96 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD"),
         "HOST": os.environ.get("DB_HOST"),
         "PORT": os.environ.get("DB_PORT"),
-        "OPTIONS": {
-            "client_encoding": "UTF8",
-            "connect_timeout": 10,
-        },
+        # Pooling and persistent connections are mutually exclusive
+        "CONN_MAX_AGE": 0 if DB_POOL_ENABLED else int(
+            os.environ.get("CONN_MAX_AGE", 60)
+        ),
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": DB_BEHIND_PGBOUNCER,
+        "OPTIONS": DB_OPTIONS,
     }
 }
 
+# Monthly partitions for bids, notifications and transaction logs
+# (apps/core/partitioning.py). Months are created this far ahead and
+# partitions older than the retention are detached into the archive schema;
+# a retention of 0 keeps every month attached.
+PARTITION_PREMAKE_MONTHS = int(os.environ.get("PARTITION_PREMAKE_MONTHS", 3))
+PARTITION_ARCHIVE_SCHEMA = os.environ.get("PARTITION_ARCHIVE_SCHEMA", "archive")
+PARTITION_RETENTION_MONTHS = {
+    "auctions_bid": int(os.environ.get("BID_RETENTION_MONTHS", 24)),
+    "notifications_notification": int(
+        os.environ.get("NOTIFICATION_RETENTION_MONTHS", 6)
+    ),
+    "transactions_transactionlog": int(
+        os.environ.get("TRANSACTION_LOG_RETENTION_MONTHS", 24)
+    ),
+}
+
+# Batched retention purges (apps/core/retention.py): days to keep per
+# policy (0 disables it), rows per delete batch and seconds between batches
+RETENTION_DAYS = {
+    "stale_drafts": int(os.environ.get("RETENTION_STALE_DRAFT_DAYS", 30)),
+    "read_notifications": int(os.environ.get("RETENTION_READ_NOTIFICATION_DAYS", 30)),
+    "expired_tokens": int(os.environ.get("RETENTION_EXPIRED_TOKEN_DAYS", 7)),
+    "admin_log": int(os.environ.get("RETENTION_ADMIN_LOG_DAYS", 365)),
+    "reminder_ledger": int(os.environ.get("RETENTION_REMINDER_LEDGER_DAYS", 7)),
+}
+RETENTION_BATCH_SIZE = int(os.environ.get("RETENTION_BATCH_SIZE", 500))
+RETENTION_BATCH_PAUSE = float(os.environ.get("RETENTION_BATCH_PAUSE", 0.2))
+# Longest a purge triggered from an API request may run before the rest is
+# left to the scheduled retention task
+RETENTION_REQUEST_TIME_LIMIT = float(os.environ.get("RETENTION_REQUEST_TIME_LIMIT", 5))
+
+# Minutes before an auction ends at which each watcher gets a reminder
+# (apps/auctions/reminders.py)
+ENDING_SOON_REMINDER_MINUTES = [
+    int(minutes)
+    for minutes in os.environ.get("ENDING_SOON_REMINDER_MINUTES", "1440,60,5").split(",")
+    if minutes.strip()
+]
+
+# Redis holding a mirror of the auction watch sets (apps/auctions/
+# watchlist.py); empty answers watch lookups from the database
+WATCHLIST_REDIS_URL = os.environ.get("WATCHLIST_REDIS_URL", "")
+
+# Redis holding the autocomplete index shared by every worker (apps/
+# auctions/autocomplete.py); empty keeps one per process, rebuilt from the
+# database every AUTOCOMPLETE_LOCAL_TTL seconds
+AUTOCOMPLETE_REDIS_URL = os.environ.get("AUTOCOMPLETE_REDIS_URL", "")
+AUTOCOMPLETE_LOCAL_TTL = int(os.environ.get("AUTOCOMPLETE_LOCAL_TTL", 60))
+
+# Seconds each process keeps notification templates (apps/notifications/
+# rendering.py) before reloading them from the database
+NOTIFICATION_TEMPLATE_CACHE_TTL = int(
+    os.environ.get("NOTIFICATION_TEMPLATE_CACHE_TTL", 300)
+)
+
+# Seconds facet counts (?facets=true on auction list/search, apps/auctions/
+# facets.py) are cached per filter set
+AUCTION_FACET_CACHE_TTL = int(os.environ.get("AUCTION_FACET_CACHE_TTL", 60))
+
+# Most sub-requests accepted by POST /api/v1/batch/ (apps/core/batch.py)
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", 20))
+
+# Seller auction imports (apps/auctions/bulk_import.py): rows validated and
+# inserted per batch, and most rows accepted in one file
+BULK_IMPORT_BATCH_SIZE = int(os.environ.get("BULK_IMPORT_BATCH_SIZE", 500))
+BULK_IMPORT_MAX_ROWS = int(os.environ.get("BULK_IMPORT_MAX_ROWS", 10000))
+
+# Hours after which a bid, watch or view counts half as much towards an
+# auction's trending score (apps/auctions/trending.py)
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get("TRENDING_HALF_LIFE_HOURS", 6))
+
+# Seconds auction views are counted in memory by each process before being
+# written out (apps/auctions/view_counts.py): at most this much is lost if a
+# process dies
+VIEW_COUNT_FLUSH_SECONDS = int(os.environ.get("VIEW_COUNT_FLUSH_SECONDS", 10))
+
+# Seconds an active auction's time_remaining may be behind in a copy
+# revalidated with a 304 (apps/auctions/etags.py): its ETag changes this often
+ETAG_COUNTDOWN_SECONDS = int(os.environ.get("ETAG_COUNTDOWN_SECONDS", 10))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -150,8 +267,18 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# MessagePack responses (Accept: application/msgpack) when msgpack is installed
+if importlib.util.find_spec("msgpack"):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append(
+        'apps.core.renderers.MessagePackRenderer'
+    )
+
 # SimpleJWT settings
 from datetime import timedelta
 
@@ -225,6 +352,46 @@ STATIC_ROOT = os.environ.get("STATIC_ROOT", os.path.join(BASE_DIR, "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.environ.get("MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
 
+# Item image derivatives (apps/auctions/images.py) are stored under their
+# content hash, so they never change and can be cached forever. The
+# "images" storage is local by default; set IMAGE_STORAGE_BACKEND to
+# storages.backends.s3.S3Storage (with IMAGE_STORAGE_BUCKET) for S3.
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+IMAGE_STORAGE_BACKEND = os.environ.get(
+    "IMAGE_STORAGE_BACKEND", "django.core.files.storage.FileSystemStorage"
+)
+if IMAGE_STORAGE_BACKEND == "storages.backends.s3.S3Storage":
+    IMAGE_STORAGE_OPTIONS = {
+        "bucket_name": os.environ.get("IMAGE_STORAGE_BUCKET"),
+        "custom_domain": os.environ.get("IMAGE_CDN_DOMAIN") or None,
+        "querystring_auth": False,
+        "file_overwrite": True,
+        "object_parameters": {"CacheControl": IMAGE_CACHE_CONTROL},
+    }
+else:
+    IMAGE_STORAGE_OPTIONS = {
+        "location": os.path.join(MEDIA_ROOT, "images"),
+        "base_url": f"{MEDIA_URL}images/",
+    }
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "images": {"BACKEND": IMAGE_STORAGE_BACKEND, "OPTIONS": IMAGE_STORAGE_OPTIONS},
+}
+
+# Widths (px) and formats generated for every image; formats this Pillow
+# build can't encode (AVIF before Pillow 11.2) are skipped
+IMAGE_DERIVATIVE_WIDTHS = [
+    int(width)
+    for width in os.environ.get("IMAGE_DERIVATIVE_WIDTHS", "160,320,640,1280").split(",")
+]
+IMAGE_DERIVATIVE_FORMATS = os.environ.get("IMAGE_DERIVATIVE_FORMATS", "avif,webp").split(",")
+IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", 75))
+# Processes generating derivatives (0 = one per CPU)
+IMAGE_PROCESS_WORKERS = int(os.environ.get("IMAGE_PROCESS_WORKERS", 0))
+IMAGE_MAX_UPLOAD_BYTES = int(os.environ.get("IMAGE_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -15,15 +15,19 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from apps.core.swagger import get_swagger_view
+from apps.core.views import batch_requests, serve_image
 
 api_url_patterns = [
+    path("api/v1/batch/", batch_requests, name="api-batch"),
     path("api/v1/accounts/", include("apps.accounts.urls")),
     path("api/v1/auctions/", include("apps.auctions.urls")),
     path("api/v1/notifications/", include("apps.notifications.urls")),
     path("api/v1/transactions/", include("apps.transactions.urls")),
+    path("api/v1/system/", include("apps.core.urls")),
 ]
 
 schema_view = get_swagger_view(api_url_patterns)
@@ -43,3 +47,13 @@ urlpatterns += [
         "swagger<format>/", schema_view.without_ui(cache_timeout=0), name="schema-json"
     ),
 ]
+
+# Local image derivatives; with S3 they're served by the bucket or CDN
+if settings.IMAGE_STORAGE_BACKEND == "django.core.files.storage.FileSystemStorage":
+    urlpatterns += [
+        re_path(
+            rf"^{settings.MEDIA_URL.lstrip('/')}images/(?P<path>.+)$",
+            serve_image,
+            name="item-image",
+        ),
+    ]
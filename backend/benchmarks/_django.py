@@ -0,0 +1,15 @@
+"""Shared bootstrap for the benchmark scripts.
+
+Run them from the backend directory as modules, e.g.
+``python -m benchmarks.db_pool``.
+"""
+
+import os
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "auctionhouse.settings")
+
+    import django
+
+    django.setup()
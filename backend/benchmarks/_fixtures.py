@@ -0,0 +1,72 @@
+"""Benchmark data, created once and reused across runs."""
+
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+SELLER_EMAIL = "bench-seller@example.com"
+
+
+def seed(auctions=60, bidders=20, bids_per_auction=8):
+    """
+    Make sure there are at least ``auctions`` active benchmark auctions
+    with bids from ``bidders`` users
+
+    Returns:
+        the benchmark seller, usable for authenticated requests
+    """
+    from django.utils import timezone
+
+    from apps.accounts.models import User
+    from apps.auctions.models import Auction, Bid, Category, Item
+
+    seller = User.objects.filter(email=SELLER_EMAIL).first()
+    if seller is None:
+        seller = User.objects.create_user(
+            email=SELLER_EMAIL, password="bench", first_name="Bench", last_name="Seller"
+        )
+
+    existing = Auction.objects.filter(seller=seller).count()
+    if existing >= auctions:
+        return seller
+
+    category, _ = Category.objects.get_or_create(name="Benchmark")
+    users = []
+    for i in range(bidders):
+        email = f"bench-bidder-{i}@example.com"
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            user = User.objects.create_user(
+                email=email, password="bench", first_name="Bidder", last_name=str(i)
+            )
+        users.append(user)
+
+    now = timezone.now()
+    rng = random.Random(existing)
+    for i in range(existing, auctions):
+        item = Item.objects.create(
+            name=f"Benchmark item {i}",
+            description="Benchmark item",
+            category=category,
+            owner=seller,
+        )
+        auction = Auction.objects.create(
+            item=item,
+            seller=seller,
+            title=f"Benchmark auction {i}",
+            description="Benchmark auction",
+            starting_price=Decimal("10.00"),
+            start_time=now - timedelta(hours=1),
+            end_time=now + timedelta(days=7),
+            status=Auction.STATUS_ACTIVE,
+        )
+        amount = Decimal("10.00")
+        bids = []
+        for _ in range(bids_per_auction):
+            amount += Decimal(rng.randint(1, 20))
+            bids.append(
+                Bid(auction=auction, bidder=rng.choice(users), amount=amount)
+            )
+        Bid.objects.bulk_create(bids)
+
+    return seller
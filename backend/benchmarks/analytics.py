@@ -0,0 +1,111 @@
+"""
+Auction analytics: the statistics of one auction with --bids bids (100k by
+default) read from its sketch, against scanning its bids as the admin
+analytics endpoint used to (distinct count, every amount into Python).
+
+    python -m benchmarks.analytics [--bids 100000] [--repeat 20]
+
+The bids are inserted in SQL on a benchmark auction (as a superuser, to
+skip the bid triggers) and kept for later runs; adding them to the
+sketches is timed too.
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.percolator import timed
+
+AUCTION_TITLE = "Benchmark analytics auction"
+
+
+def seed_bids(auction, count, bidders):
+    """``count`` bids on ``auction`` from ``bidders``, inserted in SQL"""
+    from django.db import connection, transaction
+
+    if auction.bids.count() >= count:
+        return False
+    with transaction.atomic(), connection.cursor() as cursor:
+        # without the bid triggers (auto-bids, outbid updates), which would
+        # take hours at this size; the bids are queued for the sketches here
+        cursor.execute("SET LOCAL session_replication_role = replica")
+        cursor.execute(
+            """
+            WITH inserted AS (
+                INSERT INTO auctions_bid
+                    (id, auction_id, bidder_id, amount, status, timestamp)
+                SELECT gen_random_uuid(), %(auction)s,
+                       (%(bidders)s::uuid[])[1 + (g * 7919) %% %(bidder_count)s],
+                       10 + (g %% 5000) + (g %% 97) / 100.0, 'outbid', NOW()
+                FROM generate_series(1, %(count)s) g
+                RETURNING auction_id, bidder_id, amount, timestamp
+            )
+            INSERT INTO auctions_pendingsketchbid
+                (auction_id, bidder_id, amount, timestamp)
+            SELECT * FROM inserted
+            """,
+            {
+                "auction": auction.id,
+                "bidders": bidders,
+                "bidder_count": len(bidders),
+                "count": count - auction.bids.count(),
+            },
+        )
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bids", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks._django import setup
+
+    setup()
+
+    from apps.accounts.models import User
+    from apps.auctions import analytics
+    from apps.auctions.models import Auction, PendingSketchBid
+    from benchmarks._fixtures import seed
+
+    seller = seed(auctions=1, bidders=20, bids_per_auction=0)
+    auction = Auction.objects.filter(seller=seller).first()
+    if auction.title != AUCTION_TITLE:
+        auction.title = AUCTION_TITLE
+        auction.save(update_fields=["title"])
+    bidders = list(
+        User.objects.filter(email__startswith="bench-bidder-").values_list(
+            "id", flat=True
+        )
+    )
+
+    seeded = seed_bids(auction, args.bids, bidders)
+    queued = PendingSketchBid.objects.count()
+    started = time.perf_counter()
+    while analytics.absorb_bids():
+        pass
+    absorb_seconds = time.perf_counter() - started
+
+    def scan():
+        bids = auction.bids.all()
+        bids.values("bidder").distinct().count()
+        amounts = list(bids.order_by("-amount").values_list("amount", flat=True))
+        return sum(amounts) / len(amounts)
+
+    results = {
+        "bids": auction.bids.count(),
+        "seeded": seeded,
+        "absorbed": queued,
+        "absorb_bids_per_second": (
+            round(queued / absorb_seconds) if queued and absorb_seconds else None
+        ),
+        "summary": timed(lambda: analytics.auction_summary(auction.id), args.repeat),
+        "scan": timed(scan, min(args.repeat, 5)),
+    }
+    print(json.dumps(results, indent=2))
+    print(json.dumps(analytics.auction_summary(auction.id), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
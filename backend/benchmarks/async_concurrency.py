@@ -0,0 +1,108 @@
+"""
+Latency and throughput of the read endpoints under ASGI as concurrency
+grows, comparing the async ORM views with the sync DRF views they replace.
+
+Both modes go through the ASGI handler; "sync" simply resolves against
+ROOT_URLCONF instead of ASGI_ROOT_URLCONF:
+
+    python -m benchmarks.async_concurrency [--levels 1,10,50,100] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+DEFAULT_PATHS = [
+    "/api/v1/auctions/auctions/",
+    "/api/v1/auctions/featured/?limit=10",
+    "/api/v1/notifications/notifications/",
+    "/api/v1/accounts/wallet/",
+]
+
+
+async def run_level(client, paths, concurrency, rounds, headers):
+    latencies = []
+    errors = 0
+
+    async def one(path):
+        nonlocal errors
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors += 1
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(
+            *(one(paths[i % len(paths)]) for i in range(concurrency))
+        )
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+async def run(args):
+    from asgiref.sync import sync_to_async
+    from django.conf import settings
+    from django.test import AsyncClient, override_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from benchmarks._fixtures import seed
+
+    seller = await sync_to_async(seed)()
+    token = await sync_to_async(lambda: str(RefreshToken.for_user(seller).access_token))()
+    paths = args.paths or DEFAULT_PATHS
+    levels = [int(level) for level in args.levels.split(",")]
+
+    headers = {"authorization": f"Bearer {token}"}
+    client = AsyncClient()
+    results = {}
+    for mode, urlconf in (
+        ("sync", settings.ROOT_URLCONF),
+        ("async", settings.ASGI_ROOT_URLCONF),
+    ):
+        with override_settings(
+            ASGI_ROOT_URLCONF=urlconf,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        ):
+            # warm up connections and caches
+            await run_level(client, paths, 4, 1, headers)
+            results[mode] = {
+                level: await run_level(client, paths, level, args.rounds, headers)
+                for level in levels
+            }
+
+    print(f"{'level':>6} {'mode':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} errors")
+    for level in levels:
+        for mode in ("sync", "async"):
+            r = results[mode][level]
+            print(
+                f"{level:>6} {mode:>6} {r['rps']:>9} {r['p50_ms']:>9} "
+                f"{r['p95_ms']:>9} {r['errors']:>6}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", default="1,10,50,100")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--path", dest="paths", action="append")
+    args = parser.parse_args()
+
+    from benchmarks._django import setup
+
+    setup()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
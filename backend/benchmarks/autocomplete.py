@@ -0,0 +1,77 @@
+"""
+Typeahead latency: apps/auctions/autocomplete.py suggestions against the
+icontains scans search_auctions runs for the same text.
+
+    python -m benchmarks.autocomplete [--auctions 2000] [--repeat 200]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+PREFIXES = ("b", "be", "ben", "bench", "benchmark auction 1", "item 4")
+
+
+def timed(fn, repeat):
+    """Median and 99th percentile milliseconds over ``repeat`` runs"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(samples[int(len(samples) * 0.99) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--auctions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    from benchmarks._django import setup
+
+    setup()
+
+    from django.db.models import Q
+
+    from apps.auctions import autocomplete
+    from apps.auctions.models import Auction
+    from benchmarks._fixtures import seed
+
+    seed(auctions=args.auctions, bids_per_auction=1)
+    started = time.perf_counter()
+    autocomplete.rebuild()
+    backend = "redis" if autocomplete.get_client() else "local"
+
+    def scan(text):
+        return list(
+            Auction.objects.filter(status=Auction.STATUS_ACTIVE)
+            .filter(
+                Q(title__icontains=text)
+                | Q(description__icontains=text)
+                | Q(item__name__icontains=text)
+                | Q(item__description__icontains=text)
+            )
+            .values_list("id", "title")[:8]
+        )
+
+    results = {
+        "rebuild_ms": round((time.perf_counter() - started) * 1000, 1),
+        "backend": backend,
+    }
+    for prefix in PREFIXES:
+        results[prefix] = {
+            "suggest": timed(lambda: autocomplete.suggest(prefix, 8), args.repeat),
+            "icontains": timed(lambda: scan(prefix), max(args.repeat // 10, 1)),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
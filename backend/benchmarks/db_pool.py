@@ -0,0 +1,99 @@
+"""
+Requests/second through the full Django stack with and without the
+connection pool.
+
+Each mode runs in a fresh interpreter because the pool is configured from
+settings at startup:
+
+    python -m benchmarks.db_pool [--requests 2000] [--threads 8] [--path ...]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+
+def run_mode(args):
+    from benchmarks._django import setup
+
+    setup()
+
+    from django.db import close_old_connections
+    from django.test import Client
+    from apps.core.db import pool_stats
+
+    per_thread = args.requests // args.threads
+    errors = []
+
+    def worker():
+        client = Client(HTTP_HOST="localhost")
+        for _ in range(per_thread):
+            response = client.get(args.path)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+            # The test client skips the request_finished cleanup that the
+            # WSGI handler runs, so release the connection like it would.
+            close_old_connections()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = per_thread * args.threads
+    print(
+        json.dumps(
+            {
+                "requests": total,
+                "errors": len(errors),
+                "seconds": round(elapsed, 3),
+                "rps": round(total / elapsed, 1),
+                "pool": pool_stats(),
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--path", default="/api/v1/auctions/featured/")
+    parser.add_argument("--mode", choices=["pooled", "unpooled"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    results = {}
+    for mode, pooled in (("unpooled", "False"), ("pooled", "True")):
+        env = {**os.environ, "DB_POOL_ENABLED": pooled, "CONN_MAX_AGE": "0"}
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.db_pool", "--mode", mode]
+            + ["--requests", str(args.requests), "--threads", str(args.threads)]
+            + ["--path", args.path],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    for mode, result in results.items():
+        print(f"{mode:>9}: {result['rps']:>8} req/s  ({result['errors']} errors)")
+    if results["pooled"]["pool"]:
+        print("pool:", json.dumps(results["pooled"]["pool"], indent=2))
+    speedup = results["pooled"]["rps"] / results["unpooled"]["rps"]
+    print(f"speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Image derivatives/second generated in-process and in the process pool.
+
+Renders synthetic photos (noise over gradients, so encoders can't cheat)
+at the configured IMAGE_DERIVATIVE_WIDTHS and IMAGE_DERIVATIVE_FORMATS:
+
+    python -m benchmarks.image_pipeline [--images 32] [--size 2400x1600] [--workers N]
+"""
+
+import argparse
+import json
+import os
+import time
+from io import BytesIO
+
+
+def synthetic_images(count, width, height):
+    from PIL import Image
+
+    images = []
+    for index in range(count):
+        noise = Image.effect_noise((width, height), 40 + index % 20)
+        gradient = Image.linear_gradient("L").resize((width, height))
+        mirrored = noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        image = Image.merge("RGB", (noise, gradient, mirrored))
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--size", default="2400x1600")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    from benchmarks._django import setup
+
+    setup()
+
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    from django.conf import settings
+    from apps.core.imaging import render_derivatives, supported_formats
+
+    width, height = (int(part) for part in args.size.split("x"))
+    images = synthetic_images(args.images, width, height)
+    render_args = (
+        settings.IMAGE_DERIVATIVE_WIDTHS,
+        supported_formats(settings.IMAGE_DERIVATIVE_FORMATS),
+        settings.IMAGE_QUALITY,
+    )
+
+    results = {"formats": render_args[1], "widths": render_args[0]}
+
+    started = time.perf_counter()
+    for data in images:
+        render_derivatives(data, *render_args)
+    elapsed = time.perf_counter() - started
+    results["in_process"] = {
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(len(images) / elapsed, 2),
+    }
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        # Start the workers before timing, as the long-lived pool would be
+        warmup = synthetic_images(1, 64, 64) * args.workers
+        list(executor.map(render_derivatives, warmup, *zip(*[render_args] * len(warmup))))
+
+        started = time.perf_counter()
+        list(executor.map(render_derivatives, images, *zip(*[render_args] * len(images))))
+        elapsed = time.perf_counter() - started
+    results["pool"] = {
+        "workers": args.workers,
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(len(images) / elapsed, 2),
+        "images_per_second_per_worker": round(len(images) / elapsed / args.workers, 2),
+    }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Serialize-and-render time for auction and bid list pages: DRF serializers
+with the stdlib JSONRenderer against the values() read path
+(apps/auctions/rows.py) with orjson, and MessagePack when installed.
+
+    python -m benchmarks.json_render [--sizes 100,1000] [--repeat 5]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+
+def timed(fn, repeat):
+    """Best-of and median milliseconds over ``repeat`` runs"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "best_ms": round(min(samples), 2),
+        "median_ms": round(statistics.median(samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    from benchmarks._django import setup
+
+    setup()
+
+    from asgiref.sync import async_to_sync
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.auctions.models import Auction, Bid
+    from apps.auctions.rows import auction_rows, bid_rows
+    from apps.auctions.serializers import (
+        AuctionSerializer,
+        BidSerializer,
+        PrefetchedAuctionSerializer,
+    )
+    from apps.auctions.services import aget_auction_context, with_bid_summary
+    from apps.core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+    from benchmarks._fixtures import seed
+
+    seller = seed(auctions=max(sizes), bids_per_auction=2)
+    request = type("Request", (), {"user": seller})()
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+
+    results = {}
+    for size in sizes:
+        auctions = Auction.objects.filter(seller=seller).order_by("-created_at")[:size]
+        bids = Bid.objects.filter(auction__seller=seller).order_by("-timestamp")[:size]
+
+        def prefetched():
+            page = list(with_bid_summary(auctions))
+            context = async_to_sync(aget_auction_context)(page, seller)
+            return PrefetchedAuctionSerializer(page, many=True, context=context).data
+
+        modes = {
+            # What the list endpoints did: serializer properties query per row
+            "auctions_serializer_json": lambda: stdlib.render(
+                AuctionSerializer(
+                    auctions.select_related("seller", "item"),
+                    many=True,
+                    context={"request": request},
+                ).data
+            ),
+            # Serializer overhead alone, without the per-row queries
+            "auctions_prefetched_serializer_json": lambda: stdlib.render(prefetched()),
+            "auctions_rows_orjson": lambda: fast.render(auction_rows(auctions, seller)),
+            "bids_serializer_json": lambda: stdlib.render(
+                BidSerializer(bids.select_related("bidder", "auction"), many=True).data
+            ),
+            "bids_rows_orjson": lambda: fast.render(bid_rows(bids)),
+        }
+        if msgpack is not None:
+            packer = MessagePackRenderer()
+            modes["auctions_rows_msgpack"] = lambda: packer.render(
+                auction_rows(auctions, seller)
+            )
+
+        results[size] = {mode: timed(fn, args.repeat) for mode, fn in modes.items()}
+        results[size]["bytes"] = {
+            "json": len(stdlib.render(bid_rows(bids))),
+            "orjson": len(fast.render(bid_rows(bids))),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Saved-search percolation: matching one new auction against --searches
+saved searches (1M by default) through the anchor and price indexes,
+against evaluating every saved search.
+
+    python -m benchmarks.percolator [--searches 1000000] [--repeat 20]
+
+Seeding 1M searches takes a minute the first time; they are kept, under
+the name "benchmark", for later runs.
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+VOCABULARY = 5000
+SEARCH_NAME = "benchmark"
+
+
+def timed(fn, repeat):
+    """Median and worst milliseconds over ``repeat`` runs"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+def seed_searches(count, users, categories):
+    """
+    ``count`` benchmark searches, inserted in SQL: 10% price ranges only,
+    20% a category, 70% one or two keywords out of VOCABULARY, a quarter of
+    them with a category too, a third of everything with a price range
+
+    Keywords are "kwNNNN", all the same length, so the anchor (the longest
+    keyword, the greatest on a tie) is the last of the sorted terms.
+    """
+    from django.db import connection, transaction
+
+    from apps.auctions.models import SavedSearch
+
+    benchmark = SavedSearch.objects.filter(name=SEARCH_NAME)
+    if benchmark.count() == count:
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        benchmark.delete()
+        cursor.execute(
+            """
+            WITH s AS (
+                SELECT g, g %% 10 AS kind,
+                       ARRAY(
+                           SELECT DISTINCT 'kw' || lpad(
+                               ((g::bigint * 7919 + k * 104729) %% %(vocabulary)s)::text, 4, '0'
+                           )
+                           FROM generate_series(1, 1 + g %% 2) k
+                           ORDER BY 1
+                       ) AS words,
+                       (%(categories)s::uuid[])[1 + g %% %(category_count)s] AS category,
+                       CASE WHEN g %% 10 = 0 OR g %% 3 = 0
+                            THEN (g %% 50) * 10 END AS min_price
+                FROM generate_series(1, %(count)s) g
+            ), c AS (
+                SELECT s.*,
+                       CASE WHEN kind >= 3 THEN words ELSE '{}' END AS terms,
+                       CASE WHEN kind IN (1, 2) OR (kind >= 3 AND g %% 4 = 0)
+                            THEN category END AS category_id
+                FROM s
+            )
+            INSERT INTO auctions_savedsearch
+                (id, user_id, name, query, category_id, min_price, max_price,
+                 notify, created_at, terms, anchor)
+            SELECT gen_random_uuid(),
+                   (%(users)s::uuid[])[1 + g %% %(user_count)s],
+                   %(name)s, array_to_string(terms, ' '), category_id,
+                   min_price, min_price + 100 + g %% 200, TRUE, NOW(), terms,
+                   CASE WHEN kind >= 3 THEN 't:' || terms[cardinality(terms)]
+                        WHEN category_id IS NOT NULL THEN 'c:' || category_id
+                   END
+            FROM c
+            """,
+            {
+                "vocabulary": VOCABULARY,
+                "count": count,
+                "users": users,
+                "user_count": len(users),
+                "categories": categories,
+                "category_count": len(categories),
+                "name": SEARCH_NAME,
+            },
+        )
+        cursor.execute("ANALYZE auctions_savedsearch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--searches", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks._django import setup
+
+    setup()
+
+    from decimal import Decimal
+
+    from django.db import transaction
+    from django.db.models import Q
+
+    from apps.accounts.models import User
+    from apps.auctions import percolator
+    from apps.auctions.models import Auction, Category, SavedSearch
+    from benchmarks._fixtures import seed
+
+    seller = seed(auctions=1, bidders=20, bids_per_auction=0)
+    parent, _ = Category.objects.get_or_create(name="Benchmark")
+    categories = [parent] + [
+        Category.objects.get_or_create(name=f"Benchmark {i}", parent=parent)[0]
+        for i in range(20)
+    ]
+    users = list(
+        User.objects.filter(email__startswith="bench-bidder-").values_list(
+            "id", flat=True
+        )
+    )
+
+    started = time.perf_counter()
+    seed_searches(args.searches, users, [c.id for c in categories])
+    seed_seconds = time.perf_counter() - started
+
+    auction = Auction.objects.filter(seller=seller).select_related("item").first()
+    auction.title = "Vintage kw0042 kw1234 lamp"
+    auction.starting_price = Decimal("75.00")
+    auction.item.category = categories[3]
+    parents = percolator.category_parents()
+
+    def percolate():
+        with transaction.atomic():
+            percolator.percolate([auction])
+            transaction.set_rollback(True)
+
+    matching = percolator.matching_searches(auction, parents)
+    terms = sorted(percolator.auction_terms(auction))
+    lineage = percolator.category_lineage(auction.item.category_id, parents)
+    scan = (
+        SavedSearch.objects.filter(notify=True, terms__contained_by=terms)
+        .filter(Q(category__isnull=True) | Q(category_id__in=lineage))
+        .filter(price_range__contains=auction.starting_price)
+        .exclude(user=seller)
+    )
+
+    results = {
+        "searches": SavedSearch.objects.count(),
+        "seed_seconds": round(seed_seconds, 1),
+        "matches": matching.count(),
+        "percolate": timed(percolate, args.repeat),
+        "match_query": timed(lambda: list(matching.values_list("id")), args.repeat),
+        "full_scan": timed(lambda: list(scan.values_list("id")), 3),
+        "full_scan_matches": scan.count(),
+    }
+    print(json.dumps(results, indent=2))
+    print(matching.explain(analyze=True))
+
+
+if __name__ == "__main__":
+    main()